@@ -4,6 +4,8 @@ import lalcheck.irs.basic.frontends.lal as lal2basic
 from lalcheck.interpretations import default_type_interpreter
 from lalcheck.irs.basic.tools import Models
 from lalcheck.irs.basic.analyses import abstract_semantics
+from output import Diagnostic, open_writer, writers
+import sys
 import time
 
 
@@ -27,29 +29,33 @@ class Checker(object):
         self.checker_fun = checker_fun
 
         self.parser = argparse.ArgumentParser(description=self.checker_descr)
-        self.parser.add_argument('--output-format', default="codepeer")
+        self.parser.add_argument('--output-format', default="codepeer",
+                                 choices=sorted(writers.keys()))
+        self.parser.add_argument('--output-file', default=None)
         self.parser.add_argument('--path-sensitive', action='store_true')
         self.parser.add_argument('--call-strategy', default="unknown")
         self.parser.add_argument('--project', default=None)
         self.parser.add_argument('--model', default=None)
+        self.parser.add_argument('--jobs', type=int, default=1)
+        self.parser.add_argument(
+            '--ir-cache', default=None, metavar='DIR',
+            help="Cache the lowered programs in DIR, and reuse them while "
+                 "the sources and lalcheck are unchanged. Cache entries "
+                 "are unpickled: DIR must only be writable by trusted "
+                 "users, as a forged entry can execute arbitrary code."
+        )
+        self.parser.add_argument('--optimize', action='store_true')
+        self.parser.add_argument('--widening-delay', type=int, default=10)
+        self.parser.add_argument('--widening-thresholds',
+                                 action='store_true')
+        self.parser.add_argument('--narrowing-steps', type=int,
+                                 default=None)
+        self.parser.add_argument('--basic-blocks', action='store_true')
         self.parser.add_argument('--timings', action='store_true')
         self.parser.add_argument('--print-analysis', action='store_true')
         self.parser.add_argument('file')
         self.args = None
 
-    @staticmethod
-    def _default_emit(*_):
-        print("warning")
-
-    def _emit_codepeer_message(self, file, line, column, proc_name,
-                               proc_file, proc_line, proc_column, msg):
-        print("{}:{}:{} warning: {}:{}:{}:{}: {} {}".format(
-            file, line, column,
-            proc_name, proc_file, proc_line, proc_column,
-            msg,
-            "[{}]".format(self.checker_name)
-        ))
-
     def report(self, diag):
         raise NotImplementedError
 
@@ -61,26 +67,39 @@ class Checker(object):
 
         args = self.args = self.parser.parse_args()
 
-        ctx = lal2basic.ExtractionContext(args.project)
+        ctx = lal2basic.ExtractionContext(
+            args.project, args.jobs, args.ir_cache, args.optimize
+        )
 
         frontend_start_time = time.clock()
 
-        if args.project is None:
-            progs = ctx.extract_programs_from_file(args.file)
-        else:
-            if args.model is not None:
-                ctx.use_model(args.model)
+        try:
+            if args.project is None:
+                progs = ctx.extract_programs_from_file(args.file)
+            else:
+                if args.model is not None:
+                    ctx.use_model(args.model)
 
-            progs = ctx.extract_programs_from_provider(args.file, 'body')
+                progs = ctx.extract_programs_from_provider(args.file, 'body')
+        finally:
+            # All the programs are extracted, stop the lowering workers.
+            ctx.close()
 
         call_strategy_unknown = (
             abstract_semantics.UnknownTargetCallStrategy().as_def_provider()
         )
 
+        widening = abstract_semantics.WideningStrategy(
+            args.widening_delay,
+            args.widening_thresholds,
+            args.narrowing_steps
+        )
+
         call_strategy_topdown = abstract_semantics.TopDownCallStrategy(
                 progs,
                 lambda: model,
-                lambda: merge_predicate
+                lambda: merge_predicate,
+                widening
             ).as_def_provider()
 
         call_strategies = {
@@ -106,49 +125,78 @@ class Checker(object):
         else:
             merge_predicate = abstract_semantics.MergePredicateBuilder.Always
 
+        writer = open_writer(
+            args.output_format, self.checker_name, args.output_file
+        )
+        writer.start()
+
         analysis_start_time = time.clock()
+        analysis_time = 0
+
+        try:
+            for prog in progs:
+                prog_start_time = time.clock()
+                analysis = self.checker_fun(
+                    prog, model, merge_predicate, widening=widening,
+                    basic_blocks=args.basic_blocks
+                )
+                analysis_time += time.clock() - prog_start_time
 
-        analyses = {
-            prog: self.checker_fun(prog, model, merge_predicate)
-            for prog in progs
-        }
+                self._emit_diagnostics(writer, prog, analysis)
+        finally:
+            # Terminate the document even if the analysis fails, so that the
+            # diagnostics emitted so far can still be read.
+            writer.close()
 
         end_time = time.clock()
 
         if args.timings:
-            print("IR Generation: {} seconds.".format(
+            # Don't interfere with machine-readable outputs.
+            machine_readable = args.output_format != 'codepeer'
+            out = sys.stderr if machine_readable else sys.stdout
+            out.write("IR Generation: {} seconds.\n".format(
                 model_gen_start_time - frontend_start_time
             ))
-            print("Model Generation: {} seconds.".format(
+            out.write("Model Generation: {} seconds.\n".format(
                 analysis_start_time - model_gen_start_time
             ))
-            print("Analysis: {} seconds.".format(
-                end_time - analysis_start_time
-            ))
-            print("Total: {} seconds.".format(
+            out.write("Analysis: {} seconds.\n".format(analysis_time))
+            out.write("Total: {} seconds.\n".format(
                 end_time - start_time
             ))
+            out.write("Property cache: {} hits, {} misses.\n".format(
+                ctx.properties.hits, ctx.properties.misses
+            ))
+            if ctx.optimizer is not None:
+                out.write(ctx.optimizer.report() + "\n")
+
+    def _emit_diagnostics(self, writer, prog, analysis):
+        """
+        Emits the diagnostics of the given analysis, then flushes the writer
+        so that they are visible right away.
+
+        :param output.DiagnosticWriter writer: The writer to use.
+        :param irt.Program prog: The analyzed program.
+        :param CheckerResults analysis: The results of the checker.
+        """
+        args = self.args
+        prog_info = lal_subprogram_info(prog.data.orig_node)
+
+        if args.print_analysis:
+            analysis.analysis_results.save_results_to_file(
+                prog_info[0] + ".dot"
+            )
 
-        if args.output_format == 'codepeer':
-            emit_message = self._emit_codepeer_message
-        else:
-            emit_message = self._default_emit
+        for diag in analysis.diagnostics:
+            pos = self.position(diag)
+            msg = self.report(diag)
 
-        for prog, analysis in analyses.iteritems():
-            prog_info = lal_subprogram_info(prog.data.orig_node)
-            if args.print_analysis:
-                analysis.analysis_results.save_results_to_file(
-                    prog_info[0] + ".dot"
-                )
+            if msg is not None and pos is not None:
+                writer.emit(Diagnostic(
+                    args.file, pos.line, pos.column,
+                    prog_info[0],
+                    args.file, prog_info[1].line, prog_info[1].column,
+                    msg
+                ))
 
-            for diag in analysis.diagnostics:
-                pos = self.position(diag)
-                msg = self.report(diag)
-
-                if msg is not None and pos is not None:
-                    emit_message(
-                        args.file, pos.line, pos.column,
-                        prog_info[0],
-                        args.file, prog_info[1].line, prog_info[1].column,
-                        msg
-                    )
+        writer.end_subprogram()
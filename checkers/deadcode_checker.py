@@ -72,11 +72,14 @@ class AnalysisResult(CheckerResults):
         )
 
 
-def check_dead_code(prog, model, merge_pred_builder):
+def check_dead_code(prog, model, merge_pred_builder, widening=None,
+                    basic_blocks=False):
     analysis = abstract_semantics.compute_semantics(
         prog,
         model,
-        merge_pred_builder
+        merge_pred_builder,
+        widening=widening,
+        basic_blocks=basic_blocks
     )
 
     dead_nodes = [
@@ -0,0 +1,234 @@
+"""
+Provides the writers used by checkers to emit their diagnostics.
+
+Diagnostics are streamed: each writer formats a diagnostic as soon as it is
+emitted, and the underlying buffer is flushed every time the analysis of a
+subprogram is done, so that results are visible before the whole batch is
+analyzed.
+"""
+
+import json
+import sys
+
+
+class BufferedOutput(object):
+    """
+    A minimal write buffer on top of a stream. Text is accumulated in memory
+    and only written to the stream when the buffer is full or explicitly
+    flushed.
+    """
+    def __init__(self, stream, capacity=1 << 16, owns_stream=False):
+        """
+        :param file stream: The stream to write to.
+        :param int capacity: The number of characters after which the buffer
+            is automatically flushed.
+        :param bool owns_stream: Whether the stream must be closed when this
+            output is closed.
+        """
+        self.stream = stream
+        self.owns_stream = owns_stream
+        self.capacity = capacity
+        self.chunks = []
+        self.size = 0
+
+    def write(self, text):
+        """
+        :param str text: The text to write.
+        """
+        self.chunks.append(text)
+        self.size += len(text)
+        if self.size >= self.capacity:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes the content of the buffer to the stream and flushes it.
+        """
+        if len(self.chunks) > 0:
+            self.stream.write(''.join(self.chunks))
+            self.chunks = []
+            self.size = 0
+        self.stream.flush()
+
+    def close(self):
+        """
+        Flushes the buffer, and closes the stream if it is owned.
+        """
+        self.flush()
+        if self.owns_stream:
+            self.stream.close()
+
+
+class Diagnostic(object):
+    """
+    Holds the information about a single diagnostic emitted by a checker.
+    """
+    def __init__(self, file, line, column, proc_name, proc_file, proc_line,
+                 proc_column, msg):
+        """
+        :param str file: The file in which the diagnostic is located.
+        :param int line: The line of the diagnostic.
+        :param int column: The column of the diagnostic.
+        :param str proc_name: The name of the enclosing subprogram.
+        :param str proc_file: The file of the enclosing subprogram.
+        :param int proc_line: The line of the enclosing subprogram.
+        :param int proc_column: The column of the enclosing subprogram.
+        :param str msg: The message of the diagnostic.
+        """
+        self.file = file
+        self.line = line
+        self.column = column
+        self.proc_name = proc_name
+        self.proc_file = proc_file
+        self.proc_line = proc_line
+        self.proc_column = proc_column
+        self.msg = msg
+
+
+class DiagnosticWriter(object):
+    """
+    Base class for diagnostic writers.
+    """
+    def __init__(self, checker_name, out):
+        """
+        :param str checker_name: The name of the checker emitting diagnostics.
+        :param BufferedOutput out: The output to write to.
+        """
+        self.checker_name = checker_name
+        self.out = out
+
+    def start(self):
+        """
+        Called once, before any diagnostic is emitted.
+        """
+        pass
+
+    def emit(self, diag):
+        """
+        :param Diagnostic diag: The diagnostic to write.
+        """
+        raise NotImplementedError
+
+    def end_subprogram(self):
+        """
+        Called once the diagnostics of a subprogram have all been emitted.
+        """
+        self.out.flush()
+
+    def close(self):
+        """
+        Called once, after all diagnostics were emitted.
+        """
+        self.out.close()
+
+
+class CodepeerWriter(DiagnosticWriter):
+    """
+    Writes diagnostics in the CodePeer message format, one per line.
+    """
+    def emit(self, diag):
+        self.out.write("{}:{}:{} warning: {}:{}:{}:{}: {} [{}]\n".format(
+            diag.file, diag.line, diag.column,
+            diag.proc_name, diag.proc_file, diag.proc_line, diag.proc_column,
+            diag.msg,
+            self.checker_name
+        ))
+
+
+class JsonLinesWriter(DiagnosticWriter):
+    """
+    Writes diagnostics as JSON objects, one per line.
+    """
+    def emit(self, diag):
+        self.out.write(json.dumps({
+            'checker': self.checker_name,
+            'file': diag.file,
+            'line': diag.line,
+            'column': diag.column,
+            'message': diag.msg,
+            'subprogram': {
+                'name': diag.proc_name,
+                'file': diag.proc_file,
+                'line': diag.proc_line,
+                'column': diag.proc_column
+            }
+        }, sort_keys=True))
+        self.out.write('\n')
+
+
+class SarifWriter(DiagnosticWriter):
+    """
+    Writes diagnostics as a SARIF v2.1.0 log containing a single run. The
+    enclosing document is opened in "start" and closed in "close", results
+    are written in between as they are emitted.
+    """
+    SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+
+    def __init__(self, checker_name, out):
+        super(SarifWriter, self).__init__(checker_name, out)
+        self.result_count = 0
+
+    def start(self):
+        self.out.write('{{"$schema": {}, "version": "2.1.0", "runs": [{{'
+                       '"tool": {{"driver": {{"name": {}}}}}, '
+                       '"results": ['.format(
+                           json.dumps(self.SCHEMA),
+                           json.dumps(self.checker_name)
+                       ))
+
+    def emit(self, diag):
+        if self.result_count > 0:
+            self.out.write(',')
+        self.result_count += 1
+
+        self.out.write('\n' + json.dumps({
+            'ruleId': self.checker_name,
+            'level': 'warning',
+            'message': {'text': diag.msg},
+            'locations': [{
+                'physicalLocation': {
+                    'artifactLocation': {'uri': diag.file},
+                    'region': {
+                        'startLine': diag.line,
+                        'startColumn': diag.column
+                    }
+                },
+                'logicalLocations': [{
+                    'name': diag.proc_name,
+                    'kind': 'function'
+                }]
+            }]
+        }, sort_keys=True))
+
+    def close(self):
+        self.out.write('\n]}]}\n')
+        super(SarifWriter, self).close()
+
+
+writers = {
+    'codepeer': CodepeerWriter,
+    'jsonl': JsonLinesWriter,
+    'sarif': SarifWriter
+}
+"""
+The available diagnostic writers, indexed by the name of their output format.
+"""
+
+
+def open_writer(output_format, checker_name, output_file=None):
+    """
+    :param str output_format: The name of the output format. (See "writers").
+
+    :param str checker_name: The name of the checker emitting diagnostics.
+
+    :param str | None output_file: The path to the file to write to. Writes
+        to the standard output if None.
+
+    :rtype: DiagnosticWriter
+    """
+    if output_file is None:
+        out = BufferedOutput(sys.stdout)
+    else:
+        out = BufferedOutput(open(output_file, 'w'), owns_stream=True)
+
+    return writers[output_format](checker_name, out)
@@ -100,12 +100,15 @@ class AnalysisResult(CheckerResults):
         )
 
 
-def check_variants(prog, model, merge_pred_builder):
+def check_variants(prog, model, merge_pred_builder, widening=None,
+                   basic_blocks=False):
 
     analysis = abstract_semantics.compute_semantics(
         prog,
         model,
-        merge_pred_builder
+        merge_pred_builder,
+        widening=widening,
+        basic_blocks=basic_blocks
     )
 
     # Retrieve nodes in the CFG that correspond to program statements.
@@ -34,11 +34,11 @@ def inv_deref(ptr_dom, mem_dom):
             pass
 
     def do(elem, addr_constr, mem_constr):
-        memory = (mem_constr[0].copy(), mem_constr[1])
+        memory = [mem_constr[0], mem_constr[1]]
         for addr in addr_constr:
             try_inv_access(addr, memory, elem)
 
-        return addr_constr, mem_dom.meet(mem_constr, memory)
+        return addr_constr, mem_dom.meet(mem_constr, tuple(memory))
 
     return do
 
@@ -53,11 +53,11 @@ def updated(ptr_dom):
             pass
 
     def do(mem, ptr, val):
-        updated_mem = (mem[0].copy(), mem[1])
+        updated_mem = [mem[0], mem[1]]
         for addr in ptr:
             try_update(addr, updated_mem, val)
 
-        return updated_mem
+        return tuple(updated_mem)
 
     return do
 
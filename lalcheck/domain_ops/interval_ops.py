@@ -1,10 +1,17 @@
 """
 Provides a collection of useful operations on interval domains.
+
+Operations prefixed by "batch_" apply the operation of the same name to
+batches of intervals, typically the values of a variable in all the
+disjuncts of a state. A batch is split into the columns of the lower and
+upper bounds of its intervals, on which bounds are computed column by
+column.
 """
 
 
 from lalcheck import domains
 import boolean_ops
+import operator
 
 
 def add_no_wraparound(domain):
@@ -302,6 +309,237 @@ def ge(domain):
     return do
 
 
+def _bound_columns(domain, xs):
+    """
+    Splits the given batch of intervals into the columns of their lower
+    bounds and of their upper bounds.
+
+    :param lalcheck.domains.Intervals domain: An intervals domain.
+
+    :param list[(int, int)] xs: A batch of elements of the interval domain.
+
+    :return: The column of lower bounds, the column of upper bounds, and the
+        positions of the empty intervals in the batch, whose bounds are set
+        to 0 in the columns.
+
+    :rtype: (tuple[int], tuple[int], list[int])
+    """
+    bottom = domain.bottom
+    empties = [i for i, x in enumerate(xs) if x is bottom]
+    if len(empties) > 0:
+        xs = [(0, 0) if x is bottom else x for x in xs]
+
+    lows, highs = zip(*xs) if len(xs) > 0 else ((), ())
+    return lows, highs, empties
+
+
+def _with_empties(res, empties, empty):
+    """
+    :param list[object] res: The results of a batched operation.
+    :param iterable[int] empties: The positions of the empty results.
+    :param object empty: The empty result.
+    :return: The given results, where the given positions are set to the
+        empty result.
+    :rtype: list[object]
+    """
+    for i in empties:
+        res[i] = empty
+    return res
+
+
+def batch_add_no_wraparound(domain):
+    """
+    :param lalcheck.domains.Intervals domain: An intervals domain.
+
+    :return: A function which computes the additions between two batches of
+        intervals, pairwise. The result is the same as applying the function
+        returned by add_no_wraparound to each pair of intervals, but the
+        bounds are computed column by column.
+
+    :rtype: (list[(int, int)], list[(int, int)]) -> list[(int, int)]
+    """
+    m_inf, inf = domain.top
+
+    def do(xs, ys):
+        x_lows, x_highs, x_empties = _bound_columns(domain, xs)
+        y_lows, y_highs, y_empties = _bound_columns(domain, ys)
+        lows = map(operator.add, x_lows, y_lows)
+        highs = map(operator.add, x_highs, y_highs)
+        res = [
+            x if m_inf <= x[0] and x[1] <= inf else domain.top
+            for x in zip(lows, highs)
+        ]
+        return _with_empties(res, x_empties + y_empties, domain.bottom)
+
+    return do
+
+
+def batch_sub_no_wraparound(domain):
+    """
+    :param lalcheck.domains.Intervals domain: An intervals domain.
+
+    :return: A function which computes the subtractions between two batches
+        of intervals, pairwise (see batch_add_no_wraparound).
+
+    :rtype: (list[(int, int)], list[(int, int)]) -> list[(int, int)]
+    """
+    m_inf, inf = domain.top
+
+    def do(xs, ys):
+        x_lows, x_highs, x_empties = _bound_columns(domain, xs)
+        y_lows, y_highs, y_empties = _bound_columns(domain, ys)
+        lows = map(operator.sub, x_lows, y_highs)
+        highs = map(operator.sub, x_highs, y_lows)
+        res = [
+            x if m_inf <= x[0] and x[1] <= inf else domain.top
+            for x in zip(lows, highs)
+        ]
+        return _with_empties(res, x_empties + y_empties, domain.bottom)
+
+    return do
+
+
+def batch_negate(domain):
+    """
+    :param lalcheck.domains.Intervals domain: An intervals domain.
+
+    :return: A function which computes the negation of each interval of a
+        batch (see batch_add_no_wraparound).
+
+    :rtype: (list[(int, int)]) -> list[(int, int)]
+    """
+    m_inf, inf = domain.top
+
+    def do(xs):
+        lows, highs, empties = _bound_columns(domain, xs)
+        res = [
+            x if m_inf <= x[0] and x[1] <= inf else None
+            for x in zip(map(operator.neg, highs), map(operator.neg, lows))
+        ]
+        return _with_empties(res, empties, domain.bottom)
+
+    return do
+
+
+def batch_lt(domain):
+    """
+    :param lalcheck.domains.Intervals domain: An intervals domain.
+
+    :return: A function which computes the "less than" between two batches
+        of intervals, pairwise (see batch_add_no_wraparound).
+
+    :rtype: (list[(int, int)], list[(int, int)]) -> list[frozenset[str]]
+    """
+    true, false, both = boolean_ops.true, boolean_ops.false, boolean_ops.both
+
+    def do(xs, ys):
+        x_lows, x_highs, x_empties = _bound_columns(domain, xs)
+        y_lows, y_highs, y_empties = _bound_columns(domain, ys)
+        res = [
+            true if x_high < y_low else false if x_low >= y_high else both
+            for x_low, x_high, y_low, y_high
+            in zip(x_lows, x_highs, y_lows, y_highs)
+        ]
+        return _with_empties(res, x_empties + y_empties, boolean_ops.none)
+
+    return do
+
+
+def batch_eq(domain):
+    """
+    :param lalcheck.domains.Intervals domain: An intervals domain.
+
+    :return: A function which computes the equality between two batches of
+        intervals, pairwise (see batch_add_no_wraparound).
+
+    :rtype: (list[(int, int)], list[(int, int)]) -> list[frozenset[str]]
+    """
+    true, false, both = boolean_ops.true, boolean_ops.false, boolean_ops.both
+
+    def do(xs, ys):
+        x_lows, x_highs, x_empties = _bound_columns(domain, xs)
+        y_lows, y_highs, y_empties = _bound_columns(domain, ys)
+        res = [
+            true if x_low == y_low == x_high == y_high
+            else false if x_high < y_low or y_high < x_low
+            else both
+            for x_low, x_high, y_low, y_high
+            in zip(x_lows, x_highs, y_lows, y_highs)
+        ]
+        return _with_empties(res, x_empties + y_empties, boolean_ops.none)
+
+    return do
+
+
+def batch_neq(domain):
+    """
+    :param lalcheck.domains.Intervals domain: An intervals domain.
+
+    :return: A function which computes the inequality between two batches
+        of intervals, pairwise (see batch_add_no_wraparound).
+
+    :rtype: (list[(int, int)], list[(int, int)]) -> list[frozenset[str]]
+    """
+    do_eq = batch_eq(domain)
+
+    def do(xs, ys):
+        return map(boolean_ops.not_, do_eq(xs, ys))
+
+    return do
+
+
+def batch_le(domain):
+    """
+    :param lalcheck.domains.Intervals domain: An intervals domain.
+
+    :return: A function which computes the "less than or equal" between two
+        batches of intervals, pairwise (see batch_add_no_wraparound).
+
+    :rtype: (list[(int, int)], list[(int, int)]) -> list[frozenset[str]]
+    """
+    do_lt = batch_lt(domain)
+    do_eq = batch_eq(domain)
+
+    def do(xs, ys):
+        return map(boolean_ops.or_, do_lt(xs, ys), do_eq(xs, ys))
+
+    return do
+
+
+def batch_gt(domain):
+    """
+    :param lalcheck.domains.Intervals domain: An intervals domain.
+
+    :return: A function which computes the "greater than" between two
+        batches of intervals, pairwise (see batch_add_no_wraparound).
+
+    :rtype: (list[(int, int)], list[(int, int)]) -> list[frozenset[str]]
+    """
+    do_lt = batch_lt(domain)
+
+    def do(xs, ys):
+        return do_lt(ys, xs)
+
+    return do
+
+
+def batch_ge(domain):
+    """
+    :param lalcheck.domains.Intervals domain: An intervals domain.
+
+    :return: A function which computes the "greater than or equal" between
+        two batches of intervals, pairwise (see batch_add_no_wraparound).
+
+    :rtype: (list[(int, int)], list[(int, int)]) -> list[frozenset[str]]
+    """
+    do_le = batch_le(domain)
+
+    def do(xs, ys):
+        return do_le(ys, xs)
+
+    return do
+
+
 def inv_add_no_wraparound(domain):
     """
     :param lalcheck.domains.Intervals domain: An intervals domain.
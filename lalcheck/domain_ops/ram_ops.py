@@ -1,10 +1,7 @@
 def getter(index, dom):
     def do(stack):
-        offset = index + stack[1]
-        if offset in stack[0]:
-            return stack[0][offset][1]
-        else:
-            return dom.top
+        entry = stack[0].get(index + stack[1])
+        return dom.top if entry is None else entry[1]
 
     return do
 
@@ -18,9 +15,7 @@ def inv_getter(index, dom):
 
 def updater(index, dom):
     def do(stack, value):
-        new = stack[0].copy()
-        new[index + stack[1]] = (dom, value)
-        return new, stack[1]
+        return stack[0].set(index + stack[1], (dom, value)), stack[1]
 
     return do
 
@@ -1,7 +1,6 @@
 """
 Provides a collection of common useful operations on sparse array domains.
 """
-from lalcheck.utils import partition
 
 
 def get(domain):
@@ -13,7 +12,6 @@ def get(domain):
 
     :rtype: (list, object) -> object
     """
-    index_dom = domain.index_dom
     elem_dom = domain.elem_dom
 
     def do(array, index):
@@ -30,11 +28,8 @@ def get(domain):
         :rtype: object
         """
         relevant = [
-            elem[1]
-            for elem in array
-            if not index_dom.is_empty(
-                index_dom.meet(index, elem[0])
-            )
+            array[pos][1]
+            for pos in domain.overlapping(array, index)
         ]
 
         return reduce(elem_dom.join, relevant, elem_dom.bottom)
@@ -74,12 +69,16 @@ def updated(domain):
         """
 
         if index_dom.size(indices) == 1:
-            not_relevant, relevant = partition(
-                array,
-                lambda elem: index_dom.is_empty(
-                    index_dom.meet(indices, elem[0])
-                )
-            )
+            positions = domain.overlapping(array, indices)
+            relevant = [array[pos] for pos in positions]
+
+            # Copy the segments lying between the relevant ones.
+            not_relevant = []
+            prev = 0
+            for pos in positions:
+                not_relevant.extend(array[prev:pos])
+                prev = pos + 1
+            not_relevant.extend(array[prev:])
 
             updated_relevant = [
                 (split, elem[1])
@@ -141,10 +140,12 @@ def inv_get(domain):
         if domain.is_empty(array_meet):
             return None
 
+        # Segments of the meet may extend beyond the index constraint, as
+        # adjacent segments holding equal values are merged.
         indices = reduce(index_dom.join, [
-            i
+            index_dom.meet(i, index_constr)
             for i, v in array_meet
-            if index_dom.le(i, index_constr) and elem_dom.le(v, res)
+            if elem_dom.le(v, res)
         ], index_dom.bottom)
 
         indices_size = index_dom.size(indices)
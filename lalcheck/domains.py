@@ -2,9 +2,11 @@
 Provides some basic abstract domains.
 """
 
-from utils import powerset, zip_dicts
+from utils import powerset, LRUCache, PersistentMap
 import itertools
 import collections
+import bisect
+import weakref
 
 
 class AbstractDomain(object):
@@ -88,6 +90,17 @@ class AbstractDomain(object):
         """
         return self.join(a, b)
 
+    def widen(self, a, b, thresholds):
+        """
+        Returns an upper bound of the given elements, like "update" does when
+        widen is True. Domains may use the given thresholds to widen less
+        aggressively, by first extrapolating the bounds of unstable elements
+        to the nearest threshold rather than to the limits of the domain.
+
+        :param tuple[int] thresholds: A sorted tuple of integers.
+        """
+        return self.update(a, b, True)
+
     def lt(self, a, b):
         """
         Returns True if the first element is less than the second element,
@@ -109,7 +122,7 @@ class AbstractDomain(object):
         element, that is, if the first element represents a smaller set of
         concrete values than the second one, or the same one.
         """
-        return self.eq(a, b) or self.lt(a, b)
+        return a is b or self.eq(a, b) or self.lt(a, b)
 
     def gt(self, a, b):
         """
@@ -284,6 +297,28 @@ class Intervals(AbstractDomain):
         else:
             return self.join(a, b)
 
+    def widen(self, a, b, thresholds):
+        if a == self.bottom:
+            return b
+        elif b == self.bottom:
+            return a
+
+        if a[0] <= b[0]:
+            low = a[0]
+        else:
+            i = bisect.bisect_right(thresholds, b[0])
+            low = thresholds[i - 1] if i > 0 else self.top[0]
+            low = max(low, self.top[0])
+
+        if a[1] >= b[1]:
+            high = a[1]
+        else:
+            i = bisect.bisect_left(thresholds, b[1])
+            high = thresholds[i] if i < len(thresholds) else self.top[1]
+            high = min(high, self.top[1])
+
+        return low, high
+
     def lt(self, a, b):
         if a == self.bottom:
             return b != self.bottom
@@ -294,10 +329,10 @@ class Intervals(AbstractDomain):
                     (a[0] != b[0] or a[1] != b[1]))
 
     def eq(self, a, b):
-        return a == b
+        return a is b or a == b
 
     def le(self, a, b):
-        return self.lt(a, b) or self.eq(a, b)
+        return a is b or self.lt(a, b) or self.eq(a, b)
 
     def split(self, elem, separator):
         if self.is_empty(self.meet(elem, separator)):
@@ -356,6 +391,104 @@ class Product(AbstractDomain):
         self.bottom = tuple(d.bottom for d in domains)
         self.top = tuple(d.top for d in domains)
 
+        # The components whose domain is not a unit domain. Components of a
+        # unit domain can only hold one value, so operations can skip them.
+        self._components = [
+            (i, dom) for i, dom in enumerate(domains)
+            if not Product._is_unit(dom)
+        ]
+
+        self._join = self._componentwise('join')
+        self._meet = self._componentwise('meet')
+        self._eq = self._for_all_components('eq', True)
+        self._lt = self._for_all_components('lt', False)
+
+    @staticmethod
+    def _is_unit(dom):
+        return isinstance(dom, Product) and len(dom.domains) == 0
+
+    def _componentwise(self, op):
+        """
+        Returns a function which applies the given idempotent binary
+        operation of the component domains to each pair of components of
+        two elements. Components which are the same object in both elements
+        are not recomputed.
+
+        :param str op: The name of the operation, e.g. "join".
+        :rtype: (tuple, tuple) -> tuple
+        """
+        funs = [(i, getattr(dom, op)) for i, dom in self._components]
+
+        if len(funs) == 0:
+            return lambda a, b: a
+        elif len(funs) == len(self.domains) == 1:
+            f0 = funs[0][1]
+
+            def unary(a, b):
+                x0, y0 = a[0], b[0]
+                return a if x0 is y0 else (f0(x0, y0),)
+
+            return unary
+        elif len(funs) == len(self.domains) == 2:
+            f0, f1 = funs[0][1], funs[1][1]
+
+            def binary(a, b):
+                x0, x1 = a
+                y0, y1 = b
+                return (
+                    x0 if x0 is y0 else f0(x0, y0),
+                    x1 if x1 is y1 else f1(x1, y1)
+                )
+
+            return binary
+
+        def nary(a, b):
+            res = list(a)
+            for i, f in funs:
+                x, y = a[i], b[i]
+                if x is not y:
+                    res[i] = f(x, y)
+            return tuple(res)
+
+        return nary
+
+    def _for_all_components(self, op, reflexive):
+        """
+        Returns a function which checks that the given binary predicate of
+        the component domains holds for each pair of components of two
+        elements.
+
+        :param str op: The name of the predicate, e.g. "eq".
+        :param bool reflexive: Whether the predicate is reflexive, in which
+            case it is not checked for components which are the same object
+            in both elements.
+        :rtype: (tuple, tuple) -> bool
+        """
+        funs = [(i, getattr(dom, op)) for i, dom in self._components]
+
+        if len(funs) == len(self.domains) == 2:
+            f0, f1 = funs[0][1], funs[1][1]
+
+            if reflexive:
+                def binary(a, b):
+                    x0, x1 = a
+                    y0, y1 = b
+                    return ((x0 is y0 or f0(x0, y0)) and
+                            (x1 is y1 or f1(x1, y1)))
+            else:
+                def binary(a, b):
+                    x0, x1 = a
+                    y0, y1 = b
+                    return f0(x0, y0) and f1(x1, y1)
+
+            return binary
+        elif reflexive:
+            return lambda a, b: all(
+                a[i] is b[i] or f(a[i], b[i]) for i, f in funs
+            )
+        else:
+            return lambda a, b: all(f(a[i], b[i]) for i, f in funs)
+
     def build(self, *args):
         """
         Creates a new element representing the cartesian product of the given
@@ -367,46 +500,42 @@ class Product(AbstractDomain):
     def is_empty(self, x):
         # a cartesian product is empty iff any of its operand is empty.
         return any(
-            domain.is_empty(v)
-            for domain, v in zip(self.domains, x)
+            domain.is_empty(x[i])
+            for i, domain in self._components
         )
 
     def size(self, x):
-        return reduce(
-            lambda acc, dom_e: acc * (dom_e[0].size(dom_e[1])),
-            zip(self.domains, x),
-            1
-        )
+        res = 1
+        for i, domain in self._components:
+            res *= domain.size(x[i])
+        return res
 
     def join(self, a, b):
-        return tuple(
-            domain.join(x, y)
-            for domain, x, y in zip(self.domains, a, b)
-        )
+        return a if a is b else self._join(a, b)
 
     def meet(self, a, b):
-        return tuple(
-            domain.meet(x, y)
-            for domain, x, y in zip(self.domains, a, b)
-        )
+        return a if a is b else self._meet(a, b)
 
     def update(self, a, b, widen=False):
-        return tuple(
-            domain.update(x, y, widen)
-            for domain, x, y in zip(self.domains, a, b)
-        )
+        if not widen:
+            return self.join(a, b)
+
+        res = list(a)
+        for i, domain in self._components:
+            res[i] = domain.update(a[i], b[i], True)
+        return tuple(res)
+
+    def widen(self, a, b, thresholds):
+        res = list(a)
+        for i, domain in self._components:
+            res[i] = domain.widen(a[i], b[i], thresholds)
+        return tuple(res)
 
     def lt(self, a, b):
-        return all(
-            domain.lt(x, y)
-            for domain, x, y in zip(self.domains, a, b)
-        )
+        return self._lt(a, b)
 
     def eq(self, a, b):
-        return all(
-            domain.eq(x, y)
-            for domain, x, y in zip(self.domains, a, b)
-        )
+        return a is b or self._eq(a, b)
 
     def split(self, elem, separator):
         def inner(elem, dimension):
@@ -448,9 +577,20 @@ class Product(AbstractDomain):
         )
 
     def generator(self):
-        return itertools.product(*(
-            dom.generator() for dom in self.domains
-        ))
+        """
+        Enumerates the elements of this product lazily, in the same order as
+        itertools.product, but without enumerating the whole domain of each
+        component beforehand (see BitsetLattice.generator).
+        """
+        def gen(i):
+            if i == len(self.domains):
+                yield ()
+            else:
+                for x in self.domains[i].generator():
+                    for rest in gen(i + 1):
+                        yield (x,) + rest
+
+        return gen(0)
 
     def concretize(self, abstract):
         return frozenset(itertools.product(*(
@@ -541,9 +681,13 @@ class Powerset(AbstractDomain):
         return self._merge([], res, merger) if changed else res
 
     def join(self, a, b):
+        if a is b:
+            return a
         return self._merge(a, b, self.dom.join)
 
     def meet(self, a, b):
+        if a is b:
+            return a
         return self._reduce(
             self.dom.meet(x, y)
             for x in a
@@ -556,17 +700,23 @@ class Powerset(AbstractDomain):
             lambda e_a, e_b: self.dom.update(e_a, e_b, widen)
         )
 
+    def widen(self, a, b, thresholds):
+        return self._merge(
+            a, b,
+            lambda e_a, e_b: self.dom.widen(e_a, e_b, thresholds)
+        )
+
     def le(self, a, b):
-        return all(any(
-            self.dom.le(x, y)
-            for y in b
-        ) for x in a)
+        return a is b or all(
+            any(x is y for y in b) or any(self.dom.le(x, y) for y in b)
+            for x in a
+        )
 
     def lt(self, a, b):
         return self.le(a, b) and not self.le(b, a)
 
     def eq(self, a, b):
-        return self.le(a, b) and self.le(b, a)
+        return a is b or (self.le(a, b) and self.le(b, a))
 
     def split(self, elem, separator):
         return self._reduce(
@@ -595,7 +745,15 @@ class FiniteLattice(AbstractDomain):
     """
     A general purpose finite lattice, to be constructed from a given
     "less than" relation.
+
+    Joins and meets are looked up in tables computed at construction if the
+    lattice has at most DENSE_TABLES_MAX_ELEMS elements. For bigger lattices,
+    they are computed on demand and kept in an LRU cache of CACHE_CAPACITY
+    entries.
     """
+    DENSE_TABLES_MAX_ELEMS = 64
+    CACHE_CAPACITY = 4096
+
     @staticmethod
     def _relations_count(lts):
         """
@@ -610,13 +768,13 @@ class FiniteLattice(AbstractDomain):
         Computes the transitive closure of the relation.
         """
         closed_lts = collections.defaultdict(set)
-        closed_lts.update(lts)
+        closed_lts.update((k, set(v)) for k, v in lts.iteritems())
 
         while True:
             init_size = FiniteLattice._relations_count(closed_lts)
             for k, lts in closed_lts.items():
                 closed_lts[k].add(k)
-                for r in lts:
+                for r in list(lts):
                     closed_lts[r].add(r)
                     closed_lts[k].update(closed_lts[r])
 
@@ -639,7 +797,7 @@ class FiniteLattice(AbstractDomain):
     @staticmethod
     def _subset_splitter(domain, elem, separator):
         without = elem - separator
-        if without in domain.lts[domain.bottom]:
+        if without in domain.lts:
             return [without]
         else:
             return []
@@ -649,11 +807,11 @@ class FiniteLattice(AbstractDomain):
         """
         Constructor that can build a finite lattice from the given elements.
         The "less than" relation will simply be the "is subset of" relation.
+
+        The lattice is never enumerated unless required (see BitsetLattice),
+        so that it can be used for large sets of elements.
         """
-        sets = powerset(xs)
-        return FiniteLattice({
-            k: {v for v in sets if k.issubset(v)} for k in sets
-        }, FiniteLattice._subset_splitter)
+        return BitsetLattice(xs)
 
     def __init__(self, lts, splitter):
         """
@@ -668,6 +826,25 @@ class FiniteLattice(AbstractDomain):
         self.top = self.greatest_among(self.lts.keys())
         self.splitter = splitter
 
+        elems = self.lts.keys()
+        if len(elems) <= FiniteLattice.DENSE_TABLES_MAX_ELEMS:
+            index = {x: i for i, x in enumerate(elems)}
+            join_table = [
+                [self._compute_join(a, b) for b in elems] for a in elems
+            ]
+            meet_table = [
+                [self._compute_meet(a, b) for b in elems] for a in elems
+            ]
+            self._join = lambda a, b: join_table[index[a]][index[b]]
+            self._meet = lambda a, b: meet_table[index[a]][index[b]]
+        else:
+            self._join = LRUCache(
+                self._compute_join, FiniteLattice.CACHE_CAPACITY
+            )
+            self._meet = LRUCache(
+                self._compute_meet, FiniteLattice.CACHE_CAPACITY
+            )
+
     def build(self, elem):
         """
         Returns the given element
@@ -681,12 +858,18 @@ class FiniteLattice(AbstractDomain):
     def size(self, x):
         return len(x)
 
-    def join(self, a, b):
+    def _compute_join(self, a, b):
         return self.lowest_among(self.lts[a] & self.lts[b])
 
-    def meet(self, a, b):
+    def _compute_meet(self, a, b):
         return self.greatest_among(self.inv_lts[a] & self.inv_lts[b])
 
+    def join(self, a, b):
+        return self._join(a, b)
+
+    def meet(self, a, b):
+        return self._meet(a, b)
+
     def update(self, a, b, widen=False):
         return self.top if widen else self.join(a, b)
 
@@ -712,6 +895,156 @@ class FiniteLattice(AbstractDomain):
         return "{{{}}}".format(", ".join(sorted(str(e) for e in x)))
 
 
+class _BitsetRelation(object):
+    """
+    The "less than" relation of a BitsetLattice (or its inverse), computed
+    on demand. Provides the same interface as the relation dicts of a
+    FiniteLattice.
+    """
+    def __init__(self, lattice, inverse):
+        """
+        :param BitsetLattice lattice: The lattice this relation is part of.
+        :param bool inverse: Whether this is the "greater than" relation.
+        """
+        self.lattice = lattice
+        self.inverse = inverse
+
+    def __contains__(self, elem):
+        return self.lattice.contains(elem)
+
+    def __getitem__(self, elem):
+        """
+        Returns the set of elements which are greater than (or less than
+        if the relation is inversed) the given element, by enumerating all
+        the submasks of the free bits.
+        """
+        mask = self.lattice.mask_of(elem)
+        free = mask if self.inverse else self.lattice.top_mask & ~mask
+        base = 0 if self.inverse else mask
+
+        res = set()
+        sub = free
+        while True:
+            res.add(self.lattice.elem_of(base | sub))
+            if sub == 0:
+                return res
+            sub = (sub - 1) & free
+
+    def keys(self):
+        return list(self.lattice.generator())
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def items(self):
+        return [(k, self[k]) for k in self.keys()]
+
+    def iteritems(self):
+        return iter(self.items())
+
+
+class BitsetLattice(FiniteLattice):
+    """
+    A finite lattice where elements are subsets of a given set of elements,
+    ordered by inclusion. Elements are frozensets, as in the finite lattices
+    built using FiniteLattice.of_subsets, but are internally represented by
+    integer bitmasks: join, meet and comparisons are bitwise operations, and
+    the "less than" relation is only enumerated when explicitly accessed.
+
+    Frozensets resulting from operations of this domain are interned, such
+    that equal elements are usually identical.
+    """
+    def __init__(self, elems):
+        """
+        :param iterable[object] elems: The elements of the top subset.
+        """
+        self.elems = list(elems)
+        self.bits = {x: 1 << i for i, x in enumerate(self.elems)}
+        self.top_mask = (1 << len(self.elems)) - 1
+        self.masks = {}
+        self.subsets = {}
+
+        self.bottom = self.elem_of(0)
+        self.top = self.elem_of(self.top_mask)
+        self.lts = _BitsetRelation(self, False)
+        self.inv_lts = _BitsetRelation(self, True)
+        self.splitter = BitsetLattice._bitset_splitter
+
+    @staticmethod
+    def _bitset_splitter(domain, elem, separator):
+        return [domain.elem_of(
+            domain.mask_of(elem) & ~domain.mask_of(separator)
+        )]
+
+    def mask_of(self, elem):
+        """
+        :param frozenset[object] elem: An element of this lattice.
+        :return: The bitmask representing this element.
+        :rtype: int
+        """
+        mask = self.masks.get(elem)
+        if mask is None:
+            mask = 0
+            for x in elem:
+                mask |= self.bits[x]
+            self.masks[elem] = mask
+            self.subsets.setdefault(mask, elem)
+        return mask
+
+    def elem_of(self, mask):
+        """
+        :param int mask: A bitmask representing an element of this lattice.
+        :return: The corresponding element.
+        :rtype: frozenset[object]
+        """
+        elem = self.subsets.get(mask)
+        if elem is None:
+            elem = frozenset(
+                x for x in self.elems if mask & self.bits[x] != 0
+            )
+            self.subsets[mask] = elem
+            self.masks[elem] = mask
+        return elem
+
+    def contains(self, elem):
+        """
+        :param frozenset[object] elem: A set of elements.
+        :return: True if the given set is an element of this lattice.
+        :rtype: bool
+        """
+        return elem in self.masks or all(x in self.bits for x in elem)
+
+    def join(self, a, b):
+        return self.elem_of(self.mask_of(a) | self.mask_of(b))
+
+    def meet(self, a, b):
+        return self.elem_of(self.mask_of(a) & self.mask_of(b))
+
+    def lt(self, a, b):
+        mask_a, mask_b = self.mask_of(a), self.mask_of(b)
+        return mask_a != mask_b and (mask_a & ~mask_b) == 0
+
+    def le(self, a, b):
+        return (self.mask_of(a) & ~self.mask_of(b)) == 0
+
+    def eq(self, a, b):
+        return a is b or a == b
+
+    def generator(self):
+        """
+        Enumerates the elements of this lattice lazily, by increasing
+        bitmask. The enumerated elements are not interned, so that
+        iterating over a part of a large lattice is cheap.
+        """
+        mask = 0
+        while mask <= self.top_mask:
+            elem = self.subsets.get(mask)
+            yield elem if elem is not None else frozenset(
+                x for x in self.elems if mask & self.bits[x] != 0
+            )
+            mask += 1
+
+
 class FiniteSubsetLattice(AbstractDomain):
     """
     A general purpose finite lattice where elements represent subsets
@@ -746,7 +1079,7 @@ class FiniteSubsetLattice(AbstractDomain):
         return a < b
 
     def eq(self, a, b):
-        return a == b
+        return a is b or a == b
 
     def split(self, elem, separator):
         return [elem - separator]
@@ -767,13 +1100,56 @@ class FiniteSubsetLattice(AbstractDomain):
         return "{{{}}}".format(", ".join(sorted(str(e) for e in x)))
 
 
+class _Segments(list):
+    """
+    The list of segments of a sparse array, which can hold the lookup index
+    computed for it by its SparseArray domain (see SparseArray.overlapping).
+    As any element of an abstract domain, it must not be mutated.
+    """
+    lookup = None
+
+
 class SparseArray(AbstractDomain):
-    def __init__(self, index_dom, elem_dom):
+    """
+    An abstract domain used to represent sets of arrays. Elements are lists
+    of (index, value) segments, where each segment describes the values that
+    the array can hold at the given indices. Indices that are not covered by
+    any segment do not hold any value.
+
+    When indices are one-dimensional intervals (i.e. the index domain is an
+    Intervals domain, or a Product of a single Intervals domain), the
+    elements returned by join, meet and optimized are normalized: segments
+    are sorted and do not overlap, adjacent segments holding equal values
+    are merged, and there are at most "max_segments" of them. Beyond that,
+    the closest segments are coarsened into one.
+
+    When the first dimension of indices is an interval, the elements
+    returned by this domain also carry a sorted index of their segments,
+    used to find the segments relevant to a given index (see overlapping).
+    """
+    def __init__(self, index_dom, elem_dom, max_segments=32):
         self.index_dom = index_dom
         self.elem_dom = elem_dom
         self.prod_dom = Product(index_dom, elem_dom)
-        self.bottom = []
-        self.top = [self.prod_dom.top]
+        self.bottom = _Segments()
+        self.top = _Segments([self.prod_dom.top])
+        self.max_segments = max_segments
+
+        self._is_wrapped = isinstance(index_dom, Product)
+        if isinstance(index_dom, Intervals):
+            self._first_dim_dom = index_dom
+        elif (self._is_wrapped and len(index_dom.domains) > 0 and
+                isinstance(index_dom.domains[0], Intervals)):
+            self._first_dim_dom = index_dom.domains[0]
+        else:
+            self._first_dim_dom = None
+
+        # Only set for one-dimensional interval indices.
+        self._interval_dom = (
+            self._first_dim_dom
+            if not self._is_wrapped or len(index_dom.domains) == 1
+            else None
+        )
 
     def build(self, elems):
         assert self.le(elems, self.top)
@@ -782,7 +1158,121 @@ class SparseArray(AbstractDomain):
     def size(self, x):
         return sum(self.prod_dom.size(e) for e in x)
 
+    def _sorted_segments(self, array):
+        """
+        Only available for one-dimensional interval indices.
+
+        Returns the segments of the given array as a list of (low, high,
+        value) triplets sorted by bounds, ignoring segments with empty
+        indices. Returns None if segments overlap.
+        """
+        interval_dom = self._interval_dom
+        segments = []
+        for idx, val in array:
+            bounds = idx[0] if self._is_wrapped else idx
+            if not interval_dom.is_empty(bounds):
+                segments.append((bounds[0], bounds[1], val))
+
+        segments.sort(key=lambda seg: seg[0])
+
+        for i in range(1, len(segments)):
+            if segments[i - 1][1] >= segments[i][0]:
+                return None
+
+        return segments
+
+    def _normalized(self, segments):
+        """
+        Only available for one-dimensional interval indices.
+
+        Converts sorted, non-overlapping (low, high, value) triplets into an
+        element of this domain, merging adjacent segments holding equal
+        values, and coarsening segments if there are too many of them.
+        """
+        elem_dom = self.elem_dom
+        merged = []
+        for seg in segments:
+            if len(merged) > 0:
+                lo, hi, val = merged[-1]
+                if hi + 1 == seg[0] and elem_dom.eq(val, seg[2]):
+                    merged[-1] = (lo, seg[1], val)
+                    continue
+            merged.append(seg)
+
+        while len(merged) > self.max_segments:
+            # Merge the two closest consecutive segments.
+            i = min(
+                range(len(merged) - 1),
+                key=lambda j: merged[j + 1][0] - merged[j][1]
+            )
+            lo, _, a = merged[i]
+            _, hi, b = merged[i + 1]
+            merged[i:i + 2] = [(lo, hi, elem_dom.join(a, b))]
+
+        if self._is_wrapped:
+            return _Segments(
+                (((lo, hi),), val) for lo, hi, val in merged
+            )
+        else:
+            return _Segments(((lo, hi), val) for lo, hi, val in merged)
+
+    def _combined(self, a, b, join):
+        """
+        Only available for one-dimensional interval indices.
+
+        Combines two lists of sorted, non-overlapping (low, high, value)
+        triplets in a single sweep, by computing the join (or the meet if
+        "join" is False) of the values at each index.
+        """
+        elem_dom = self.elem_dom
+        res = []
+        it_a, it_b = iter(a), iter(b)
+        cur_a, cur_b = next(it_a, None), next(it_b, None)
+
+        while cur_a is not None and cur_b is not None:
+            a_lo, a_hi, a_val = cur_a
+            b_lo, b_hi, b_val = cur_b
+
+            if a_lo < b_lo:
+                # The part of the first segment which lies before the other.
+                hi = min(a_hi, b_lo - 1)
+                if join:
+                    res.append((a_lo, hi, a_val))
+                cur_a = (next(it_a, None) if hi == a_hi
+                         else (hi + 1, a_hi, a_val))
+            elif b_lo < a_lo:
+                hi = min(b_hi, a_lo - 1)
+                if join:
+                    res.append((b_lo, hi, b_val))
+                cur_b = (next(it_b, None) if hi == b_hi
+                         else (hi + 1, b_hi, b_val))
+            else:
+                hi = min(a_hi, b_hi)
+                if join:
+                    res.append((a_lo, hi, elem_dom.join(a_val, b_val)))
+                else:
+                    val = elem_dom.meet(a_val, b_val)
+                    if not elem_dom.is_empty(val):
+                        res.append((a_lo, hi, val))
+                cur_a = (next(it_a, None) if hi == a_hi
+                         else (hi + 1, a_hi, a_val))
+                cur_b = (next(it_b, None) if hi == b_hi
+                         else (hi + 1, b_hi, b_val))
+
+        if join:
+            for cur, it in ((cur_a, it_a), (cur_b, it_b)):
+                if cur is not None:
+                    res.append(cur)
+                    res.extend(it)
+
+        return res
+
     def optimized(self, array):
+        if self._interval_dom is not None:
+            segments = self._sorted_segments(array)
+            if segments is not None:
+                return self._normalized(segments)
+
         for i, x in enumerate(array):
             for j in range(i + 1, len(array)):
                 y = array[j]
@@ -793,7 +1283,78 @@ class SparseArray(AbstractDomain):
                         ]
                     )
 
-        return array
+        return array if isinstance(array, _Segments) else _Segments(array)
+
+    def _lookup_of(self, array):
+        """
+        Returns the lookup index of the given array, computing it if needed,
+        or None if the array cannot be indexed.
+
+        The index consists of the (low, high, position) triplets of the
+        segments, sorted on the bounds of the first dimension of their
+        indices, the list of their lower bounds, and the prefix maximums of
+        their upper bounds.
+        """
+        if self._first_dim_dom is None or not isinstance(array, _Segments):
+            return None
+
+        if array.lookup is None:
+            entries = []
+            for pos, (idx, _) in enumerate(array):
+                bounds = idx[0] if self._is_wrapped else idx
+                if not self._first_dim_dom.is_empty(bounds):
+                    entries.append((bounds[0], bounds[1], pos))
+            entries.sort()
+
+            max_highs = []
+            for _, hi, _ in entries:
+                max_highs.append(
+                    hi if len(max_highs) == 0 else max(hi, max_highs[-1])
+                )
+
+            array.lookup = ([lo for lo, _, _ in entries], max_highs, entries)
+
+        return array.lookup
+
+    def overlapping(self, array, index):
+        """
+        Returns the positions, in increasing order, of the segments of the
+        given array whose indices meet the given index.
+
+        This is logarithmic in the number of segments for one-dimensional
+        interval indices, as segments do not overlap. For other indices whose
+        first dimension is an interval, only the segments which overlap the
+        index on that dimension are inspected.
+        """
+        index_dom = self.index_dom
+        lookup = self._lookup_of(array)
+
+        if lookup is None:
+            return [
+                pos
+                for pos, (idx, _) in enumerate(array)
+                if not index_dom.is_empty(index_dom.meet(index, idx))
+            ]
+
+        bounds = index[0] if self._is_wrapped else index
+        if self._first_dim_dom.is_empty(bounds):
+            return []
+
+        lows, max_highs, entries = lookup
+        res = []
+        k = bisect.bisect_right(lows, bounds[1]) - 1
+        while k >= 0 and max_highs[k] >= bounds[0]:
+            _, hi, pos = entries[k]
+            if hi >= bounds[0] and (
+                    self._interval_dom is not None or
+                    not index_dom.is_empty(
+                        index_dom.meet(index, array[pos][0])
+                    )):
+                res.append(pos)
+            k -= 1
+
+        res.sort()
+        return res
 
     def _join_elem(self, x, elem):
         # Filter out elements that would be absorbed anyway.
@@ -829,19 +1390,33 @@ class SparseArray(AbstractDomain):
         return res
 
     def join(self, a, b):
+        if a is b:
+            return a
+        elif self._interval_dom is not None:
+            seg_a, seg_b = self._sorted_segments(a), self._sorted_segments(b)
+            if seg_a is not None and seg_b is not None:
+                return self._normalized(self._combined(seg_a, seg_b, True))
+
         return self.optimized(reduce(self._join_elem, b, a))
 
     def meet(self, a, b):
+        if a is b:
+            return a
+        elif self._interval_dom is not None:
+            seg_a, seg_b = self._sorted_segments(a), self._sorted_segments(b)
+            if seg_a is not None and seg_b is not None:
+                return self._normalized(self._combined(seg_a, seg_b, False))
+
         res = []
         for e_a in a:
             for e_b in b:
                 meet = self.prod_dom.meet(e_a, e_b)
                 if not self.prod_dom.is_empty(meet):
                     res.append(meet)
-        return res
+        return _Segments(res)
 
     def le(self, a, b):
-        return all(
+        return a is b or all(
             any(
                 self.prod_dom.le(x, y)
                 for y in b
@@ -867,8 +1442,10 @@ class SparseArray(AbstractDomain):
         return all(self.elem_dom.eq(v, value) for _, v in meets)
 
     def eq(self, a, b):
-        return (all(self._has_value_at(b, i, v) for i, v in a) and
-                all(self._has_value_at(a, i, v) for i, v in b))
+        return a is b or (
+            all(self._has_value_at(b, i, v) for i, v in a) and
+            all(self._has_value_at(a, i, v) for i, v in b)
+        )
 
     def split(self, x, separator):
         raise NotImplementedError
@@ -951,6 +1528,17 @@ class SparseArray(AbstractDomain):
         ))
 
 
+def _access_path(kind_name, *args):
+    """
+    Rebuilds an unpickled access path (see AccessPath.__reduce__).
+
+    :param str kind_name: The name of the class of the access path.
+    :param *object args: The arguments the access path was built with.
+    :rtype: AccessPathsLattice.AccessPath
+    """
+    return getattr(AccessPathsLattice, kind_name)(*args)
+
+
 class AccessPathsLattice(AbstractDomain):
     class NullDeref(LookupError):
         pass
@@ -961,7 +1549,54 @@ class AccessPathsLattice(AbstractDomain):
     class BottomValue(LookupError):
         pass
 
+    # The kinds of access paths.
+    NO_PATH, NULL, NON_NULL, ADDRESS, PRODUCT_GET, ALL_PATH = range(6)
+
+    # _LT[a][b] is True iff any path of kind a is less than any path of
+    # kind b. Two paths of kind PRODUCT_GET are compared by their prefixes.
+    _LT = (
+        (False, True, True, True, True, True),
+        (False, False, False, False, False, True),
+        (False, False, False, False, False, True),
+        (False, False, True, False, False, True),
+        (False, False, True, False, False, True),
+        (False, False, False, False, False, False),
+    )
+
     class AccessPath(object):
+        """
+        Access paths are interned: constructing an access path equal to an
+        existing one returns the existing object. Equality is therefore
+        identity, and hashes are computed only once.
+
+        Each access path has a kind (see AccessPathsLattice.NO_PATH, etc.),
+        and a depth, which is the number of components accessed through it.
+        """
+        kind = None
+        depth = 0
+        _interned = weakref.WeakValueDictionary()
+
+        def __new__(cls, *args):
+            key = (cls,) + args
+            interned = AccessPathsLattice.AccessPath._interned
+            path = interned.get(key)
+            if path is None:
+                path = object.__new__(cls)
+                path._hash = hash(key)
+                path._args = args
+                path._init(*args)
+                interned[key] = path
+            return path
+
+        def _init(self, *args):
+            pass
+
+        def __reduce__(self):
+            # Access path classes are nested, therefore they cannot be
+            # pickled by reference. Unpickled (or copied) paths are rebuilt
+            # from their arguments, so that they are interned as well.
+            return _access_path, (type(self).__name__,) + self._args
+
         def size(self):
             raise NotImplementedError
 
@@ -981,13 +1616,16 @@ class AccessPathsLattice(AbstractDomain):
             raise NotImplementedError
 
         def __eq__(self, other):
-            raise NotImplementedError
+            return self is other
+
+        def __ne__(self, other):
+            return self is not other
 
         def __lt__(self, other):
-            raise NotImplementedError
+            return AccessPathsLattice._LT[self.kind][other.kind]
 
         def __le__(self, other):
-            return self < other or self == other
+            return self is other or self < other
 
         def __gt__(self, other):
             return other < self
@@ -1002,11 +1640,10 @@ class AccessPathsLattice(AbstractDomain):
             raise NotImplementedError
 
         def __hash__(self):
-            raise NotImplementedError
+            return self._hash
 
     class AllPath(AccessPath):
-        def __init__(self):
-            pass
+        kind = 5  # ALL_PATH
 
         def size(self):
             return float('inf')
@@ -1023,18 +1660,12 @@ class AccessPathsLattice(AbstractDomain):
         def __and__(self, other):
             return other
 
-        def __eq__(self, other):
-            return isinstance(other, AccessPathsLattice.AllPath)
-
-        def __lt__(self, other):
-            return False
-
         def split(self, separator):
-            if isinstance(separator, AccessPathsLattice.NonNull):
+            if separator.kind == AccessPathsLattice.NON_NULL:
                 return [AccessPathsLattice.Null()]
-            elif isinstance(separator, AccessPathsLattice.Null):
+            elif separator.kind == AccessPathsLattice.NULL:
                 return [AccessPathsLattice.NonNull()]
-            elif isinstance(separator, AccessPathsLattice.AllPath):
+            elif separator.kind == AccessPathsLattice.ALL_PATH:
                 return []
             else:
                 return [self]
@@ -1042,15 +1673,11 @@ class AccessPathsLattice(AbstractDomain):
         def touches(self, other):
             return False
 
-        def __hash__(self):
-            return hash(())
-
         def __str__(self):
             return "[all-path]"
 
     class Null(AccessPath):
-        def __init__(self):
-            pass
+        kind = 1  # NULL
 
         def size(self):
             return 1
@@ -1062,44 +1689,33 @@ class AccessPathsLattice(AbstractDomain):
             raise AccessPathsLattice.NullDeref
 
         def __or__(self, other):
-            if (isinstance(other, AccessPathsLattice.Null) or
-                    isinstance(other, AccessPathsLattice.BottomValue)):
+            if other.kind <= AccessPathsLattice.NULL:
                 return self
             else:
                 return AccessPathsLattice.AllPath()
 
         def __and__(self, other):
-            if (isinstance(other, AccessPathsLattice.Null) or
-                    isinstance(other, AccessPathsLattice.AllPath)):
+            if (other.kind == AccessPathsLattice.NULL or
+                    other.kind == AccessPathsLattice.ALL_PATH):
                 return self
             else:
                 return AccessPathsLattice.NoPath()
 
-        def __eq__(self, other):
-            return isinstance(other, AccessPathsLattice.Null)
-
-        def __lt__(self, other):
-            return isinstance(other, AccessPathsLattice.AllPath)
-
         def split(self, separator):
-            if (isinstance(separator, AccessPathsLattice.Null) or
-                    isinstance(separator, AccessPathsLattice.AllPath)):
+            if (separator.kind == AccessPathsLattice.NULL or
+                    separator.kind == AccessPathsLattice.ALL_PATH):
                 return []
             else:
                 return [self]
 
         def touches(self, other):
-            return isinstance(other, AccessPathsLattice.NonNull)
-
-        def __hash__(self):
-            return hash(())
+            return other.kind == AccessPathsLattice.NON_NULL
 
         def __str__(self):
             return "null"
 
     class NonNull(AccessPath):
-        def __init__(self):
-            pass
+        kind = 2  # NON_NULL
 
         def size(self):
             return float('inf')
@@ -1111,70 +1727,48 @@ class AccessPathsLattice(AbstractDomain):
             raise AccessPathsLattice.TopValue
 
         def __or__(self, other):
-            if (isinstance(other, AccessPathsLattice.Null) or
-                    isinstance(other, AccessPathsLattice.AllPath)):
+            if (other.kind == AccessPathsLattice.NULL or
+                    other.kind == AccessPathsLattice.ALL_PATH):
                 return AccessPathsLattice.AllPath()
             else:
                 return self
 
         def __and__(self, other):
-            if (isinstance(other, AccessPathsLattice.NonNull) or
-                    isinstance(other, AccessPathsLattice.AllPath)):
+            if (other.kind == AccessPathsLattice.NON_NULL or
+                    other.kind == AccessPathsLattice.ALL_PATH):
                 return self
-            elif (isinstance(other, AccessPathsLattice.Address) or
-                  isinstance(other, AccessPathsLattice.ProductGet)):
+            elif (other.kind == AccessPathsLattice.ADDRESS or
+                  other.kind == AccessPathsLattice.PRODUCT_GET):
                 return other
             else:
                 return AccessPathsLattice.NoPath()
 
-        def __eq__(self, other):
-            return isinstance(other, AccessPathsLattice.NonNull)
-
-        def __lt__(self, other):
-            return isinstance(other, AccessPathsLattice.AllPath)
-
         def split(self, separator):
-            if (isinstance(separator, AccessPathsLattice.AllPath) or
-                    isinstance(separator, AccessPathsLattice.NonNull)):
+            if (separator.kind == AccessPathsLattice.ALL_PATH or
+                    separator.kind == AccessPathsLattice.NON_NULL):
                 return []
             else:
                 return [self]
 
         def touches(self, other):
-            return isinstance(other, AccessPathsLattice.Null)
-
-        def __hash__(self):
-            return hash(())
+            return other.kind == AccessPathsLattice.NULL
 
         def __str__(self):
             return "[non-null]"
 
-    class Address(AccessPath):
-        def __init__(self, val, dom):
-            self.val = val
-            self.dom = dom
-
-        def size(self):
-            return 1
-
-        def access(self, state):
-            if self.val in state[0]:
-                return state[0][self.val][1]
-            else:
-                raise AccessPathsLattice.TopValue
-
-        def inv_access(self, state, value):
-            state[0][self.val] = (self.dom, value)
-
+    class Location(AccessPath):
+        """
+        Base class for access paths which designate a single location.
+        """
         def __or__(self, other):
             if self <= other:
                 return other
             elif other < self:
                 return self
-            elif (isinstance(other, AccessPathsLattice.Address) or
-                  isinstance(other, AccessPathsLattice.ProductGet)):
+            elif (other.kind == AccessPathsLattice.ADDRESS or
+                  other.kind == AccessPathsLattice.PRODUCT_GET):
                 return AccessPathsLattice.NonNull()
-            elif isinstance(other, AccessPathsLattice.Null):
+            elif other.kind == AccessPathsLattice.NULL:
                 return AccessPathsLattice.AllPath()
             else:
                 return self
@@ -1187,20 +1781,10 @@ class AccessPathsLattice(AbstractDomain):
             else:
                 return AccessPathsLattice.NoPath()
 
-        def __eq__(self, other):
-            return (isinstance(other, AccessPathsLattice.Address) and
-                    self.val == other.val and self.dom == other.dom)
-
-        def __lt__(self, other):
-            if (isinstance(other, AccessPathsLattice.NonNull) or
-                    isinstance(other, AccessPathsLattice.AllPath)):
-                return True
-            return False
-
         def split(self, separator):
-            if (isinstance(separator, AccessPathsLattice.NonNull) or
-                    isinstance(separator, AccessPathsLattice.AllPath) or
-                    self == separator):
+            if (separator.kind == AccessPathsLattice.NON_NULL or
+                    separator.kind == AccessPathsLattice.ALL_PATH or
+                    self is separator):
                 return []
             else:
                 return [self]
@@ -1208,20 +1792,40 @@ class AccessPathsLattice(AbstractDomain):
         def touches(self, other):
             return False
 
-        def __hash__(self):
-            return hash((self.val, self.dom))
+    class Address(Location):
+        kind = 3  # ADDRESS
+
+        def _init(self, val, dom):
+            self.val = val
+            self.dom = dom
+
+        def size(self):
+            return 1
+
+        def access(self, state):
+            if self.val in state[0]:
+                return state[0][self.val][1]
+            else:
+                raise AccessPathsLattice.TopValue
+
+        def inv_access(self, state, value):
+            state[0] = state[0].set(self.val, (self.dom, value))
 
         def __str__(self):
             return "0x{}".format(format(self.val, '08x'))
 
-    class ProductGet(AccessPath):
-        def __init__(self, prefix, component, dom):
+    class ProductGet(Location):
+        kind = 4  # PRODUCT_GET
+
+        def _init(self, prefix, component, dom):
             self.prefix = prefix
             self.component = component
             self.dom = dom
+            self.depth = prefix.depth + 1
+            self._size = prefix.size()
 
         def size(self):
-            return self.prefix.size()
+            return self._size
 
         def access(self, state):
             return self.prefix.access(state)[self.component]
@@ -1238,63 +1842,19 @@ class AccessPathsLattice(AbstractDomain):
                 for i, x in enumerate(self.prefix.access(state))
             ))
 
-        def __or__(self, other):
-            if self <= other:
-                return other
-            elif other < self:
-                return self
-            elif (isinstance(other, AccessPathsLattice.Address) or
-                  isinstance(other, AccessPathsLattice.ProductGet)):
-                return AccessPathsLattice.NonNull()
-            elif isinstance(other, AccessPathsLattice.Null):
-                return AccessPathsLattice.AllPath()
-            else:
-                return self
-
-        def __and__(self, other):
-            if self <= other:
-                return self
-            elif other < self:
-                return other
-            else:
-                return AccessPathsLattice.NoPath()
-
-        def __eq__(self, other):
-            return (isinstance(other, AccessPathsLattice.ProductGet) and
-                    self.prefix == other.prefix and
-                    self.component == other.component and
-                    self.dom == other.dom)
-
         def __lt__(self, other):
-            if (isinstance(other, AccessPathsLattice.NonNull) or
-                    isinstance(other, AccessPathsLattice.AllPath)):
-                return True
-            elif (isinstance(other, AccessPathsLattice.ProductGet) and
-                  self.component == other.component and
-                  self.dom == other.dom):
-                return self.prefix < other.prefix
-            return False
-
-        def split(self, separator):
-            if (isinstance(separator, AccessPathsLattice.NonNull) or
-                    isinstance(separator, AccessPathsLattice.AllPath) or
-                    self == separator):
-                return []
-            else:
-                return [self]
-
-        def touches(self, other):
-            return False
+            a, b = self, other
+            while (a.kind == b.kind == AccessPathsLattice.PRODUCT_GET and
+                   a.component == b.component and a.dom == b.dom):
+                a, b = a.prefix, b.prefix
 
-        def __hash__(self):
-            return hash((self.prefix, self.component, self.dom))
+            return AccessPathsLattice._LT[a.kind][b.kind]
 
         def __str__(self):
             return "Get_{}({})".format(self.component, self.prefix)
 
     class NoPath(AccessPath):
-        def __init__(self):
-            pass
+        kind = 0  # NO_PATH
 
         def size(self):
             return 0
@@ -1311,21 +1871,12 @@ class AccessPathsLattice(AbstractDomain):
         def __and__(self, other):
             return self
 
-        def __eq__(self, other):
-            return isinstance(other, AccessPathsLattice.NoPath)
-
-        def __hash__(self):
-            return hash(())
-
         def split(self, separator):
             return []
 
         def touches(self, other):
             return True
 
-        def __lt__(self, other):
-            return not isinstance(other, AccessPathsLattice.NoPath)
-
         def __str__(self):
             return "[no-path]"
 
@@ -1352,7 +1903,7 @@ class AccessPathsLattice(AbstractDomain):
         return a < b
 
     def eq(self, a, b):
-        return a == b
+        return a is b
 
     def le(self, a, b):
         return a <= b
@@ -1377,70 +1928,84 @@ class AccessPathsLattice(AbstractDomain):
 
 
 class RandomAccessMemory(AbstractDomain):
+    """
+    Abstracts a memory which maps indices to elements of arbitrary domains.
+    An element is a pair made of a PersistentMap, mapping each index to a
+    pair (domain, element of that domain), and of an offset. Indices that are
+    not mapped are unconstrained.
+
+    Since memories are persistent, memories derived from one another share
+    most of their structure, which joins and comparisons take advantage of.
+    """
+    class _IncompatibleDomains(Exception):
+        pass
+
     def __init__(self):
         self.bottom = object()
-        self.top = ({}, 0)
+        self.top = (PersistentMap(), 0)
 
     def build(self, args):
         assert isinstance(args, dict)
-        return args, 0
+        return PersistentMap(args), 0
 
     def size(self, x):
-        return 0 if x == self.bottom or any(
-            dom.is_empty(elem) for dom, elem in x[0].values()
+        return 0 if x is self.bottom or any(
+            dom.is_empty(elem) for dom, elem in x[0].itervalues()
         ) else float('inf')
 
+    @staticmethod
+    def _join_entries(x, y):
+        if x[0] == y[0]:
+            return x[0], x[0].join(x[1], y[1])
+        return None
+
+    @staticmethod
+    def _widen_entries(x, y):
+        if x[0] == y[0]:
+            return x[0], x[0].update(x[1], y[1], True)
+        return None
+
+    @staticmethod
+    def _meet_entries(x, y):
+        if x[0] == y[0]:
+            return x[0], x[0].meet(x[1], y[1])
+        raise RandomAccessMemory._IncompatibleDomains
+
     def join(self, a, b):
-        if a == self.bottom:
+        if a is self.bottom or a is b:
             return b
-        elif b == self.bottom:
+        elif b is self.bottom:
             return a
         elif a[1] != b[1]:
             raise NotImplementedError
         else:
-            res = {}
-            dct = zip_dicts(a[0], b[0], False)
-            for k, ((x_dom, x_elem), (y_dom, y_elem)) in dct.iteritems():
-                if x_dom == y_dom:
-                    res[k] = (x_dom, x_dom.join(x_elem, y_elem))
-            return res, a[1]
+            return a[0].intersection_with(b[0], self._join_entries), a[1]
 
     def meet(self, a, b):
-        if a == self.bottom or b == self.bottom:
+        if a is self.bottom or b is self.bottom:
             return self.bottom
+        elif a is b:
+            return a
         elif a[1] != b[1]:
             raise NotImplementedError
         else:
-            res = {}
-            dct = zip_dicts(a[0], b[0], True)
-
-            for k, (x, y) in dct.iteritems():
-                if x is None:
-                    res[k] = y
-                elif y is None:
-                    res[k] = x
-                elif x[0] == y[0]:
-                    res[k] = (x[0], x[0].meet(x[1], y[1]))
-                else:
-                    return self.bottom
-
-            return res, a[1]
+            try:
+                return a[0].union_with(b[0], self._meet_entries), a[1]
+            except RandomAccessMemory._IncompatibleDomains:
+                return self.bottom
 
     def update(self, a, b, widen=False):
         if widen:
-            if a == self.bottom:
+            if a is self.bottom or a is b:
                 return b
-            elif b == self.bottom:
+            elif b is self.bottom:
                 return a
             elif a[1] != b[1]:
                 raise NotImplementedError
             else:
-                res = {}
-                dct = zip_dicts(a[0], b[0], False)
-                for k, ((x_dom, x_elem), (y_dom, y_elem)) in dct.iteritems():
-                    if x_dom == y_dom:
-                        res[k] = (x_dom, x_dom.update(x_elem, y_elem, True))
-                return res, a[1]
+                return a[0].intersection_with(
+                    b[0], self._widen_entries
+                ), a[1]
         else:
             return self.join(a, b)
 
@@ -1448,16 +2013,17 @@ class RandomAccessMemory(AbstractDomain):
         return self.le(a, b) and not self.eq(a, b)
 
     def eq(self, a, b):
-        if a == self.bottom:
-            return b == self.bottom
+        if a is b:
+            return True
+        elif a is self.bottom or b is self.bottom:
+            return False
         elif a[1] != b[1]:
             return NotImplementedError
         else:
-            return len(a[0]) == len(b[0]) and all(
-                (i in b[0] and
-                 b[0][i][0] == x_dom and
-                 x_dom.eq(x_elem, b[0][i][1]))
-                for i, (x_dom, x_elem) in a[0].iteritems()
+            return a[0].forall_common(
+                b[0],
+                lambda x, y: x[0] == y[0] and x[0].eq(x[1], y[1]),
+                True
             )
 
     def le(self, a, b):
@@ -1465,13 +2031,14 @@ class RandomAccessMemory(AbstractDomain):
             return a != self.top
         elif a == self.top:
             return False
+        elif a is b:
+            return True
         elif a[1] != b[1]:
             return NotImplementedError
         else:
-            return all(
-                x_dom == b[0][i][0] and x_dom.le(x_elem, b[0][i][1])
-                if i in b[0] else True
-                for i, (x_dom, x_elem) in a[0].iteritems()
+            return a[0].forall_common(
+                b[0],
+                lambda x, y: x[0] == y[0] and x[0].le(x[1], y[1])
             )
 
     def split(self, elem, separator):
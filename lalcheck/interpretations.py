@@ -17,6 +17,8 @@ from lalcheck.utils import Transformer
 from lalcheck import types
 from lalcheck import domains
 
+from funcy.calc import memoize
+
 
 class TypeInterpretation(object):
     """
@@ -25,7 +27,8 @@ class TypeInterpretation(object):
     represent elements of the type, the implementation of the different
     operations available for that type, etc.
     """
-    def __init__(self, domain, def_provider, builder):
+    def __init__(self, domain, def_provider, builder,
+                 batch_def_provider=None):
         """
         :param domains.AbstractDomain domain: The abstract domain used to
             represent the type.
@@ -36,10 +39,17 @@ class TypeInterpretation(object):
 
         :param function builder: A function used to build elements of the
             domain from literal values.
+
+        :param (Signature->function) | None batch_def_provider: A function
+            which can be called with the signature of a definition to
+            retrieve its batched version, if any. A batched definition takes
+            a list of values for each argument, and returns the list of the
+            results of the definition applied to each tuple of arguments.
         """
         self.domain = domain
         self.def_provider = def_provider
         self.builder = builder
+        self.batch_def_provider = batch_def_provider
 
 
 TypeInterpreter = Transformer
@@ -235,91 +245,130 @@ def default_char_interpreter(int_range_interpreter):
         return TypeInterpretation(
             int_interp.domain,
             int_interp.def_provider,
-            builder
+            builder,
+            int_interp.batch_def_provider
         )
 
     return is_char_tpe >> int_range_interpreter >> char_interpreter
 
 
+@memoize
+def _int_range_interpretation(frm, to):
+    """
+    Interns the interpretation of integer ranges: all the ranges that have
+    the same bounds share the same domain and definitions.
+
+    :param int frm: The lower bound of the range.
+    :param int to: The upper bound of the range.
+    :rtype: TypeInterpretation
+    """
+    int_dom = domains.Intervals(frm, to)
+    bool_dom = boolean_ops.Boolean
+
+    un_fun_sig = _signer((int_dom,), int_dom)
+    bin_fun_sig = _signer((int_dom, int_dom), int_dom)
+    bin_rel_sig = _signer((int_dom, int_dom), bool_dom)
+
+    defs = {
+        bin_fun_sig(ops.PLUS): (
+            interval_ops.add_no_wraparound(int_dom),
+            interval_ops.inv_add_no_wraparound(int_dom)
+        ),
+        bin_fun_sig(ops.MINUS): (
+            interval_ops.sub_no_wraparound(int_dom),
+            interval_ops.inv_sub_no_wraparound(int_dom)
+        ),
+
+        un_fun_sig(ops.NEG): (
+            interval_ops.negate(int_dom), interval_ops.negate(int_dom)
+        ),
+
+        bin_rel_sig(ops.LT): (
+            interval_ops.lt(int_dom), interval_ops.inv_lt(int_dom)
+        ),
+        bin_rel_sig(ops.LE): (
+            interval_ops.le(int_dom), interval_ops.inv_le(int_dom)
+        ),
+        bin_rel_sig(ops.EQ): (
+            interval_ops.eq(int_dom), interval_ops.inv_eq(int_dom)
+        ),
+        bin_rel_sig(ops.NEQ): (
+            interval_ops.neq(int_dom), interval_ops.inv_neq(int_dom)
+        ),
+        bin_rel_sig(ops.GE): (
+            interval_ops.ge(int_dom), interval_ops.inv_ge(int_dom)
+        ),
+        bin_rel_sig(ops.GT): (
+            interval_ops.gt(int_dom), interval_ops.inv_gt(int_dom)
+        )
+    }
+
+    batch_defs = {
+        bin_fun_sig(ops.PLUS): interval_ops.batch_add_no_wraparound(int_dom),
+        bin_fun_sig(ops.MINUS): interval_ops.batch_sub_no_wraparound(int_dom),
+        un_fun_sig(ops.NEG): interval_ops.batch_negate(int_dom),
+        bin_rel_sig(ops.LT): interval_ops.batch_lt(int_dom),
+        bin_rel_sig(ops.LE): interval_ops.batch_le(int_dom),
+        bin_rel_sig(ops.EQ): interval_ops.batch_eq(int_dom),
+        bin_rel_sig(ops.NEQ): interval_ops.batch_neq(int_dom),
+        bin_rel_sig(ops.GE): interval_ops.batch_ge(int_dom),
+        bin_rel_sig(ops.GT): interval_ops.batch_gt(int_dom)
+    }
+
+    builder = interval_ops.lit(int_dom)
+
+    return TypeInterpretation(
+        int_dom,
+        dict_to_provider(defs),
+        builder,
+        dict_to_provider(batch_defs)
+    )
+
+
 @type_interpreter
 def default_int_range_interpreter(tpe):
     if tpe.is_a(types.IntRange):
-        int_dom = domains.Intervals(tpe.frm, tpe.to)
-        bool_dom = boolean_ops.Boolean
-
-        un_fun_sig = _signer((int_dom,), int_dom)
-        bin_fun_sig = _signer((int_dom, int_dom), int_dom)
-        bin_rel_sig = _signer((int_dom, int_dom), bool_dom)
+        return _int_range_interpretation(tpe.frm, tpe.to)
 
-        defs = {
-            bin_fun_sig(ops.PLUS): (
-                interval_ops.add_no_wraparound(int_dom),
-                interval_ops.inv_add_no_wraparound(int_dom)
-            ),
-            bin_fun_sig(ops.MINUS): (
-                interval_ops.sub_no_wraparound(int_dom),
-                interval_ops.inv_sub_no_wraparound(int_dom)
-            ),
 
-            un_fun_sig(ops.NEG): (
-                interval_ops.negate(int_dom), interval_ops.negate(int_dom)
-            ),
+@memoize
+def _enum_interpretation(lits):
+    """
+    Interns the interpretation of enum types: all the enum types that have
+    the same set of literals share the same domain and definitions.
 
-            bin_rel_sig(ops.LT): (
-                interval_ops.lt(int_dom), interval_ops.inv_lt(int_dom)
-            ),
-            bin_rel_sig(ops.LE): (
-                interval_ops.le(int_dom), interval_ops.inv_le(int_dom)
-            ),
-            bin_rel_sig(ops.EQ): (
-                interval_ops.eq(int_dom), interval_ops.inv_eq(int_dom)
-            ),
-            bin_rel_sig(ops.NEQ): (
-                interval_ops.neq(int_dom), interval_ops.inv_neq(int_dom)
-            ),
-            bin_rel_sig(ops.GE): (
-                interval_ops.ge(int_dom), interval_ops.inv_ge(int_dom)
-            ),
-            bin_rel_sig(ops.GT): (
-                interval_ops.gt(int_dom), interval_ops.inv_gt(int_dom)
-            )
-        }
+    :param frozenset[str] lits: The literals of the enum type.
+    :rtype: TypeInterpretation
+    """
+    enum_dom = domains.FiniteLattice.of_subsets(lits)
+    bool_dom = boolean_ops.Boolean
+
+    bin_rel_sig = _signer((enum_dom, enum_dom), bool_dom)
+
+    defs = {
+        bin_rel_sig(ops.EQ): (
+            finite_lattice_ops.eq(enum_dom),
+            finite_lattice_ops.inv_eq(enum_dom)
+        ),
+        bin_rel_sig(ops.NEQ): (
+            finite_lattice_ops.neq(enum_dom),
+            finite_lattice_ops.inv_neq(enum_dom)
+        )
+    }
 
-        builder = interval_ops.lit(int_dom)
+    builder = finite_lattice_ops.lit(enum_dom)
 
-        return TypeInterpretation(
-            int_dom,
-            dict_to_provider(defs),
-            builder
-        )
+    return TypeInterpretation(
+        enum_dom,
+        dict_to_provider(defs),
+        builder
+    )
 
 
 @type_interpreter
 def default_enum_interpreter(tpe):
     if tpe.is_a(types.Enum):
-        enum_dom = domains.FiniteLattice.of_subsets(set(tpe.lits))
-        bool_dom = boolean_ops.Boolean
-
-        bin_rel_sig = _signer((enum_dom, enum_dom), bool_dom)
-
-        defs = {
-            bin_rel_sig(ops.EQ): (
-                finite_lattice_ops.eq(enum_dom),
-                finite_lattice_ops.inv_eq(enum_dom)
-            ),
-            bin_rel_sig(ops.NEQ): (
-                finite_lattice_ops.neq(enum_dom),
-                finite_lattice_ops.inv_neq(enum_dom)
-            )
-        }
-
-        builder = finite_lattice_ops.lit(enum_dom)
-
-        return TypeInterpretation(
-            enum_dom,
-            dict_to_provider(defs),
-            builder
-        )
+        return _enum_interpretation(frozenset(tpe.lits))
 
 
 def default_simple_pointer_interpreter(inner_interpreter):
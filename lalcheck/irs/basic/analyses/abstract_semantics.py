@@ -5,10 +5,14 @@ An analyzer that collects semantics at each program point.
 from lalcheck.irs.basic.tools import (
     CFGBuilder,
     ExprEvaluator,
-    ExprSolver
+    ExprBatchEvaluator,
+    ExprSolver,
+    ExprBatchSolver
 )
 
-from lalcheck.irs.basic.tree import Variable
+from lalcheck.irs.basic.tree import (
+    Variable, Lit, AssignStmt, AssumeStmt, ReadStmt
+)
 from lalcheck.irs.basic.tools import PrettyPrinter
 from lalcheck.irs.basic.purpose import SyntheticVariable
 from lalcheck.irs.basic import visitors
@@ -30,11 +34,44 @@ def updated_state(state, var, value):
 
 
 class _VarTracker(visitors.CFGNodeVisitor):
-    def __init__(self, var_set, vars_domain, evaluator, c_solver):
+    def __init__(self, var_set, vars_domain, evaluator, c_solver,
+                 batch_evaluator, batch_c_solver):
         self.vars = var_set
         self.evaluator = evaluator
         self.constr_solver = c_solver
         self.vars_domain = vars_domain
+        self.batch_evaluator = batch_evaluator
+        self.batch_constr_solver = batch_c_solver
+
+    def visit_all(self, node, states):
+        """
+        Returns the result of visiting the given node in each of the given
+        states. Assignments, assumptions and reads are handled in all states
+        at once.
+        """
+        if len(states) <= 1:
+            return [node.visit(self, state) for state in states]
+        elif isinstance(node, AssignStmt):
+            return [
+                updated_state(state, node.id.var, value)
+                for state, value in zip(
+                    states, self.batch_evaluator.eval(node.expr, states)
+                )
+            ]
+        elif isinstance(node, AssumeStmt):
+            bottom = self.vars_domain.bottom
+            return [
+                new_state if success else bottom
+                for new_state, success in self.batch_constr_solver.solve(
+                    node.expr, states
+                )
+            ]
+        elif isinstance(node, ReadStmt):
+            top = self.evaluator.model[node.id.var].domain.top
+            return [
+                updated_state(state, node.id.var, top) for state in states
+            ]
+        return [node.visit(self, state) for state in states]
 
     def visit_assign(self, assign, state):
         return updated_state(
@@ -164,10 +201,12 @@ class UnknownTargetCallStrategy(ExternalCallStrategy):
 
 
 class TopDownCallStrategy(KnownTargetCallStrategy):
-    def __init__(self, progs, get_model, get_merge_pred_builder):
+    def __init__(self, progs, get_model, get_merge_pred_builder,
+                 widening=None):
         super(TopDownCallStrategy, self).__init__(progs)
         self.get_model = get_model
         self.get_merge_pred_builder = get_merge_pred_builder
+        self.widening = widening
 
     def _get_provider(self, sig, prog):
         def f(*args):
@@ -182,7 +221,8 @@ class TopDownCallStrategy(KnownTargetCallStrategy):
                 prog,
                 model,
                 self.get_merge_pred_builder(),
-                arg_values
+                arg_values,
+                self.widening
             )
 
             envs = [
@@ -361,20 +401,204 @@ class AnalysisResults(object):
         }
 
 
+class _BlockSemantics(object):
+    """
+    The semantics computed in basic block mode (see compute_semantics).
+    Behaves as a mapping from each node of the control-flow graph to its
+    state, where states which were not kept during the analysis are
+    recomputed, for the whole block at once, the first time one of them is
+    requested.
+    """
+    def __init__(self, nodes, kept_states, compute_states):
+        """
+        :param list[Digraph.Node] nodes: All the nodes of the graph.
+
+        :param dict[Digraph.Node, dict] kept_states: The states which were
+            kept during the analysis.
+
+        :param Digraph.Node -> list[(Digraph.Node, dict)] compute_states:
+            Recomputes the states which were not kept in the block of a
+            given node.
+        """
+        self.nodes = nodes
+        self._node_ids = {id(n) for n in nodes}
+        self._states = {id(n): state for n, state in kept_states.iteritems()}
+        self._compute_states = compute_states
+
+    def __getitem__(self, node):
+        try:
+            return self._states[id(node)]
+        except KeyError:
+            if id(node) not in self._node_ids:
+                raise
+            for n, state in self._compute_states(node):
+                self._states[id(n)] = state
+            return self._states[id(node)]
+
+    def __contains__(self, node):
+        return id(node) in self._node_ids
+
+    def __iter__(self):
+        return iter(self.nodes)
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def keys(self):
+        return list(self.nodes)
+
+    def iterkeys(self):
+        return iter(self.nodes)
+
+    def iteritems(self):
+        for node in self.nodes:
+            yield node, self[node]
+
+    def items(self):
+        return list(self.iteritems())
+
+
+def _basic_blocks(cfg, nodes):
+    """
+    Groups the given nodes of the control-flow graph in basic blocks, i.e.
+    maximal sequences of nodes in which every node but the first one has
+    the previous node as single predecessor, which has no other successor.
+    Widening points always start a new block.
+
+    :param Digraph cfg: The control-flow graph.
+    :param list[Digraph.Node] nodes: The nodes to group.
+    :return: The blocks, ordered by the position of their first node.
+    :rtype: list[list[Digraph.Node]]
+    """
+    node_ids = {id(n) for n in nodes}
+
+    def continues_block(node):
+        if node.data.is_widening_point:
+            return False
+
+        ancestors = cfg.ancestors(node)
+        if len(ancestors) != 1:
+            return False
+
+        anc = next(iter(ancestors))
+        return (anc is not node and
+                id(anc) in node_ids and
+                len(cfg.successors(anc)) == 1)
+
+    blocks = []
+    for node in nodes:
+        if continues_block(node):
+            continue
+
+        block = [node]
+        while True:
+            succs = cfg.successors(block[-1])
+            if len(succs) != 1:
+                break
+            succ = next(iter(succs))
+            if succ is node or not continues_block(succ):
+                break
+            block.append(succ)
+
+        blocks.append(block)
+
+    return blocks
+
+
+def _is_check_site(cfg, node):
+    """
+    :param Digraph cfg: The control-flow graph.
+    :param Digraph.Node node: A node of the graph.
+    :return: True if the node precedes an assume statement which has a
+        purpose, at which checkers typically evaluate expressions.
+    :rtype: bool
+    """
+    return any(
+        isinstance(succ.data.node, AssumeStmt) and
+        'purpose' in succ.data.node.data
+        for succ in cfg.successors(node)
+    )
+
+
 _unit_domain = domains.Product()
 
 
-def compute_semantics(prog, model, merge_pred_builder, arg_values=None):
+class WideningStrategy(object):
+    """
+    Decides when and how the states computed at widening points are widened
+    while searching for the fix-point of the semantics.
+    """
+    def __init__(self, delay=10, thresholds=False, narrowing_steps=None):
+        """
+        :param int delay: The number of times a widening point is visited
+            before its state starts being widened.
+
+        :param bool thresholds: Whether to widen to thresholds harvested from
+            the integer literals of the program and the bounds of the types
+            of its variables, instead of directly to the bounds of the types.
+            As a widening to thresholds may need to be repeated until the
+            bounds of the types are reached, states are then widened every
+            time after the delay.
+
+        :param int | None narrowing_steps: If None, the state of a widening
+            point is widened only once (unless thresholds are used), after
+            which the iteration continues without widening until the states
+            are stable. Otherwise, states are widened every time after the
+            delay until they are stable, and at most this number of
+            additional descending iterations are then run without widening
+            to recover precision.
+        """
+        self.delay = delay
+        self.thresholds = thresholds
+        self.narrowing_steps = narrowing_steps
+
+    def should_widen(self, counter):
+        """
+        :param int counter: The number of times the widening point was
+            visited before.
+        :rtype: bool
+        """
+        if self.narrowing_steps is None and not self.thresholds:
+            return counter == self.delay
+        return counter >= self.delay
+
+    def harvest_thresholds(self, prog, model):
+        """
+        :param lalcheck.irs.basic.tree.Program prog: The analyzed program.
+        :param dict model: The model of the program.
+        :return: The sorted widening thresholds to use for this program.
+        :rtype: tuple[int]
+        """
+        if not self.thresholds:
+            return ()
+
+        res = set()
+        for lit in visitors.findall(prog, lambda n: isinstance(n, Lit)):
+            if type(lit.val) in (int, long):
+                res.update((lit.val - 1, lit.val, lit.val + 1))
+
+        for var in visitors.findall(prog, lambda n: isinstance(n, Variable)):
+            if var in model:
+                dom = model[var].domain
+                if isinstance(dom, domains.Intervals):
+                    res.update(dom.top)
+
+        return tuple(sorted(res))
+
+
+def compute_semantics(prog, model, merge_pred_builder, arg_values=None,
+                      widening=None, basic_blocks=False):
     evaluator = ExprEvaluator(model)
+    batch_evaluator = ExprBatchEvaluator(model)
     solver = ExprSolver(model)
+    batch_solver = ExprBatchSolver(model)
 
     # setup widening configuration
-    widening_counter = KeyCounter()
-    widening_delay = 10
+    if widening is None:
+        widening = WideningStrategy()
 
-    def do_widen(counter):
-        # will widen when counter == widen_delay, then narrow
-        return counter == widening_delay
+    widening_counter = KeyCounter()
+    thresholds = widening.harvest_thresholds(prog, model)
 
     cfg = prog.visit(CFGBuilder())
     roots = cfg.roots()
@@ -410,17 +634,20 @@ def compute_semantics(prog, model, merge_pred_builder, arg_values=None):
     )
 
     # the transfer function
-    transfer_func = _VarTracker(var_set, vars_domain, evaluator, solver)
-
-    def transfer(new_states, node, inputs):
-        transferred = (
-            (
-                trace,
-                node.data.node.visit(transfer_func, values)
-                if node.data.node is not None else values
+    transfer_func = _VarTracker(var_set, vars_domain, evaluator, solver,
+                                batch_evaluator, batch_solver)
+
+    def transfer(new_states, node, inputs, widen=True):
+        if node.data.node is not None:
+            transferred = zip(
+                (trace for trace, _ in inputs),
+                transfer_func.visit_all(
+                    node.data.node,
+                    [values for _, values in inputs]
+                )
             )
-            for trace, values in inputs
-        )
+        else:
+            transferred = inputs
 
         output = lat.build([
             (
@@ -431,23 +658,84 @@ def compute_semantics(prog, model, merge_pred_builder, arg_values=None):
             if not vars_domain.is_empty(values)
         ])
 
-        if node.data.is_widening_point:
-            if do_widen(widening_counter.get_incr(node)):
-                output = lat.update(new_states[node], output, True)
+        if widen and node.data.is_widening_point:
+            if widening.should_widen(widening_counter.get_incr(node)):
+                output = lat.widen(new_states[node], output, thresholds)
 
         return output
 
-    def it(states):
+    def it(states, widen=True):
         new_states = states.copy()
 
         for node in non_roots:
             new_states[node] = transfer(new_states, node, reduce(
                 lat.join,
                 (new_states[anc] for anc in cfg.ancestors(node))
-            ))
+            ), widen)
 
         return new_states
 
+    if basic_blocks:
+        # Transfer functions are run over each block at once, and states
+        # are only kept at the boundaries of blocks and at check sites. The
+        # other states are recomputed on demand (see _BlockSemantics).
+        blocks = _basic_blocks(cfg, non_roots)
+        kept = [
+            [
+                i == 0 or i == len(block) - 1 or _is_check_site(cfg, node)
+                for i, node in enumerate(block)
+            ]
+            for block in blocks
+        ]
+        block_positions = {
+            id(node): (b, i)
+            for b, block in enumerate(blocks)
+            for i, node in enumerate(block)
+        }
+
+        def it(states, widen=True):
+            new_states = states.copy()
+
+            for block, block_kept in zip(blocks, kept):
+                head = block[0]
+                output = transfer(new_states, head, reduce(
+                    lat.join,
+                    (new_states[anc] for anc in cfg.ancestors(head))
+                ), widen)
+                new_states[head] = output
+
+                for node, keep in zip(block[1:], block_kept[1:]):
+                    output = transfer(new_states, node, output, widen)
+                    if keep:
+                        new_states[node] = output
+
+            return new_states
+
+        def block_states(states, node):
+            b, _ = block_positions[id(node)]
+
+            # The first node of a block is always kept.
+            res = []
+            for n, keep in zip(blocks[b], kept[b]):
+                if keep:
+                    output = states[n]
+                else:
+                    output = transfer(states, n, output, False)
+                    res.append((n, output))
+            return res
+
+        stored_nodes = [
+            node
+            for block, block_kept in zip(blocks, kept)
+            for node, keep in zip(block, block_kept)
+            if keep
+        ]
+    else:
+        stored_nodes = non_roots
+
+    def is_stable(last, result):
+        return all(lat.eq(x, result[i]) for i, x in last.iteritems())
+
     # initial state of the variables at the entry of the program
     init_vars = tuple(
         arg_values[indexed_vars[i]]
@@ -464,26 +752,46 @@ def compute_semantics(prog, model, merge_pred_builder, arg_values=None):
     # last state of the program (all program points)
     last = concat_dicts(
         {n: transfer({}, n, init_lat) for n in roots},
-        {n: lat.bottom for n in non_roots}
+        {n: lat.bottom for n in stored_nodes}
     )
 
     # current state of the program (all program points)
     result = it(last)
 
     # find a fix-point.
-    while any(not lat.eq(x, result[i]) for i, x in last.iteritems()):
+    while not is_stable(last, result):
         last, result = result, it(result)
 
-    formatted_results = {
-        node: {
+    # refine it with a bounded descending sequence.
+    if widening.narrowing_steps is not None:
+        for _ in range(widening.narrowing_steps):
+            last, result = result, it(result, False)
+            if is_stable(last, result):
+                break
+
+    def format_state(state):
+        return {
             trace: {
                 v: values[v.data.index] for v in var_set
             }
             for trace, values in state
         }
+
+    formatted_results = {
+        node: format_state(state)
         for node, state in result.iteritems()
     }
 
+    if basic_blocks:
+        formatted_results = _BlockSemantics(
+            cfg.nodes,
+            formatted_results,
+            lambda node: [
+                (n, format_state(state))
+                for n, state in block_states(result, node)
+            ]
+        )
+
     return AnalysisResults(
         cfg,
         formatted_results,
@@ -4,13 +4,21 @@ Provides a libadalang frontend for the Basic IR.
 
 import libadalang as lal
 
-from lalcheck.irs.basic import tree as irt, purpose
+import hashlib
+import os
+import weakref
+import cPickle
+import zlib
+from multiprocessing import Pool
+
+from lalcheck.irs.basic import (
+    tree as irt, purpose, serialization, passes, visitors
+)
 from lalcheck.irs.basic.visitors import ImplicitVisitor as IRImplicitVisitor
 from lalcheck.constants import ops, lits, access_paths
 from lalcheck.utils import KeyCounter, Transformer, profile
 from lalcheck import types
 
-from funcy.calc import memoize
 
 
 _lal_op_type_to_symbol = {
@@ -81,15 +89,16 @@ class _RecordField(object):
         self.index = index
         self.conds = conditions
 
-    def is_referred_by(self, name):
+    def is_referred_by(self, ctx, name):
         """
         Returns True if the given identifier refers to this record field.
 
+        :param ExtractionContext ctx: The program extraction context.
         :param lal.Identifier name: The identifier to test.
         :rtype: bool
         """
-        return (name.p_referenced_decl == self.decl and
-                name.text == self.name.text)
+        return (ctx.properties.get(name, 'p_referenced_decl') == self.decl
+                and name.text == self.name.text)
 
 
 class _ValueHolder(object):
@@ -103,6 +112,85 @@ class _ValueHolder(object):
         self.value = init
 
 
+class _PropertyCache(object):
+    """
+    Caches the results of libadalang properties, which are queried many
+    times on the same nodes when lowering subprograms. Results are indexed
+    by node and by property name. They are only valid as long as the units
+    containing the nodes are not reparsed, after which the cache must be
+    cleared. The numbers of hits and misses are counted, and reported by
+    the checkers along with their timings. Properties queried in worker
+    processes are not counted.
+    """
+    def __init__(self):
+        self._results = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, node, prop, *args):
+        """
+        :param lal.AdaNode node: The node on which to query the property.
+        :param str prop: The name of the property, e.g. "p_referenced_decl".
+        :param *object args: The arguments of the property, if any.
+        :return: The result of the property.
+        :rtype: object
+        :raise lal.PropertyError: If the property fails, in which case
+            nothing is cached.
+        """
+        key = (node, prop) + args
+        try:
+            res = self._results[key]
+        except KeyError:
+            self.misses += 1
+            res = getattr(node, prop)
+            if len(args) > 0:
+                res = res(*args)
+            self._results[key] = res
+            return res
+
+        self.hits += 1
+        return res
+
+    def getter(self, prop):
+        """
+        :param str prop: The name of a property.
+        :return: A function returning the cached result of this property
+            for the given node.
+        :rtype: lal.AdaNode -> object
+        """
+        return lambda node: self.get(node, prop)
+
+    def clear(self):
+        """
+        Drops all the cached results. Counters are kept.
+        """
+        self._results.clear()
+
+
+def _context_memoize(fun):
+    """
+    Memoizes the given function, whose first argument is an extraction
+    context, in the "memos" of this context rather than globally. Results
+    are typically indexed by libadalang nodes, therefore they must be
+    dropped along with the context, or when the units containing the nodes
+    are reparsed (see ExtractionContext.extract_programs_from_file).
+
+    :param (ExtractionContext, *object) -> T fun: The function to memoize.
+    :rtype: (ExtractionContext, *object) -> T
+    """
+    def wrapper(ctx, *args):
+        memo = ctx.memos.setdefault(fun, {})
+        try:
+            return memo[args]
+        except KeyError:
+            res = memo[args] = fun(ctx, *args)
+            return res
+
+    wrapper.__name__ = fun.__name__
+    wrapper.__doc__ = fun.__doc__
+    return wrapper
+
+
 class _ExtendedCallReturnType(object):
     def __init__(self, out_indices, out_types, ret_type=None):
         self.out_indices = out_indices
@@ -167,12 +255,141 @@ def _closest(node, *tpe):
         return None
 
 
-@memoize
-def _record_fields(record_decl):
+class _RecordLayout(object):
+    """
+    The layout of a record type: its fields, indexed by their declaration
+    and name, and the conditions under which they exist. Computed once per
+    type declaration (see _record_layout).
+    """
+    def __init__(self, fields):
+        """
+        :param list[_RecordField] fields: The fields of the record, in
+            order.
+        """
+        self.fields = fields
+
+        self._by_decl_name = {
+            (field.decl, field.name.text): field
+            for field in fields
+        }
+
+        # For each prefix of conditions, the conditions which come directly
+        # after it (see cousin_conditions).
+        self._cousins = {}
+        for field in fields:
+            if len(field.conds) > 0:
+                self._cousins.setdefault(
+                    tuple(field.conds[:-1]), set()
+                ).add(field.conds[-1])
+
+        # The precompiled existence conditions of each field, indexed by
+        # the index of the field.
+        self._existence_conds = {}
+
+    def field(self, decl, name):
+        """
+        :param lal.ComponentDecl | lal.DiscriminantSpec decl: The node where
+            the field is declared.
+        :param str name: The name of the field.
+        :rtype: _RecordField
+        :raise KeyError: If there is no such field in this record.
+        """
+        return self._by_decl_name[decl, name]
+
+    def cousin_conditions(self, cond_prefix):
+        """
+        :param list[(lal.Identifier, lal.AlternativesList)] cond_prefix:
+            The prefix list of conditions.
+
+        :return: The set of conditions that come after the given prefix
+            list of conditions.
+
+        :rtype: set[(lal.Identifier, lal.AlternativesList)]
+        """
+        return self._cousins.get(tuple(cond_prefix), set())
+
+    def existence_conditions(self, ctx, field, eval_choice):
+        """
+        Returns the conditions that must hold for the given field to exist,
+        where the choices of the variants are evaluated once per field.
+
+        Each condition is a tuple with the selector discriminant, the field
+        of this discriminant, a list of alternatives (each being the list of
+        the values of its choices), and whether the condition holds when the
+        discriminant has a value of one of the alternatives (False), or when
+        it has none of them (True, used for "others" alternatives).
+
+        :param ExtractionContext ctx: The program extraction context.
+
+        :param _RecordField field: A field of this record.
+
+        :param lal.Expr -> int | str | ConstExprEvaluator.Range eval_choice:
+            Computes the static value of a choice.
+
+        :rtype: list[(lal.Identifier, _RecordField, list[list[object]], bool)]
+        """
+        try:
+            return self._existence_conds[field.index]
+        except KeyError:
+            pass
+
+        def eval_alternatives(alternatives):
+            return [eval_choice(choice) for choice in alternatives]
+
+        res = []
+        for i, (discr, alternatives) in enumerate(field.conds):
+            discr_field = _field_info(ctx, discr)
+
+            if not any(x.is_a(lal.OthersDesignator) for x in alternatives):
+                res.append((
+                    discr, discr_field,
+                    [eval_alternatives(alternatives)],
+                    False
+                ))
+            else:
+                other_alts = [
+                    alts
+                    for _, alts in self.cousin_conditions(field.conds[:i])
+                    if not any(
+                        x.is_a(lal.OthersDesignator) for x in alts
+                    )
+                ]
+
+                res.append((
+                    discr, discr_field,
+                    [eval_alternatives(alts) for alts in other_alts],
+                    True
+                ))
+
+        self._existence_conds[field.index] = res
+        return res
+
+
+@_context_memoize
+def _record_layout(ctx, record_decl):
+    """
+    :param ExtractionContext ctx: The program extraction context.
+    :param lal.TypeDecl record_decl: A record type declaration.
+    :return: The layout of the record.
+    :rtype: _RecordLayout
+    """
+    return _RecordLayout(_compute_record_fields(record_decl))
+
+
+def _record_fields(ctx, record_decl):
     """
     Returns an iterable of the fields of the given record, where a field is
     identified by the pair (its declaration, its name).
 
+    :param ExtractionContext ctx: The program extraction context.
+    :param lal.TypeDecl record_decl: The record whose fields to list.
+    :rtype: list[_RecordField]
+    """
+    return _record_layout(ctx, record_decl).fields
+
+
+def _compute_record_fields(record_decl):
+    """
     :param lal.TypeDecl record_decl: The record whose fields to list.
     :rtype: list[_RecordField]
     """
@@ -216,11 +433,13 @@ def _record_fields(record_decl):
     return res
 
 
-@memoize
-def _proc_parameters(proc):
+@_context_memoize
+def _proc_parameters(ctx, proc):
     """
     Returns the parameters from the given subprogram that have the "Out" mode.
 
+    :param ExtractionContext ctx: The program extraction context.
+
     :param lal.SubpBody | lal.SubpDecl proc: The procedure for which to
         retrieve the parameters.
 
@@ -240,27 +459,7 @@ def _proc_parameters(proc):
     return list(gen())
 
 
-def _find_cousin_conditions(record_fields, cond_prefix):
-    """
-    Returns the set of conditions that come after the given prefix list of
-    conditions.
-
-    :param list[_RecordField] record_fields: The fields of the record.
-
-    :param list[(lal.Identifier, lal.AlternativesList)] cond_prefix:
-        The prefix list of conditions.
-
-    :rtype: set[(lal.Identifier, lal.AlternativesList)]
-    """
-    return set(
-        field.conds[len(cond_prefix)]
-        for field in record_fields
-        if len(field.conds) == len(cond_prefix) + 1
-        if field.conds[:len(cond_prefix)] == cond_prefix
-    )
-
-
-def _field_info(field_id):
+def _field_info(ctx, field_id):
     """
     Computes the index of the given record's field. Example:
     type Foo is record
@@ -270,17 +469,14 @@ def _field_info(field_id):
 
     => "x" has index 0, "y" has index 1, "z" has index 2
 
+    :param ExtractionContext ctx: The program extraction context.
     :param lal.Identifier field_id: An identifier referring to a record's
         field.
     :rtype: _RecordField
     """
-    record_decl = _closest(field_id.p_referenced_decl, lal.TypeDecl)
-
-    return next(
-        field
-        for field in _record_fields(record_decl)
-        if field.is_referred_by(field_id)
-    )
+    decl = ctx.properties.get(field_id, 'p_referenced_decl')
+    record_decl = _closest(decl, lal.TypeDecl)
+    return _record_layout(ctx, record_decl).field(decl, field_id.text)
 
 
 def _is_array_type_decl(tpe):
@@ -298,12 +494,13 @@ _READS_GLOBAL_STATE = 1
 _WRITES_GLOBAL_STATE = 2
 
 
-@memoize
-def _contains_access_type(typer, type_hint):
+@_context_memoize
+def _contains_access_type(ctx, typer, type_hint):
     """
     Returns True if the given type is an access type or contains one, None if
     unknown.
 
+    :param ExtractionContext ctx: The program extraction context.
     :param types.Typer[lal.AdaNode] typer:
     :param lal.AdaNode type_hint:
     :rtype: bool | None.
@@ -319,20 +516,21 @@ def _contains_access_type(typer, type_hint):
         return None
 
 
-@memoize
-def _find_global_access(typer, proc):
+@_context_memoize
+def _find_global_access(ctx, typer, proc):
     """
     Analyzes the side effects of the given subprogram. returns the following:
     - _IGNORES_GLOBAL_STATE if the function doesn't access the global state.
     - _READS_GLOBAL_STATE if the function may read from the global state.
     - _WRITES_GLOBAL_STATE if the function may write to the global state.
 
+    :param ExtractionContext ctx: The program extraction context.
     :param types.Typer[lal.AdaNode] typer:
     :param lal.SubpBody | lal.SubpDecl proc:
     :return:
     """
-    for i, id, param in _proc_parameters(proc):
-        if _contains_access_type(typer, param.f_type_expr):
+    for i, id, param in _proc_parameters(ctx, proc):
+        if _contains_access_type(ctx, typer, param.f_type_expr):
             return _WRITES_GLOBAL_STATE
 
     return _IGNORES_GLOBAL_STATE
@@ -347,67 +545,129 @@ def _index_of(elem, iterable):
     return -1
 
 
-@profile()
-@memoize
-def _find_vars_to_spill(ctx, node):
+class _SpillIndex(object):
     """
-    :param lal.AdaNode node:
-    :return:
+    Finds the variables of a unit which must be spilled, i.e. whose address
+    is taken, either explicitly using the 'Access attribute, or implicitly
+    by passing them to a parameter whose address is taken in the aspects of
+    the callee.
+
+    The whole unit is traversed once, and the variables accessed in each of
+    its subprograms are indexed so that they can be retrieved by _gen_ir
+    for every subprogram of the unit (see ExtractionContext.vars_to_spill).
     """
-    if node is None:
-        return set()
+    @profile("_SpillIndex")
+    def __init__(self, ctx, unit):
+        """
+        :param ExtractionContext ctx: The program extraction context.
+        :param lal.AnalysisUnit unit: The unit to index.
+        """
+        self.ctx = ctx
+        self.unit = unit
+
+        # The indexes of the parameters of a procedure whose address is
+        # taken in its aspects.
+        self._spilled_params = {}
+
+        # The variables to spill in each subprogram of the unit.
+        self._by_subp = {}
+
+        if unit.root is not None:
+            for node in unit.root.findall(self._is_accessed):
+                var = self._accessed_var(node)
+                parent = node.parent
+                while parent is not None:
+                    if parent.is_a(lal.SubpBody, lal.ExprFunction):
+                        self._by_subp.setdefault(parent, set()).add(var)
+                    parent = parent.parent
+
+    def vars_to_spill(self, node):
+        """
+        :param lal.AdaNode node: A subprogram of the unit.
+        :return: The variables accessed in the given node.
+        :rtype: set[lal.BasicDecl]
+        """
+        if node.is_a(lal.SubpBody, lal.ExprFunction):
+            return self._by_subp.get(node, set())
+        return self._find_vars_to_spill(node)
+
+    def _find_vars_to_spill(self, node):
+        """
+        :param lal.AdaNode | None node: Any node.
+        :return: The variables accessed in the given node.
+        :rtype: set[lal.BasicDecl]
+        """
+        if node is None:
+            return set()
 
-    def accessed_var(expr):
+        return {
+            self._accessed_var(n)
+            for n in node.findall(self._is_accessed)
+        }
+
+    def _spilled_param_indexes(self, proc):
+        """
+        :param lal.SubpBody | lal.SubpDecl proc: A procedure.
+        :return: The indexes of the parameters of the procedure whose
+            address is taken in its aspects.
+        :rtype: set[int]
+        """
+        try:
+            return self._spilled_params[proc]
+        except KeyError:
+            indexes = self._spilled_params[proc] = {
+                _index_of(param, param.parent)
+                for param in self._find_vars_to_spill(proc.f_aspects)
+            }
+            return indexes
+
+    def _accessed_var(self, expr):
         if expr.is_a(lal.Identifier):
-            return expr.p_referenced_decl
+            return self.ctx.properties.get(expr, 'p_referenced_decl')
         elif expr.is_a(lal.DottedName):
-            return accessed_var(expr.f_prefix)
+            return self._accessed_var(expr.f_prefix)
         elif expr.is_a(lal.AttributeRef) and expr.f_attribute.text == 'Model':
-            return accessed_var(expr.f_prefix)
+            return self._accessed_var(expr.f_prefix)
         else:
             return None
 
-    def is_accessed(node):
-        if node.parent.is_a(lal.AttributeRef):
-            if node.parent.f_attribute.text == 'Access':
-                if node.parent.f_prefix == node:
+    def _is_accessed(self, node):
+        parent = node.parent
+        if parent is None:
+            return False
+        elif parent.is_a(lal.AttributeRef):
+            if parent.f_attribute.text == 'Access':
+                if parent.f_prefix == node:
                     return True
-        elif node.parent.is_a(lal.ParamAssoc):
+        elif parent.is_a(lal.ParamAssoc):
             try:
-                call_expr = node.parent.parent.parent
+                call_expr = parent.parent.parent
                 if call_expr.is_a(lal.CallExpr):
-                    ref = call_expr.f_name.p_referenced_decl
+                    ref = self.ctx.properties.get(
+                        call_expr.f_name, 'p_referenced_decl'
+                    )
                     if (ref is not None and
                             ref.is_a(lal.SubpBody, lal.SubpDecl)):
                         procs = [ref]
-                        model = ctx.fun_models.get(ref, None)
+                        model = self.ctx.fun_models.get(ref, None)
                         if model is not None:
                             procs.append(model)
 
                         for proc in procs:
-                            params_to_spill = _find_vars_to_spill(
-                                ctx,
-                                proc.f_aspects
+                            param_indexes_to_spill = (
+                                self._spilled_param_indexes(proc)
                             )
 
-                            if len(params_to_spill) > 0:
-                                param_indexes_to_spill = {
-                                    _index_of(param, param.parent)
-                                    for param in params_to_spill
-                                }
-                                arg_index = _index_of(
-                                    node.parent, node.parent.parent
-                                )
+                            if len(param_indexes_to_spill) > 0:
+                                arg_index = _index_of(parent, parent.parent)
                                 return arg_index in param_indexes_to_spill
 
             except lal.PropertyError:
                 pass
         return False
 
-    return {accessed_var(n) for n in node.findall(is_accessed)}
-
 
-@memoize
+@_context_memoize
 def retrieve_function_contracts(ctx, proc):
     """
     :param lal.SubpDecl | lal.SubpBody proc:
@@ -450,6 +710,10 @@ def _gen_ir(ctx, subp):
     :rtype: irt.Program
     """
 
+    # Libadalang properties are queried through the cache of the context.
+    referenced_decl = ctx.properties.getter('p_referenced_decl')
+    expression_type = ctx.properties.getter('p_expression_type')
+
     var_decls = {}
     param_vars = []
     tmp_vars = KeyCounter()
@@ -490,7 +754,7 @@ def _gen_ir(ctx, subp):
     substitutions = {}
 
     # Contains variables that are spilled.
-    to_spill = _find_vars_to_spill(ctx, subp)
+    to_spill = ctx.vars_to_spill(subp)
     stack = irt.Identifier(
         irt.Variable(
             "$stack",
@@ -518,6 +782,63 @@ def _gen_ir(ctx, subp):
         """
         return _lal_op_type_to_symbol[type(lal_op), arity]
 
+    # The function calls of which all the arguments are constant, i.e.
+    # literals or such function calls.
+    const_calls = set()
+
+    # The nodes holding constant expressions, along with the positions of
+    # those expressions for function calls. They are the only nodes which
+    # must be visited to convert universal types once the program is built
+    # (see ConvertUniversalTypes).
+    const_holders = []
+
+    def is_const(expr):
+        """
+        :param irt.Expr expr: A Basic IR expression.
+        :return: True if the expression is constant (see const_calls).
+        :rtype: bool
+        """
+        return isinstance(expr, irt.Lit) or expr in const_calls
+
+    def new_funcall(fun_id, args, **data):
+        """
+        Builds a function call, and records it in const_calls or
+        const_holders if relevant.
+
+        :rtype: irt.FunCall
+        """
+        call = irt.FunCall(fun_id, args, **data)
+        const_args = [i for i, arg in enumerate(args) if is_const(arg)]
+        if len(const_args) == len(args):
+            const_calls.add(call)
+        elif len(const_args) > 0:
+            const_holders.append((call, const_args))
+        return call
+
+    def new_assign(dest, expr, **data):
+        """
+        Builds an assign statement, and records it in const_holders if the
+        assigned expression is constant.
+
+        :rtype: irt.AssignStmt
+        """
+        assign = irt.AssignStmt(dest, expr, **data)
+        if is_const(expr):
+            const_holders.append((assign, None))
+        return assign
+
+    def new_assume(expr, **data):
+        """
+        Builds an assume statement, and records it in const_holders if the
+        assumed expression is constant.
+
+        :rtype: irt.AssumeStmt
+        """
+        assume = irt.AssumeStmt(expr, **data)
+        if is_const(expr):
+            const_holders.append((assume, None))
+        return assume
+
     def unimplemented(node):
         """
         :param lal.AdaNode node: The node that cannot be transformed.
@@ -549,12 +870,12 @@ def _gen_ir(ctx, subp):
             irt.Variable(
                 fresh_name(name),
                 purpose=purpose.SyntheticVariable(),
-                type_hint=replaced_expr.p_expression_type,
+                type_hint=expression_type(replaced_expr),
                 orig_node=replaced_expr,
                 mode=Mode.Local,
                 index=next_var_idx()
             ),
-            type_hint=replaced_expr.p_expression_type,
+            type_hint=expression_type(replaced_expr),
             orig_node=replaced_expr
         )
 
@@ -566,7 +887,7 @@ def _gen_ir(ctx, subp):
         """
         var = var_decls[ref, expr.text]
         if ref in to_spill:
-            return irt.FunCall(
+            return new_funcall(
                 ops.GetName(var.data.index),
                 [stack],
                 type_hint=var.data.type_hint,
@@ -582,7 +903,7 @@ def _gen_ir(ctx, subp):
     def update_var(expr, ref):
         var = var_decls[ref, expr.text]
         if ref in to_spill:
-            return irt.FunCall(
+            return new_funcall(
                 ops.GetName(var.data.index),
                 [stack],
                 type_hint=var.data.type_hint,
@@ -603,7 +924,7 @@ def _gen_ir(ctx, subp):
         """
         var = var_decls[ref, expr.text]
         if ref in to_spill:
-            return irt.FunCall(
+            return new_funcall(
                 ops.GetName(var.data.index),
                 [stack],
                 type_hint=var.data.type_hint,
@@ -632,14 +953,14 @@ def _gen_ir(ctx, subp):
         :rtype: list[irt.Stmt]
         """
         cond_pre_stmts, cond = transform_expr(cond)
-        not_cond = irt.FunCall(
+        not_cond = new_funcall(
             ops.NOT,
             [cond],
             type_hint=cond.data.type_hint
         )
 
         assume_cond, assume_not_cond = (
-            irt.AssumeStmt(x) for x in [cond, not_cond]
+            new_assume(x) for x in [cond, not_cond]
         )
 
         return cond_pre_stmts + [
@@ -665,7 +986,7 @@ def _gen_ir(ctx, subp):
         :rtype: (irt.Expr, irt.Expr)->irt.Expr
         """
         def build(lhs, rhs):
-            return irt.FunCall(
+            return new_funcall(
                 op, [lhs, rhs],
                 type_hint=type_hint
             )
@@ -701,7 +1022,7 @@ def _gen_ir(ctx, subp):
 
         def gen_single(value):
             if isinstance(value, int):
-                return irt.FunCall(
+                return new_funcall(
                     ops.EQ,
                     [expr, gen_lit(value)],
                     type_hint=ctx.evaluator.bool
@@ -709,15 +1030,15 @@ def _gen_ir(ctx, subp):
             elif isinstance(value, ConstExprEvaluator.Range):
                 if (isinstance(value.first, int) and
                         isinstance(value.last, int)):
-                    return irt.FunCall(
+                    return new_funcall(
                         ops.AND,
                         [
-                            irt.FunCall(
+                            new_funcall(
                                 ops.GE,
                                 [expr, gen_lit(value.first)],
                                 type_hint=ctx.evaluator.bool
                             ),
-                            irt.FunCall(
+                            new_funcall(
                                 ops.LE,
                                 [expr, gen_lit(value.last)],
                                 type_hint=ctx.evaluator.bool
@@ -748,11 +1069,11 @@ def _gen_ir(ctx, subp):
         :rtype:  (list[irt.Stmt], irt.Expr)
         """
         res = new_expression_replacing_var("tmp", bin_expr)
-        res_eq_true, res_eq_false = (irt.AssignStmt(
+        res_eq_true, res_eq_false = (new_assign(
             res,
             irt.Lit(
                 literal,
-                type_hint=bin_expr.p_expression_type
+                type_hint=expression_type(bin_expr)
             )
         ) for literal in [lits.TRUE, lits.FALSE])
 
@@ -836,7 +1157,7 @@ def _gen_ir(ctx, subp):
             :rtype: list[irt.Stmt]
             """
             pre_stmts, tr_expr = transform_expr(expr)
-            return pre_stmts + [irt.AssignStmt(var, tr_expr)]
+            return pre_stmts + [new_assign(var, tr_expr)]
 
         return transformer
 
@@ -860,7 +1181,7 @@ def _gen_ir(ctx, subp):
             :rtype: list[irt.Stmt]
             """
             pre_stmts, tr_expr = transform_expr(alt.f_expr)
-            return pre_stmts + [irt.AssignStmt(var, tr_expr)]
+            return pre_stmts + [new_assign(var, tr_expr)]
 
         return transformer
 
@@ -961,7 +1282,7 @@ def _gen_ir(ctx, subp):
 
         # Build the condition for the "others" alternative, which is the
         # negation of the disjunction of all the previous conditions.
-        others_condition = irt.FunCall(
+        others_condition = new_funcall(
             ops.NOT,
             [
                 reduce(
@@ -974,11 +1295,11 @@ def _gen_ir(ctx, subp):
 
         # Generate the branches of the split statement.
         branches = [
-            [irt.AssumeStmt(cond)] + stmts
+            [new_assume(cond)] + stmts
             for cond, (choices, stmts) in
             zip(alts_conditions, case_alts)
         ] + [
-            [irt.AssumeStmt(others_condition)] + others_stmts
+            [new_assume(others_condition)] + others_stmts
             for others_stmts in others_potential_stmts
         ]
 
@@ -1005,7 +1326,7 @@ def _gen_ir(ctx, subp):
         :rtype: list[irt.Stmt], irt.Identifier, irt.Expr
         """
         if dest.is_a(lal.Identifier):
-            ref = dest.p_referenced_decl
+            ref = referenced_decl(dest)
             if ref is None:
                 if dest.parent.parent.is_a(lal.ObjectDecl):
                     ref = dest.parent.parent
@@ -1016,7 +1337,7 @@ def _gen_ir(ctx, subp):
                 updated_index = var.data.index
                 return [], (
                     stack,
-                    irt.FunCall(
+                    new_funcall(
                         ops.UpdatedName(updated_index),
                         [stack, expr],
                         type_hint=stack.data.type_hint,
@@ -1035,7 +1356,7 @@ def _gen_ir(ctx, subp):
                 ), expr)
 
         elif dest.is_a(lal.DottedName):
-            updated_index = _field_info(dest.f_suffix).index
+            updated_index = _field_info(ctx, dest.f_suffix).index
             prefix_pre_stmts, prefix_expr = transform_expr(dest.f_prefix)
 
             exist_stmts = gen_field_existence_condition(
@@ -1043,14 +1364,14 @@ def _gen_ir(ctx, subp):
                 dest.f_suffix
             )
 
-            pre_stmts, ret = gen_actual_dest(dest.f_prefix, irt.FunCall(
+            pre_stmts, ret = gen_actual_dest(dest.f_prefix, new_funcall(
                 ops.UpdatedName(updated_index),
                 [prefix_expr, expr],
-                type_hint=dest.f_prefix.p_expression_type,
+                type_hint=expression_type(dest.f_prefix),
                 orig_node=dest.f_prefix,
                 purpose=purpose.FieldAssignment(
                     updated_index,
-                    dest.f_suffix.p_expression_type
+                    expression_type(dest.f_suffix)
                 )
             ))
             return prefix_pre_stmts + exist_stmts + pre_stmts, ret
@@ -1067,12 +1388,12 @@ def _gen_ir(ctx, subp):
                 for suffix_stmt in suffix[0]
             ]
             suffix_exprs = [suffix[1] for suffix in suffixes]
-            pre_stmts, ret = gen_actual_dest(dest.f_name, irt.FunCall(
+            pre_stmts, ret = gen_actual_dest(dest.f_name, new_funcall(
                 ops.UPDATED,
                 [prefix_expr, expr] + suffix_exprs,
-                type_hint=dest.f_name.p_expression_type,
+                type_hint=expression_type(dest.f_name),
                 orig_node=dest,
-                purpose=purpose.CallAssignment(dest.f_name.p_expression_type)
+                purpose=purpose.CallAssignment(expression_type(dest.f_name))
             ))
             return (
                 prefix_pre_stmts + pre_stmts + suffix_pre_stmts,
@@ -1082,12 +1403,12 @@ def _gen_ir(ctx, subp):
         elif dest.is_a(lal.ExplicitDeref):
             prefix_pre_stmts, prefix_expr = transform_expr(dest.f_prefix)
 
-            return prefix_pre_stmts, (stack, irt.FunCall(
+            return prefix_pre_stmts, (stack, new_funcall(
                 ops.UPDATED,
                 [stack, prefix_expr, expr],
                 type_hint=stack.data.type_hint,
                 orig_node=dest,
-                purpose=purpose.DerefAssignment(dest.p_expression_type)
+                purpose=purpose.DerefAssignment(expression_type(dest))
             ))
 
         unimplemented(dest)
@@ -1101,48 +1422,31 @@ def _gen_ir(ctx, subp):
         :param lal.Identifier field: The field being accessed
         :rtype: list[irt.AssumeStmt]
         """
-        info = _field_info(field)
-        all_fields = _record_fields(
-            _closest(field.p_referenced_decl, lal.TypeDecl)
+        info = _field_info(ctx, field)
+        layout = _record_layout(
+            ctx, _closest(referenced_decl(field), lal.TypeDecl)
         )
 
+        def eval_choice(choice):
+            return ctx.evaluator.eval(transform_expr(choice)[1])
+
         res = []
-        for i, (discr, alternatives) in enumerate(info.conds):
-            discr_getter = irt.FunCall(
-                ops.GetName(_field_info(discr).index), [prefix],
-                type_hint=discr.p_expression_type
+        for discr, discr_field, alts, negated in layout.existence_conditions(
+                ctx, info, eval_choice):
+            discr_getter = new_funcall(
+                ops.GetName(discr_field.index), [prefix],
+                type_hint=expression_type(discr)
             )
 
-            if not any(x.is_a(lal.OthersDesignator) for x in alternatives):
-                choices = [
-                    ctx.evaluator.eval(transform_expr(choice)[1])
-                    for choice in alternatives
-                ]
-
-                condition = gen_case_condition(discr_getter, choices)
+            if not negated:
+                condition = gen_case_condition(discr_getter, alts[0])
             else:
-                # Find all the other conditions
-                cousin_conditions = _find_cousin_conditions(
-                    all_fields, info.conds[:i]
-                )
-
-                other_alts = [
-                    alts
-                    for _, alts in cousin_conditions
-                    if not any(
-                        x.is_a(lal.OthersDesignator) for x in alts
-                    )
-                ]
-
                 alts_conditions = [
-                    gen_case_condition(discr_getter, [
-                        ctx.evaluator.eval(transform_expr(choice)[1])
-                        for choice in alt
-                    ])
-                    for alt in other_alts
+                    gen_case_condition(discr_getter, choices)
+                    for choices in alts
                 ]
 
-                condition = irt.FunCall(
+                condition = new_funcall(
                     ops.NOT,
                     [
                         reduce(
@@ -1153,7 +1457,7 @@ def _gen_ir(ctx, subp):
                     type_hint=ctx.evaluator.bool
                 )
 
-            res.append(irt.AssumeStmt(
+            res.append(new_assume(
                 condition,
                 purpose=purpose.ExistCheck(
                     prefix,
@@ -1166,41 +1470,41 @@ def _gen_ir(ctx, subp):
 
     def gen_access_path(expr):
         if expr.is_a(lal.Identifier):
-            ref = expr.p_referenced_decl
+            ref = referenced_decl(expr)
 
             if (expr.text, ref) in substitutions:
                 expr = substitutions[expr.text, ref][1].data.orig_node
-                ref = expr.p_referenced_decl
+                ref = referenced_decl(expr)
 
             var = var_decls[ref, expr.text]
 
-            return irt.FunCall(
+            return new_funcall(
                 access_paths.Var(var.data.index),
                 [stack],
-                type_hint=_PointerType(expr.p_expression_type),
-                additional_arg=expr.p_expression_type,
+                type_hint=_PointerType(expression_type(expr)),
+                additional_arg=expression_type(expr),
                 orig_node=expr
             )
 
         elif expr.is_a(lal.DottedName):
-            updated_index = _field_info(expr.f_suffix).index
+            updated_index = _field_info(ctx, expr.f_suffix).index
 
-            return irt.FunCall(
+            return new_funcall(
                 access_paths.Field(updated_index),
                 [gen_access_path(expr.f_prefix)],
-                type_hint=_PointerType(expr.p_expression_type),
-                additional_arg=expr.p_expression_type,
+                type_hint=_PointerType(expression_type(expr)),
+                additional_arg=expression_type(expr),
                 orig_node=expr
             )
 
         elif expr.is_a(lal.AttributeRef) and expr.f_attribute.text == "Model":
             updated_index = 1
 
-            return irt.FunCall(
+            return new_funcall(
                 access_paths.Field(updated_index),
                 [gen_access_path(expr.f_prefix)],
-                type_hint=_PointerType(expr.p_expression_type),
-                additional_arg=expr.p_expression_type,
+                type_hint=_PointerType(expression_type(expr)),
+                additional_arg=expression_type(expr),
                 orig_node=expr
             )
 
@@ -1224,7 +1528,7 @@ def _gen_ir(ctx, subp):
             assign_dest, expr
         )
         return dest_pre_stmts + expr_pre_stmts + [
-            irt.AssignStmt(
+            new_assign(
                 dest,
                 updated_expr,
                 orig_node=orig_node
@@ -1263,14 +1567,14 @@ def _gen_ir(ctx, subp):
             procs.append(model)
 
         for proc in procs:
-            for i, name, param in _proc_parameters(proc):
+            for i, name, param in _proc_parameters(ctx, proc):
                 substitutions[name.text, param] = ([], args_in[i])
 
         pre_stmts = [
             stmt
             for pre, must_check in pres
             for stmts, expr in [transform_expr(pre)]
-            for stmt in stmts + [irt.AssumeStmt(
+            for stmt in stmts + [new_assume(
                 expr,
                 purpose=purpose.ContractCheck("precondition", orig_call),
                 orig_node=pre
@@ -1284,7 +1588,7 @@ def _gen_ir(ctx, subp):
             ] = ([], ret)
 
         for proc in procs:
-            for i, name, param in _proc_parameters(proc):
+            for i, name, param in _proc_parameters(ctx, proc):
                 if i in args_out:
                     substitutions[name.text + "'Old", param] = ([], args_in[i])
                     substitutions[name.text, param] = ([], args_out[i])
@@ -1293,7 +1597,7 @@ def _gen_ir(ctx, subp):
             stmt
             for post, must_check in posts
             for stmts, expr in [transform_expr(post)]
-            for stmt in stmts + [irt.AssumeStmt(
+            for stmt in stmts + [new_assume(
                 expr,
                 purpose=(
                     purpose.ContractCheck("postcondition", orig_call)
@@ -1358,25 +1662,27 @@ def _gen_ir(ctx, subp):
             return do
 
         if prefix.is_a(lal.Identifier, lal.DottedName):
-            ref = prefix.p_referenced_decl
+            ref = referenced_decl(prefix)
             if ref is not None and ref.is_a(lal.SubpBody, lal.SubpDecl):
                 # The call target is statically known.
 
                 out_params = [
                     (i, param.f_type_expr, gen_out_arg_assignment(i))
-                    for i, _, param in _proc_parameters(ref)
+                    for i, _, param in _proc_parameters(ctx, ref)
                     if param.f_mode.is_a(lal.ModeOut, lal.ModeInOut)
                 ]
 
                 # Pass stack too
 
-                global_access = _find_global_access(ctx.default_typer(), ref)
+                global_access = _find_global_access(
+                    ctx, ctx.default_typer(), ref
+                )
 
                 if (global_access == _READS_GLOBAL_STATE or
                         global_access == _WRITES_GLOBAL_STATE):
                     offset = var_idx.value
 
-                    suffix_exprs.append(irt.FunCall(
+                    suffix_exprs.append(new_funcall(
                         ops.OffsetName(offset),
                         [stack],
                         type_hint=stack.data.type_hint
@@ -1384,11 +1690,11 @@ def _gen_ir(ctx, subp):
 
                     if global_access == _WRITES_GLOBAL_STATE:
                         out_params.append((
-                            len(_proc_parameters(ref)),
+                            len(_proc_parameters(ctx, ref)),
                             stack.data.type_hint,
-                            lambda expr: [irt.AssignStmt(
+                            lambda expr: [new_assign(
                                 stack,
-                                irt.FunCall(
+                                new_funcall(
                                     ops.COPY_OFFSET,
                                     [stack, expr],
                                     type_hint=stack.data.type_hint
@@ -1399,12 +1705,12 @@ def _gen_ir(ctx, subp):
                 pres, posts = retrieve_function_contracts(ctx, ref)
 
                 if len(out_params) == len(pres) == len(posts) == 0:
-                    return suffix_pre_stmts, irt.FunCall(
+                    return suffix_pre_stmts, new_funcall(
                         ref,
                         suffix_exprs,
                         orig_node=orig_node,
                         type_hint=type_hint,
-                        callee_type=prefix.p_expression_type
+                        callee_type=expression_type(prefix)
                     )
                 else:
                     ret_tpe = _ExtendedCallReturnType(
@@ -1426,19 +1732,19 @@ def _gen_ir(ctx, subp):
                         orig_node=orig_node
                     )
 
-                    call = [irt.AssignStmt(
+                    call = [new_assign(
                         ret_var,
-                        irt.FunCall(
+                        new_funcall(
                             ref,
                             suffix_exprs,
                             orig_node=orig_node,
                             type_hint=ret_tpe,
-                            callee_type=prefix.p_expression_type
+                            callee_type=expression_type(prefix)
                         )
                     )]
 
                     out_arg_exprs = {
-                        j: irt.FunCall(
+                        j: new_funcall(
                             ops.GetName(i),
                             [ret_var],
                             type_hint=tpe
@@ -1457,7 +1763,7 @@ def _gen_ir(ctx, subp):
                     elif len(out_params) == 0:
                         res = ret_var
                     else:
-                        res = irt.FunCall(
+                        res = new_funcall(
                             ops.GetName(len(out_params)),
                             [ret_var],
                             type_hint=type_hint
@@ -1482,15 +1788,15 @@ def _gen_ir(ctx, subp):
                         res
                     )
 
-        if _is_array_type_decl(prefix.p_expression_type):
+        if _is_array_type_decl(expression_type(prefix)):
             prefix_pre_stmts, prefix_expr = transform_expr(prefix)
 
-            return prefix_pre_stmts + suffix_pre_stmts, irt.FunCall(
+            return prefix_pre_stmts + suffix_pre_stmts, new_funcall(
                 ops.CALL,
                 [prefix_expr] + suffix_exprs,
                 type_hint=type_hint,
                 orig_node=orig_node,
-                callee_type=prefix.p_expression_type
+                callee_type=expression_type(prefix)
             )
 
         unimplemented(orig_node)
@@ -1515,25 +1821,25 @@ def _gen_ir(ctx, subp):
         # Transform the expression being dereferenced and build the
         # assume expression stating that the expr is not null.
         expr_pre_stmts, expr = transform_expr(derefed_expr)
-        assumed_expr = irt.FunCall(
+        assumed_expr = new_funcall(
             ops.NEQ,
             [
                 expr,
                 irt.Lit(
                     lits.NULL,
-                    type_hint=derefed_expr.p_expression_type
+                    type_hint=expression_type(derefed_expr)
                 )
             ],
-            type_hint=derefed_expr.p_bool_type
+            type_hint=ctx.properties.get(derefed_expr, 'p_bool_type')
         )
 
         # Build the assume statement as mark it as a deref check, so as
         # to inform deref checkers that this assume statement was
         # introduced for that purpose.
-        return expr_pre_stmts + [irt.AssumeStmt(
+        return expr_pre_stmts + [new_assume(
             assumed_expr,
             purpose=purpose.DerefCheck(expr)
-        )], irt.FunCall(
+        )], new_funcall(
             ops.DEREF,
             [expr, stack],
             type_hint=deref_type,
@@ -1546,8 +1852,8 @@ def _gen_ir(ctx, subp):
         :return: Its IR transformation.
         :rtype: (list[irt.Stmt], irt.Expr)
         """
-        record_decl = expr.p_expression_type
-        all_fields = list(_record_fields(record_decl))
+        record_decl = expression_type(expr)
+        all_fields = list(_record_fields(ctx, record_decl))
         field_init = [None] * len(all_fields)
         others_expr_idx = None
 
@@ -1567,7 +1873,7 @@ def _gen_ir(ctx, subp):
                 continue
             else:
                 indexes = [
-                    _field_info(designator).index
+                    _field_info(ctx, designator).index
                     for designator in assoc.f_designators
                 ]
 
@@ -1586,7 +1892,7 @@ def _gen_ir(ctx, subp):
                 return build_record(record_expr, i + 1)
             else:
                 return build_record(
-                    irt.FunCall(
+                    new_funcall(
                         ops.UpdatedName(i),
                         [record_expr, field_init[i]],
                         type_hint=record_expr.data.type_hint,
@@ -1598,7 +1904,7 @@ def _gen_ir(ctx, subp):
                 )
 
         record_var = new_expression_replacing_var("tmp", expr)
-        building_stmt = irt.AssignStmt(record_var, build_record(record_var))
+        building_stmt = new_assign(record_var, build_record(record_var))
 
         return sum(r_exprs_pre_stmts, []) + [building_stmt], record_var
 
@@ -1608,10 +1914,125 @@ def _gen_ir(ctx, subp):
         :return: its IR transformation.
         :rtype: (list[irt.Stmt], irt.Expr)
         """
-        array_def = expr.p_expression_type.f_type_def
+        array_def = expression_type(expr).f_type_def
         print(array_def.dump())
         unimplemented(expr)
 
+    def static_range_bound(attr_ref):
+        """
+        :param lal.AttributeRef attr_ref: An attribute reference.
+
+        :return: The value of the 'First or 'Last attribute of a scalar
+            (sub)type whose range is static, or NOT_CONST otherwise. The
+            range is only evaluated once per type declaration.
+
+        :rtype: int | str | _NotConst
+        """
+        attribute_text = attr_ref.f_attribute.text
+        if (attribute_text not in ('First', 'Last') or
+                not attr_ref.f_prefix.is_a(lal.Identifier)):
+            return NOT_CONST
+
+        decl = referenced_decl(attr_ref.f_prefix)
+        if decl is None:
+            return NOT_CONST
+        elif decl.is_a(lal.TypeDecl):
+            if not decl.f_type_def.is_a(lal.SignedIntTypeDef):
+                return NOT_CONST
+            rng = decl.f_type_def.f_range.f_range
+        elif decl.is_a(lal.SubtypeDecl):
+            constr = decl.f_subtype.f_constraint
+            if constr is None or not constr.is_a(lal.RangeConstraint):
+                return NOT_CONST
+            rng = constr.f_range.f_range
+        else:
+            return NOT_CONST
+
+        value = ctx.evaluator.try_eval_decl(
+            decl, lambda: transform_static_expr(rng)
+        )
+        if not isinstance(value, ConstExprEvaluator.Range):
+            return NOT_CONST
+        elif attribute_text == 'First':
+            return value.first
+        else:
+            return value.last
+
+    def transform_static_expr(expr):
+        """
+        Transforms an expression which is expected to be static, such as the
+        definition of a named number or the range of a scalar type. Unlike
+        transform_expr, no statement nor variable is generated, so that the
+        result can be evaluated without affecting the program being lowered.
+
+        :param lal.Expr expr: The expression to transform.
+
+        :return: The transformed expression, or None if the expression is
+            not static.
+
+        :rtype: irt.Expr | None
+        """
+        if expr.is_a(lal.ParenExpr):
+            return transform_static_expr(expr.f_expr)
+
+        elif expr.is_a(lal.BinOp, lal.UnOp):
+            operands = (
+                [expr.f_left, expr.f_right] if expr.is_a(lal.BinOp)
+                else [expr.f_expr]
+            )
+            op = _lal_op_type_to_symbol.get(
+                (type(expr.f_op), len(operands)), None
+            )
+            args = [transform_static_expr(operand) for operand in operands]
+            if op is None or any(arg is None for arg in args):
+                return None
+
+            return irt.FunCall(
+                op,
+                args,
+                type_hint=expression_type(expr),
+                orig_node=expr
+            )
+
+        elif expr.is_a(lal.IntLiteral):
+            return irt.Lit(
+                int(expr.text),
+                type_hint=expression_type(expr),
+                orig_node=expr
+            )
+
+        elif expr.is_a(lal.Identifier):
+            ref = referenced_decl(expr)
+            if ref is None:
+                return None
+            elif ref.is_a(lal.EnumLiteralDecl):
+                return irt.Lit(
+                    expr.text,
+                    type_hint=ref.parent.parent.parent,
+                    orig_node=expr
+                )
+            elif ref.is_a(lal.NumberDecl):
+                value = ctx.evaluator.try_eval_decl(
+                    ref, lambda: transform_static_expr(ref.f_expr)
+                )
+                if value is not NOT_CONST:
+                    return irt.Lit(
+                        value,
+                        type_hint=expression_type(ref.f_expr),
+                        orig_node=expr
+                    )
+
+        elif expr.is_a(lal.AttributeRef):
+            bound = static_range_bound(expr)
+            if bound is not NOT_CONST:
+                return irt.Lit(
+                    bound,
+                    type_hint=expression_type(expr),
+                    orig_node=expr
+                )
+
+        return None
+
     @profile()
     def transform_expr(expr):
         """
@@ -1635,19 +2056,19 @@ def _gen_ir(ctx, subp):
                 lhs_pre_stmts, lhs = transform_expr(expr.f_left)
                 rhs_pre_stmts, rhs = transform_expr(expr.f_right)
 
-                return lhs_pre_stmts + rhs_pre_stmts, irt.FunCall(
+                return lhs_pre_stmts + rhs_pre_stmts, new_funcall(
                     transform_operator(expr.f_op, 2),
                     [lhs, rhs],
-                    type_hint=expr.p_expression_type,
+                    type_hint=expression_type(expr),
                     orig_node=expr
                 )
 
         elif expr.is_a(lal.UnOp):
             inner_pre_stmts, inner_expr = transform_expr(expr.f_expr)
-            return inner_pre_stmts, irt.FunCall(
+            return inner_pre_stmts, new_funcall(
                 transform_operator(expr.f_op, 1),
                 [inner_expr],
-                type_hint=expr.p_expression_type,
+                type_hint=expression_type(expr),
                 orig_node=expr
             )
 
@@ -1655,7 +2076,7 @@ def _gen_ir(ctx, subp):
             return gen_call_expr(
                 expr.f_name,
                 expr.f_suffix,
-                expr.p_expression_type,
+                expression_type(expr),
                 expr
             )
 
@@ -1748,7 +2169,7 @@ def _gen_ir(ctx, subp):
 
         elif expr.is_a(lal.Identifier):
             # Transform the identifier according what it refers to.
-            ref = expr.p_referenced_decl
+            ref = referenced_decl(expr)
             if ref is None:
                 unimplemented(expr)
             elif (expr.text, ref) in substitutions:
@@ -1756,7 +2177,7 @@ def _gen_ir(ctx, subp):
             elif ref.is_a(lal.ObjectDecl, lal.ParamSpec):
                 return [], get_var(expr, ref)
             elif ref.is_a(lal.SubpBody, lal.SubpDecl):
-                return gen_call_expr(expr, [], expr.p_expression_type, expr)
+                return gen_call_expr(expr, [], expression_type(expr), expr)
             elif ref.is_a(lal.EnumLiteralDecl):
                 return [], irt.Lit(
                     expr.text,
@@ -1764,7 +2185,18 @@ def _gen_ir(ctx, subp):
                     orig_node=expr
                 )
             elif ref.is_a(lal.NumberDecl):
-                return transform_expr(ref.f_expr)
+                # Named numbers are static: their value is computed once and
+                # shared by all the references to them.
+                value = ctx.evaluator.try_eval_decl(
+                    ref, lambda: transform_static_expr(ref.f_expr)
+                )
+                if value is NOT_CONST:
+                    return transform_expr(ref.f_expr)
+                return [], irt.Lit(
+                    value,
+                    type_hint=expression_type(ref.f_expr),
+                    orig_node=expr
+                )
             elif ref.is_a(lal.TypeDecl):
                 if ref.f_type_def.is_a(lal.SignedIntTypeDef):
                     return transform_expr(ref.f_type_def.f_range.f_range)
@@ -1790,13 +2222,16 @@ def _gen_ir(ctx, subp):
             # relevant for variant records).
             # Additionally, if an implicit dereference takes place, the
             # relevant assume statements are also inserted.
-            if expr.f_prefix.p_expression_type is None:
+            if expression_type(expr.f_prefix) is None:
                 unimplemented(expr)
 
-            if expr.f_prefix.p_expression_type.p_is_access_type:
-                access_type_def = expr.f_prefix.p_expression_type.f_type_def
+            prefix_type = expression_type(expr.f_prefix)
+            if ctx.properties.get(prefix_type, 'p_is_access_type'):
+                access_type_def = prefix_type.f_type_def
                 accessed_ind = access_type_def.f_subtype_indication
-                accessed_type = accessed_ind.p_designated_type_decl_from(expr)
+                accessed_type = ctx.properties.get(
+                    accessed_ind, 'p_designated_type_decl_from', expr
+                )
                 prefix_pre_stmts, prefix = transform_dereference(
                     expr.f_prefix, accessed_type, expr.f_prefix
                 )
@@ -1808,24 +2243,24 @@ def _gen_ir(ctx, subp):
                 expr.f_suffix
             )
 
-            return prefix_pre_stmts + exists_stmts, irt.FunCall(
-                ops.GetName(_field_info(expr.f_suffix).index),
+            return prefix_pre_stmts + exists_stmts, new_funcall(
+                ops.GetName(_field_info(ctx, expr.f_suffix).index),
                 [prefix],
-                type_hint=expr.p_expression_type,
+                type_hint=expression_type(expr),
                 orig_node=expr
             )
 
         elif expr.is_a(lal.IntLiteral):
             return [], irt.Lit(
                 int(expr.text),
-                type_hint=expr.p_expression_type,
+                type_hint=expression_type(expr),
                 orig_node=expr
             )
 
         elif expr.is_a(lal.NullLiteral):
             return [], irt.Lit(
                 access_paths.Null(),
-                type_hint=expr.p_expression_type,
+                type_hint=expression_type(expr),
                 orig_node=expr
             )
 
@@ -1837,7 +2272,7 @@ def _gen_ir(ctx, subp):
                 if i == len(text):
                     return lit
                 else:
-                    return irt.FunCall(
+                    return new_funcall(
                         ops.UPDATED,
                         [
                             build_lit(i + 1),
@@ -1847,15 +2282,15 @@ def _gen_ir(ctx, subp):
                                 type_hint=ctx.evaluator.universal_int
                             ),
                         ],
-                        type_hint=expr.p_expression_type,
+                        type_hint=expression_type(expr),
                         orig_node=expr,
-                        purpose=purpose.CallAssignment(expr.p_expression_type)
+                        purpose=purpose.CallAssignment(expression_type(expr))
                     )
 
-            return [irt.AssignStmt(lit, build_lit(0))], lit
+            return [new_assign(lit, build_lit(0))], lit
 
         elif expr.is_a(lal.Aggregate):
-            type_def = expr.p_expression_type.f_type_def
+            type_def = expression_type(expr).f_type_def
             if type_def.is_a(lal.RecordTypeDef):
                 return transform_record_aggregate(expr)
             elif type_def.is_a(lal.ArrayTypeDef):
@@ -1864,7 +2299,7 @@ def _gen_ir(ctx, subp):
         elif expr.is_a(lal.ExplicitDeref):
             return transform_dereference(
                 expr.f_prefix,
-                expr.p_expression_type,
+                expression_type(expr),
                 expr
             )
 
@@ -1874,11 +2309,19 @@ def _gen_ir(ctx, subp):
             attribute_text = expr.f_attribute.text
 
             if attribute_text in _attr_to_unop:
+                bound = static_range_bound(expr)
+                if bound is not NOT_CONST:
+                    return [], irt.Lit(
+                        bound,
+                        type_hint=expression_type(expr),
+                        orig_node=expr
+                    )
+
                 prefix_pre_stmts, prefix = transform_expr(expr.f_prefix)
-                return prefix_pre_stmts, irt.FunCall(
+                return prefix_pre_stmts, new_funcall(
                     _attr_to_unop[expr.f_attribute.text],
                     [prefix],
-                    type_hint=expr.p_expression_type,
+                    type_hint=expression_type(expr),
                     orig_node=expr
                 )
             elif attribute_text == 'Access':
@@ -1886,22 +2329,23 @@ def _gen_ir(ctx, subp):
             elif attribute_text == 'Result':
                 return substitutions[
                     expr.f_prefix.text + "'Result",
-                    expr.f_prefix.p_referenced_decl
+                    referenced_decl(expr.f_prefix)
                 ]
             elif attribute_text == 'Old':
                 return substitutions[
                     expr.f_prefix.text + "'Old",
-                    expr.f_prefix.p_referenced_decl
+                    referenced_decl(expr.f_prefix)
                 ]
             elif attribute_text == 'Image':
-                if expr.f_prefix.p_referenced_decl == expr.p_int_type:
+                int_type = ctx.properties.get(expr, 'p_int_type')
+                if referenced_decl(expr.f_prefix) == int_type:
                     arg_pre_stmts, arg_expr = transform_expr(
                         expr.f_args[0].f_r_expr
                     )
-                    return arg_pre_stmts, irt.FunCall(
+                    return arg_pre_stmts, new_funcall(
                         ops.IMAGE,
                         [arg_expr],
-                        type_hint=expr.p_expression_type,
+                        type_hint=expression_type(expr),
                         orig_node=expr
                     )
 
@@ -1940,7 +2384,7 @@ def _gen_ir(ctx, subp):
                 type_hint=spec.f_subp_returns
             )
 
-        if (_find_global_access(ctx.default_typer(), subp) ==
+        if (_find_global_access(ctx, ctx.default_typer(), subp) ==
                 _WRITES_GLOBAL_STATE):
             param_vars.append(stack.var)
 
@@ -1994,7 +2438,7 @@ def _gen_ir(ctx, subp):
                     stmt
                     for dest_pre_stmts, (dest, updated) in actuals_dests
                     for stmt in dest_pre_stmts + [
-                        irt.AssignStmt(dest, updated, orig_node=decl)
+                        new_assign(dest, updated, orig_node=decl)
                     ]
                 ]
 
@@ -2025,13 +2469,13 @@ def _gen_ir(ctx, subp):
             call_expr = stmt.f_call
             if call_expr.is_a(lal.Identifier, lal.DottedName):
                 return gen_call_expr(
-                    call_expr, [], call_expr.p_expression_type, stmt
+                    call_expr, [], expression_type(call_expr), stmt
                 )[0]
             else:
                 return gen_call_expr(
                     call_expr.f_name,
                     call_expr.f_suffix,
-                    call_expr.p_expression_type,
+                    expression_type(call_expr),
                     stmt
                 )[0]
 
@@ -2161,7 +2605,7 @@ def _gen_ir(ctx, subp):
             # Build its inverse. It is appended at the end of the loop. We know
             # that the inverse condition is true once the control goes out of
             # the loop as long as there are not exit statements.
-            not_cond = irt.FunCall(
+            not_cond = new_funcall(
                 ops.NOT,
                 [cond],
                 type_hint=cond.data.type_hint
@@ -2175,10 +2619,10 @@ def _gen_ir(ctx, subp):
 
             return [irt.LoopStmt(
                 cond_pre_stmts +
-                [irt.AssumeStmt(cond)] +
+                [new_assume(cond)] +
                 loop_stmts,
                 orig_node=stmt
-            ), irt.AssumeStmt(not_cond), exit_label]
+            ), new_assume(not_cond), exit_label]
 
         elif stmt.is_a(lal.ForLoopStmt):
             # todo
@@ -2189,7 +2633,7 @@ def _gen_ir(ctx, subp):
             return [labels[stmt.f_decl]]
 
         elif stmt.is_a(lal.GotoStmt):
-            label = labels[stmt.f_label_name.p_referenced_decl]
+            label = labels[referenced_decl(stmt.f_label_name)]
             return [irt.GotoStmt(label, orig_node=stmt)]
 
         elif stmt.is_a(lal.NamedStmt):
@@ -2219,7 +2663,7 @@ def _gen_ir(ctx, subp):
                 # loop stack.
                 exited_loop = loop_stack[-1]
             else:
-                named_loop_decl = stmt.f_loop_name.p_referenced_decl
+                named_loop_decl = referenced_decl(stmt.f_loop_name)
                 ref_loop = named_loop_decl.parent.f_stmt
                 # Find the exit label corresponding to the exited loop.
                 exited_loop = next(
@@ -2250,7 +2694,7 @@ def _gen_ir(ctx, subp):
             if stmt.f_return_expr is not None:
                 ret_pre_stmts, ret_expr = transform_expr(stmt.f_return_expr)
                 stmts.extend(ret_pre_stmts)
-                stmts.append(irt.AssignStmt(
+                stmts.append(new_assign(
                     result_var.value,
                     ret_expr,
                     orig_node=stmt
@@ -2306,7 +2750,7 @@ def _gen_ir(ctx, subp):
                 print_warning(stmt.text, e)
         return res
 
-    return irt.Program(
+    prog = irt.Program(
         transform_spec(subp.f_subp_spec) +
         transform_decls(subp.f_decls.f_decls) +
         transform_stmts(subp.f_stmts.f_stmts) +
@@ -2317,19 +2761,27 @@ def _gen_ir(ctx, subp):
         param_vars=param_vars
     )
 
+    ConvertUniversalTypes(ctx.evaluator).convert(const_holders)
+
+    return prog
 
-class ConvertUniversalTypes(IRImplicitVisitor):
+
+class ConvertUniversalTypes(object):
     """
-    Visitor that mutates the given IR tree so as to remove references to
-    universal types from in node data's type hints.
+    Mutates IR nodes so as to remove references to universal types from
+    node data's type hints.
+
+    Universal types only appear in constant expressions, i.e. literals and
+    function calls of which all the arguments are constant. Only the nodes
+    holding such expressions, which are recorded while the program is
+    built (see _gen_ir), are converted: their constant expressions are
+    folded into literals of the expected type whenever possible.
     """
 
     def __init__(self, evaluator):
         """
         :param ConstExprEvaluator evaluator: A const expr evaluator.
         """
-        super(ConvertUniversalTypes, self).__init__()
-
         self.evaluator = evaluator
 
     def has_universal_type(self, expr):
@@ -2341,10 +2793,9 @@ class ConvertUniversalTypes(IRImplicitVisitor):
 
         :rtype: bool
         """
-        return expr.data.type_hint in [
-            self.evaluator.universal_int,
-            self.evaluator.universal_real
-        ]
+        type_hint = expr.data.type_hint
+        return (type_hint == self.evaluator.universal_int or
+                type_hint == self.evaluator.universal_real)
 
     def try_convert_expr(self, expr, expected_type):
         """
@@ -2354,92 +2805,126 @@ class ConvertUniversalTypes(IRImplicitVisitor):
             expression.
 
         :return: An equivalent expression which does not have an universal
-            type.
+            type. This is the given expression itself if it did not need
+            to be converted.
 
         :rtype: irt.Expr
         """
-        try:
-            return irt.Lit(
-                self.evaluator.eval(expr),
-                type_hint=expected_type
-            )
-        except NotConstExprError:
-            expr.visit(self)
+        if (isinstance(expr, irt.Lit) and
+                expr.data.type_hint == expected_type):
             return expr
 
-    def visit_assign(self, assign):
-        assign.expr = self.try_convert_expr(
-            assign.expr,
-            assign.id.data.type_hint
-        )
+        value = self.evaluator.try_eval(expr)
+        if value is NOT_CONST:
+            if isinstance(expr, irt.FunCall):
+                # All the arguments of a constant function call are constant
+                # themselves.
+                self.convert_args(expr, range(len(expr.args)))
+            return expr
 
-    def visit_assume(self, assume):
-        assume.expr = self.try_convert_expr(assume.expr, self.evaluator.bool)
+        return irt.Lit(value, type_hint=expected_type)
 
-    def visit_funcall(self, funcall):
-        if any(self.has_universal_type(arg) for arg in funcall.args):
-            if 'callee_type' in funcall.data:
-                # Case where we have information about the callee type
-                tpe = funcall.data.callee_type
-                if _is_array_type_decl(tpe):
-                    # if the "callee" is an array
-                    indices = tpe.f_type_def.f_indices.f_list
-                    funcall.args[1:] = [
-                        self.try_convert_expr(arg, indices[i])
-                        for i, arg in enumerate(funcall.args[1:])
-                    ]
-            elif purpose.FieldAssignment.is_purpose_of(funcall):
-                # Case where the function is an update call replacing a
-                # field assignment. (p.x = y)
-                funcall.args[1] = self.try_convert_expr(
-                    funcall.args[1],
-                    funcall.data.purpose.field_type_hint
-                )
-            elif purpose.CallAssignment.is_purpose_of(funcall):
-                # Case where the function is an udpate call replacing a
-                # call assignment. (a(i) = b)
-                tpe = funcall.data.purpose.callee_type
-                if _is_array_type_decl(tpe):
-                    # if the "callee" is an array
-                    tdef = tpe.f_type_def
-                    indices = tdef.f_indices.f_list
-                    funcall.args[1] = self.try_convert_expr(
-                        funcall.args[1],
-                        tdef.f_component_type.f_type_expr
-                    )
-                    funcall.args[2:] = [
-                        self.try_convert_expr(arg, indices[i])
-                        for i, arg in enumerate(funcall.args[2:])
-                    ]
-            elif purpose.DerefAssignment.is_purpose_of(funcall):
-                # Case where the function is an update call replacing a
-                # deref assignment. (x.all = y)
-                funcall.args[2] = self.try_convert_expr(
-                    funcall.args[2],
-                    funcall.data.purpose.accessed_type_hint
-                )
-            else:
-                # Otherwise, assume that functions that accept one argument
-                # as universal int/real need all their arguments to be of the
-                # same type, which is true for arithmetic ops, comparison ops,
-                # etc.
-                expected_type = next(
-                    arg.data.type_hint
-                    for arg in funcall.args
-                    if not self.has_universal_type(arg)
-                )
+    def expected_arg_types(self, funcall):
+        """
+        :param irt.FunCall funcall: A function call which has arguments of
+            universal type.
 
-                funcall.args = [
-                    self.try_convert_expr(arg, expected_type)
-                    for arg in funcall.args
-                ]
+        :return: The types to which arguments must be converted, indexed by
+            the position of the argument. Arguments which are not in this
+            mapping keep their own type.
 
-        funcall.args = [
-            self.try_convert_expr(arg, arg.data.type_hint)
-            for arg in funcall.args
-        ]
+        :rtype: dict[int, lal.AdaNode]
+        """
+        if 'callee_type' in funcall.data:
+            # Case where we have information about the callee type
+            tpe = funcall.data.callee_type
+            if _is_array_type_decl(tpe):
+                # if the "callee" is an array
+                indices = tpe.f_type_def.f_indices.f_list
+                return {
+                    i + 1: indices[i]
+                    for i in range(len(funcall.args) - 1)
+                }
+        elif purpose.FieldAssignment.is_purpose_of(funcall):
+            # Case where the function is an update call replacing a
+            # field assignment. (p.x = y)
+            return {1: funcall.data.purpose.field_type_hint}
+        elif purpose.CallAssignment.is_purpose_of(funcall):
+            # Case where the function is an udpate call replacing a
+            # call assignment. (a(i) = b)
+            tpe = funcall.data.purpose.callee_type
+            if _is_array_type_decl(tpe):
+                # if the "callee" is an array
+                tdef = tpe.f_type_def
+                indices = tdef.f_indices.f_list
+                expected = {
+                    i + 2: indices[i]
+                    for i in range(len(funcall.args) - 2)
+                }
+                expected[1] = tdef.f_component_type.f_type_expr
+                return expected
+        elif purpose.DerefAssignment.is_purpose_of(funcall):
+            # Case where the function is an update call replacing a
+            # deref assignment. (x.all = y)
+            return {2: funcall.data.purpose.accessed_type_hint}
+        else:
+            # Otherwise, assume that functions that accept one argument
+            # as universal int/real need all their arguments to be of the
+            # same type, which is true for arithmetic ops, comparison ops,
+            # etc.
+            expected_type = next(
+                arg.data.type_hint
+                for arg in funcall.args
+                if not self.has_universal_type(arg)
+            )
+            return {i: expected_type for i in range(len(funcall.args))}
+
+        return {}
+
+    def convert_args(self, funcall, positions):
+        """
+        Converts the arguments of the given function call at the given
+        positions, replacing them in place.
+
+        :param irt.FunCall funcall: A function call.
+        :param iterable[int] positions: The positions of its constant
+            arguments.
+        """
+        args = funcall.args
+
+        if any(self.has_universal_type(arg) for arg in args):
+            expected = self.expected_arg_types(funcall)
+        else:
+            expected = {}
+
+        for i in positions:
+            arg = args[i]
+            converted = self.try_convert_expr(
+                arg, expected.get(i, arg.data.type_hint)
+            )
+            if converted is not arg:
+                args[i] = converted
 
-        super(ConvertUniversalTypes, self).visit_funcall(funcall)
+    def convert(self, holders):
+        """
+        :param list[(irt.Node, list[int] | None)] holders: The nodes holding
+            constant expressions: assign and assume statements whose
+            expression is constant, and function calls along with the
+            positions of their constant arguments.
+        """
+        for node, positions in holders:
+            if isinstance(node, irt.AssignStmt):
+                node.expr = self.try_convert_expr(
+                    node.expr,
+                    node.id.data.type_hint
+                )
+            elif isinstance(node, irt.AssumeStmt):
+                node.expr = self.try_convert_expr(
+                    node.expr,
+                    self.evaluator.bool
+                )
+            else:
+                self.convert_args(node, positions)
 
 
 class NotConstExprError(ValueError):
@@ -2447,6 +2932,21 @@ class NotConstExprError(ValueError):
         super(NotConstExprError, self).__init__()
 
 
+class _NotConst(object):
+    """
+    The type of NOT_CONST.
+    """
+    def __repr__(self):
+        return 'NOT_CONST'
+
+
+NOT_CONST = _NotConst()
+"""
+The result of ConstExprEvaluator.try_eval on expressions which are not
+static.
+"""
+
+
 ADA_TRUE = 'True'
 ADA_FALSE = 'False'
 
@@ -2505,6 +3005,13 @@ class ConstExprEvaluator(IRImplicitVisitor):
         self.universal_int = u_int_type
         self.universal_real = u_real_type
 
+        # The values of the expressions that were evaluated, or NOT_CONST.
+        # Weakly referenced, as the programs they belong to may be dropped.
+        self._expr_values = weakref.WeakKeyDictionary()
+
+        # The values of the declarations that were evaluated, or NOT_CONST.
+        self._decl_values = {}
+
     @staticmethod
     def to_bool(x):
         """
@@ -2523,6 +3030,18 @@ class ConstExprEvaluator(IRImplicitVisitor):
         """
         return ADA_TRUE if x else ADA_FALSE
 
+    def try_eval(self, expr):
+        """
+        Evaluates an expression, returning the value it evaluates to.
+
+        :param irt.Expr expr: A Basic IR expression to evaluate.
+        :return: The value of the expression, or NOT_CONST if it is not a
+            constant.
+        :rtype: int | str | ConstExprEvaluator.Range | _NotConst
+        :raise NotImplementedError: if implementation is incomplete.
+        """
+        return self.visit(expr)
+
     def eval(self, expr):
         """
         Evaluates an expression, returning the value it evaluates to.
@@ -2532,34 +3051,98 @@ class ConstExprEvaluator(IRImplicitVisitor):
         :raise NotConstExprError: if the expression is not a constant.
         :raise NotImplementedError: if implementation is incomplete.
         """
-        return self.visit(expr)
+        value = self.visit(expr)
+        if value is NOT_CONST:
+            raise NotConstExprError
+        return value
+
+    def fold(self, expr):
+        """
+        :param irt.Expr expr: A Basic IR expression.
+        :return: A literal holding the value of the expression, with the
+            same type hint, or None if it is not a constant (or a range).
+        :rtype: irt.Lit | None
+        """
+        # Optimization passes replace function call arguments in place
+        # (e.g. an identifier by the literal it holds), so the values that
+        # were cached for the function calls of this expression may be
+        # stale.
+        for node in visitors.findall(
+                expr, lambda n: isinstance(n, irt.FunCall)):
+            self._expr_values.pop(node, None)
+
+        value = self.try_eval(expr)
+        if value is NOT_CONST or isinstance(value, ConstExprEvaluator.Range):
+            return None
+        return irt.Lit(value, type_hint=expr.data.type_hint)
+
+    def try_eval_decl(self, decl, lower):
+        """
+        Evaluates the expression defining a declaration, such as a named
+        number or the range of a scalar type. The result is cached for the
+        declaration, so that the expression is only lowered and evaluated
+        the first time the declaration is referred to.
+
+        :param lal.BasicDecl decl: The declaration.
+        :param () -> (irt.Expr | None) lower: A function returning the
+            lowered expression defining the declaration, or None if that
+            expression is not static.
+        :return: The value of the expression, or NOT_CONST if it is not a
+            constant.
+        :rtype: int | str | ConstExprEvaluator.Range | _NotConst
+        """
+        try:
+            return self._decl_values[decl]
+        except KeyError:
+            expr = lower()
+            value = self._decl_values[decl] = (
+                NOT_CONST if expr is None else self.try_eval(expr)
+            )
+            return value
+
+    def clear_decl_values(self):
+        """
+        Drops the values cached for declarations (see try_eval_decl), which
+        must be done when their unit is reparsed.
+        """
+        self._decl_values.clear()
 
-    @memoize
     def visit(self, expr):
         """
         To use instead of node.visit(self). Performs memoization, so as to
-        avoid evaluating expression referred to by constant symbols multiple
-        times.
+        avoid evaluating shared expressions, or expressions that were
+        already tried, multiple times.
 
         :param irt.Expr expr: The IR Basic expression to evaluate
 
-        :return: The value of this expression.
+        :return: The value of this expression, or NOT_CONST.
 
-        :rtype: int | str | ConstExprEvaluator.Range
+        :rtype: int | str | ConstExprEvaluator.Range | _NotConst
         """
-        return expr.visit(self)
+        try:
+            return self._expr_values[expr]
+        except KeyError:
+            value = self._expr_values[expr] = expr.visit(self)
+            return value
 
     def visit_ident(self, ident):
-        raise NotConstExprError
+        return NOT_CONST
 
     def visit_funcall(self, funcall):
-        try:
-            op = ConstExprEvaluator.Ops[funcall.fun_id, len(funcall.args)]
-            return op(*(
-                self.visit(arg) for arg in funcall.args
-            ))
-        except KeyError:
-            raise NotConstExprError
+        op = ConstExprEvaluator.Ops.get(
+            (funcall.fun_id, len(funcall.args)), None
+        )
+        if op is None:
+            return NOT_CONST
+
+        args = []
+        for arg in funcall.args:
+            value = self.visit(arg)
+            if value is NOT_CONST:
+                return NOT_CONST
+            args.append(value)
+
+        return op(*args)
 
     def visit_lit(self, lit):
         return lit.val
@@ -2596,25 +3179,35 @@ def enum_typer(hint):
 _pointer_type = types.Pointer()
 
 
-@types.Typer
-def access_typer(hint):
+def access_typer(ctx):
     """
-    :param lal.AdaNode hint: the lal type.
-    :return: The lal type being accessed.
-    :rtype: lal.AdaNode
+    :param ExtractionContext ctx: The program extraction context.
+    :return: A typer for access types.
+    :rtype: types.Typer[lal.AdaNode]
     """
-    if hint.is_a(lal.TypeDecl):
-        try:
-            if hint.p_is_access_type:
-                return _pointer_type
-        except lal.PropertyError:
-            pass
-    elif hint.is_a(_PointerType):
-        return _pointer_type
+    @types.Typer
+    def typer(hint):
+        """
+        :param lal.AdaNode hint: the lal type.
+        :return: The lal type being accessed.
+        :rtype: lal.AdaNode
+        """
+        if hint.is_a(lal.TypeDecl):
+            try:
+                if ctx.properties.get(hint, 'p_is_access_type'):
+                    return _pointer_type
+            except lal.PropertyError:
+                pass
+        elif hint.is_a(_PointerType):
+            return _pointer_type
 
+    return typer
 
-def record_component_typer(inner_typer):
+
+def record_component_typer(ctx, inner_typer):
     """
+    :param ExtractionContext ctx: The program extraction context.
+
     :param types.Typer[lal.AdaNode] inner_typer: A typer for the types of the
         components.
 
@@ -2627,14 +3220,18 @@ def record_component_typer(inner_typer):
         if component.is_a(lal.ComponentDecl):
             return component.f_component_def.f_type_expr
         elif component.is_a(lal.DiscriminantSpec):
-            component.f_type_expr.f_name.p_resolve_names
+            ctx.properties.get(
+                component.f_type_expr.f_name, 'p_resolve_names'
+            )
             return component.f_type_expr
 
     return get_component_type >> inner_typer
 
 
-def record_typer(comp_typer):
+def record_typer(ctx, comp_typer):
     """
+    :param ExtractionContext ctx: The program extraction context.
+
     :param types.Typer[lal.ComponentDecl | lal.DiscriminantSpec] comp_typer:
         A typer for components of products.
 
@@ -2651,7 +3248,7 @@ def record_typer(comp_typer):
         """
         if hint.is_a(lal.TypeDecl):
             if hint.f_type_def.is_a(lal.RecordTypeDef):
-                return [field.decl for field in _record_fields(hint)]
+                return [field.decl for field in _record_fields(ctx, hint)]
 
     to_product = Transformer.as_transformer(types.Product)
 
@@ -2659,8 +3256,25 @@ def record_typer(comp_typer):
     return get_elements >> comp_typer.lifted() >> to_product
 
 
-def name_typer(inner_typer):
+def _designated_type_decl(ctx, hint):
     """
+    :param ExtractionContext ctx: The program extraction context.
+    :param lal.AdaNode hint: the lal type expression.
+    :return: The type declaration associated to the name, if relevant.
+    :rtype: lal.BaseTypeDecl | None
+    """
+    if hint.is_a(lal.SubtypeIndication):
+        # todo: Take constraint into account
+        try:
+            return ctx.properties.get(hint, 'p_designated_type_decl')
+        except lal.PropertyError:
+            pass
+
+
+def name_typer(ctx, inner_typer):
+    """
+    :param ExtractionContext ctx: The program extraction context.
+
     :param types.Typer[lal.AdaNode] inner_typer: A typer for elements
         being referred by identifiers.
 
@@ -2668,20 +3282,9 @@ def name_typer(inner_typer):
 
     :rtype: types.Typer[lal.AdaNode]
     """
-    @Transformer.as_transformer
-    def resolved_name(hint):
-        """
-        :param lal.AdaNode hint: the lal type expression.
-        :return: The type declaration associated to the name, if relevant.
-        :rtype: lal.BaseTypeDecl
-        """
-        if hint.is_a(lal.SubtypeIndication):
-            # todo: Take constraint into account
-            try:
-                return hint.p_designated_type_decl
-            except lal.PropertyError:
-                pass
-
+    resolved_name = Transformer.as_transformer(
+        lambda hint: _designated_type_decl(ctx, hint)
+    )
     return resolved_name >> inner_typer
 
 
@@ -2788,6 +3391,25 @@ def subtyper(inner):
     return get_subtype >> inner
 
 
+def _canonical_type_hint(ctx):
+    """
+    :param ExtractionContext ctx: The program extraction context.
+
+    :return: A transformer which returns the type declaration designated by
+        a hint if it is a subtype indication, the hint itself otherwise.
+        Used so that all the hints designating the same type share a single
+        typing result.
+
+    :rtype: Transformer[lal.AdaNode, lal.AdaNode]
+    """
+    @Transformer.as_transformer
+    def canonical(hint):
+        decl = _designated_type_decl(ctx, hint)
+        return hint if decl is None else decl
+
+    return canonical
+
+
 @types.typer
 def ram_typer(hint):
     if hint.is_a(_StackType):
@@ -2807,6 +3429,200 @@ def none_typer(hint):
         return types.Product([])
 
 
+def _subprograms_of(unit):
+    """
+    :param lal.AnalysisUnit unit: The unit to search in.
+    :return: The subprograms of the given unit which are to be lowered to
+        Basic IR programs, in a deterministic order.
+    :rtype: list[lal.SubpBody | lal.ExprFunction]
+    """
+    return unit.root.findall((
+        lal.SubpBody,
+        lal.ExprFunction
+    ))
+
+
+class _NodeLocations(object):
+    """
+    Used as the external reference identifier when serializing Basic IR
+    programs (see serialization.dumps): libadalang nodes are replaced by
+    their location, which is stable across analysis contexts. Also records
+    the files in which the encountered nodes are located.
+
+    The location of a node is the path of child indices leading to it from
+    the root of its unit: unlike source ranges, it designates a single node
+    even when nested nodes span the same range.
+    """
+    def __init__(self):
+        self.files = set()
+        self._paths = {}
+
+    def _path(self, node):
+        """
+        :param lal.AdaNode node: A libadalang node.
+        :return: The indices of the children leading to the given node from
+            the root of its unit.
+        :rtype: tuple[int]
+        """
+        path = self._paths.get(node)
+        if path is None:
+            parent = node.parent
+            if parent is None:
+                path = ()
+            else:
+                path = self._path(parent) + (_index_of(node, parent),)
+            self._paths[node] = path
+        return path
+
+    def __call__(self, obj):
+        """
+        :param object obj: The object being serialized.
+        :return: A (file name, path, kind) tuple if the object is a
+            libadalang node, None otherwise.
+        :rtype: (str, tuple[int], str) | None
+        """
+        if isinstance(obj, lal.AdaNode):
+            filename = obj.unit.filename
+            self.files.add(filename)
+            return filename, self._path(obj), type(obj).__name__
+        return None
+
+
+def _file_digest(filename):
+    """
+    :param str filename: The path to a file.
+    :return: The SHA-1 digest of the content of the file, or None if there
+        is no such file (e.g. for the standard unit).
+    :rtype: str | None
+    """
+    if not os.path.isfile(filename):
+        return None
+
+    with open(filename, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+_sources_digest = None
+
+
+def _lalcheck_sources_digest():
+    """
+    :return: The SHA-1 digest of the sources of the lalcheck package, which
+        is computed only once. Programs lowered by another version of the
+        frontend must not be reloaded from the IR cache.
+    :rtype: str
+    """
+    global _sources_digest
+    if _sources_digest is None:
+        root = os.path.dirname(os.path.dirname(os.path.dirname(
+            os.path.dirname(os.path.abspath(__file__))
+        )))
+        digest = hashlib.sha1()
+        for dir_path, dir_names, file_names in sorted(os.walk(root)):
+            dir_names.sort()
+            for file_name in sorted(file_names):
+                if file_name.endswith('.py'):
+                    path = os.path.join(dir_path, file_name)
+                    digest.update(os.path.relpath(path, root))
+                    with open(path, 'rb') as f:
+                        digest.update(f.read())
+        _sources_digest = digest.hexdigest()
+
+    return _sources_digest
+
+
+def _unit_dependencies(lal_ctx, unit):
+    """
+    :param lal.AnalysisContext lal_ctx: The context of the unit.
+
+    :param lal.AnalysisUnit unit: An analysis unit.
+
+    :return: The files of the given unit and of the units it transitively
+        depends on: the units it withs, their parent units, and the
+        specification of the unit if it is a body. Constants declared in
+        those units may be folded in the programs of the unit without
+        leaving any reference to them.
+
+    :rtype: set[str]
+    """
+    files = set()
+    to_visit = [unit]
+
+    while len(to_visit) > 0:
+        dep = to_visit.pop()
+        if dep.filename in files:
+            continue
+
+        files.add(dep.filename)
+        if dep.root is None:
+            continue
+
+        names = [
+            name.text
+            for clause in dep.root.findall(lal.WithClause)
+            for name in clause.f_packages
+        ]
+
+        for item in dep.root.findall(lal.LibraryItem):
+            if item.f_item.is_a(lal.PackageBody):
+                names.append(item.f_item.f_package_name.text)
+            elif item.f_item.is_a(lal.SubpBody):
+                names.append(item.f_item.f_subp_spec.f_subp_name.text)
+
+        for name in names:
+            parts = ''.join(name.split()).split('.')
+            for i in range(1, len(parts) + 1):
+                to_visit.append(lal_ctx.get_from_provider(
+                    '.'.join(parts[:i]), 'specification'
+                ))
+
+    return files
+
+
+_worker_ctx = None
+"""
+The extraction context of the current lowering worker process.
+"""
+
+
+def _init_lowering_worker(project_file, models, optimize):
+    """
+    Initializes a lowering worker process, by creating its own extraction
+    context on the given project.
+
+    :param str | None project_file: The project file.
+    :param list[str] models: The names of the models to use.
+    :param bool optimize: Whether the programs must be optimized.
+    """
+    global _worker_ctx
+    _worker_ctx = ExtractionContext(project_file, optimize=optimize)
+    for model in models:
+        _worker_ctx.use_model(model)
+
+
+def _lower_in_worker(task):
+    """
+    Lowers a single subprogram in a lowering worker process.
+
+    :param (str, int) task: The file name of the unit containing the
+        subprogram, and the index of that subprogram in the unit (see
+        _subprograms_of).
+
+    :return: The serialized Basic IR program, and the files referenced by
+        it (see _NodeLocations).
+    :rtype: (str, set[str])
+    """
+    filename, index = task
+    unit = _worker_ctx.lal_ctx.get_from_file(filename)
+    unit.populate_lexical_env()
+    prog = _gen_ir(_worker_ctx, _subprograms_of(unit)[index])
+    if _worker_ctx.optimizer is not None:
+        _worker_ctx.optimizer.run(prog)
+
+    locations = _NodeLocations()
+    return serialization.dumps(prog, locations), locations.files
+
+
 class ExtractionContext(object):
     """
     The libadalang-based frontend interface. Provides method for extracting
@@ -2817,7 +3633,39 @@ class ExtractionContext(object):
     compatible. Also, this extraction context must be kept alive as long
     as the programs parsed with it are intended to be used.
     """
-    def __init__(self, project_file=None):
+    def __init__(self, project_file=None, jobs=1, ir_cache_dir=None,
+                 optimize=False):
+        """
+        :param str | None project_file: The project file to use.
+
+        :param int jobs: The number of worker processes used to lower the
+            subprograms of a unit. Each worker has its own libadalang context
+            on the same project, and sends back its programs in a serialized
+            form, in which libadalang nodes are resolved back in this
+            context. Workers are started the first time they are needed,
+            and are kept for the following units until close is called. If
+            1, subprograms are lowered in this process.
+
+        :param str | None ir_cache_dir: The directory in which the programs
+            extracted from a unit are cached, in serialized form. They are
+            reused as long as none of the files they refer to, nor the files
+            of the units the unit depends on, are modified, and as long as
+            they were written by the same version of lalcheck. Entries which
+            cannot be loaded are discarded. Cache entries are unpickled, so
+            the directory must only be writable by trusted users. If None,
+            programs are not cached.
+
+        :param bool optimize: Whether the extracted programs are optimized
+            using the default passes (see passes.default_pipeline). The
+            statistics of the passes are accumulated in the "stats" of the
+            "optimizer" pass manager. Programs lowered in worker processes
+            are optimized there, and their statistics are not reported.
+        """
+        self.project_file = project_file
+        self.jobs = jobs
+        self.ir_cache_dir = ir_cache_dir
+        self.models = []
+
         if project_file is None:
             self.lal_ctx = lal.AnalysisContext()
         else:
@@ -2830,8 +3678,10 @@ class ExtractionContext(object):
             "<dummy>", 'package Dummy is end;'
         ).root
 
+        self.standard_unit = dummy.p_standard_unit
+
         # Find the Character TypeDecl.
-        char_type = dummy.p_standard_unit.root.find(
+        char_type = self.standard_unit.root.find(
             lambda x: x.is_a(lal.TypeDecl) and x.f_name.text == "Character"
         )
 
@@ -2846,25 +3696,89 @@ class ExtractionContext(object):
         self.type_models = {}
         self.fun_models = {}
 
-    def extract_programs_from_file(self, ada_file):
+        self.optimizer = (
+            passes.default_pipeline(self.evaluator.fold) if optimize
+            else None
+        )
+
+        self._default_typers = {}
+
+        # The spill index of the unit being lowered (see vars_to_spill).
+        self._spill_index = None
+
+        # The results of libadalang properties queried during lowering.
+        self.properties = _PropertyCache()
+
+        # The results of the functions memoized in this context, indexed by
+        # function (see _context_memoize).
+        self.memos = {}
+
+        # The pool of lowering worker processes (see _worker_pool).
+        self._pool = None
+
+    def close(self):
+        """
+        Stops the lowering worker processes, if any were started. The
+        context can still be used afterwards, in which case new workers are
+        started when needed.
+        """
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def extract_programs_from_file(self, ada_file, reparse=False):
         """
         :param str ada_file: A path to the Ada source file from which to
             extract programs.
 
+        :param bool reparse: Whether the file must be reparsed if it was
+            already parsed, e.g. because it was modified since then. Doing
+            so invalidates the nodes of the unit, thus the cached results
+            of libadalang properties, the memoized results indexed by nodes
+            and the default typers are dropped.
+
         :return: a Basic IR Program for each subprogram body that exists in the
             given source code.
 
         :rtype: iterable[irt.Program]
         """
-        return self._extract_from_unit(self.lal_ctx.get_from_file(ada_file))
+        if reparse:
+            # Workers would keep lowering the previous version of the unit.
+            self.close()
+            self.properties.clear()
+            self.memos.clear()
+            self._default_typers.clear()
+            self.evaluator.clear_decl_values()
+            self._spill_index = None
+
+        return self._extract_from_unit(
+            self.lal_ctx.get_from_file(ada_file, reparse=reparse)
+        )
 
     def extract_programs_from_provider(self, name, kind):
         return self._extract_from_unit(self.lal_ctx.get_from_provider(
             name, kind
         ))
 
+    def vars_to_spill(self, subp):
+        """
+        :param lal.SubpBody | lal.ExprFunction subp: A subprogram.
+
+        :return: The variables accessed in the given subprogram, which must
+            therefore be spilled. The whole unit of the subprogram is indexed
+            the first time one of its subprograms is queried, and the index
+            is kept until a subprogram from another unit is queried.
+
+        :rtype: set[lal.BasicDecl]
+        """
+        if self._spill_index is None or self._spill_index.unit != subp.unit:
+            self._spill_index = _SpillIndex(self, subp.unit)
+        return self._spill_index.vars_to_spill(subp)
+
     @profile()
     def use_model(self, name):
+        self.models.append(name)
         model_unit = self.lal_ctx.get_from_provider(name, "specification")
         for diag in model_unit.diagnostics:
             print('   {}'.format(diag))
@@ -2874,14 +3788,16 @@ class ExtractionContext(object):
             lambda x: x.is_a(lal.AspectAssoc) and x.f_id.text == "Model_Of"
         )
 
+        referenced_decl = self.properties.getter('p_referenced_decl')
+
         type_models = {
-            aspect.parent.parent.parent: aspect.f_expr.p_referenced_decl
+            aspect.parent.parent.parent: referenced_decl(aspect.f_expr)
             for aspect in model_ofs
             if aspect.parent.parent.parent.is_a(lal.TypeDecl, lal.SubtypeDecl)
         }
 
         fun_models = {
-            aspect.parent.parent.parent: aspect.f_expr.p_referenced_decl
+            aspect.parent.parent.parent: referenced_decl(aspect.f_expr)
             for aspect in model_ofs
             if aspect.parent.parent.parent.is_a(lal.SubpDecl)
         }
@@ -2907,6 +3823,17 @@ class ExtractionContext(object):
             else:
                 self.fun_models[ref] = fdecl
 
+        # Types that were already computed may now be modeled, as well as
+        # the contracts and side effects of procedures.
+        self._default_typers.clear()
+        self.memos.clear()
+
+        # Procedures may now be modeled, changing what must be spilled.
+        self._spill_index = None
+
+        # Workers must be restarted so as to use this model as well.
+        self.close()
+
     @profile()
     def _extract_from_unit(self, unit):
         if unit.root is None:
@@ -2917,21 +3844,185 @@ class ExtractionContext(object):
 
         unit.populate_lexical_env()
 
-        progs = [
-            _gen_ir(self, subp)
-            for subp in unit.root.findall((
-                lal.SubpBody,
-                lal.ExprFunction
-            ))
-        ]
+        progs = self._load_cached_programs(unit)
+        if progs is not None:
+            return progs
 
-        converter = ConvertUniversalTypes(self.evaluator)
+        subps = _subprograms_of(unit)
 
-        for prog in progs:
-            prog.visit(converter)
+        if self.jobs > 1 and len(subps) > 1:
+            dumps, files = self._lower_in_workers(unit, len(subps))
+            progs = self._load_programs(dumps)
+        else:
+            progs = [_gen_ir(self, subp) for subp in subps]
+            self._spill_index = None
+
+            if self.optimizer is not None:
+                for prog in progs:
+                    self.optimizer.run(prog)
+
+            if self.ir_cache_dir is not None:
+                locations = _NodeLocations()
+                dumps = [
+                    serialization.dumps(prog, locations)
+                    for prog in progs
+                ]
+                files = locations.files
+
+        if self.ir_cache_dir is not None:
+            self._store_cached_programs(unit, dumps, files)
 
         return progs
 
+    def _lower_in_workers(self, unit, subp_count):
+        """
+        Lowers the subprograms of the given unit using a pool of worker
+        processes.
+
+        :param lal.AnalysisUnit unit: The unit containing the subprograms.
+        :param int subp_count: The number of subprograms in the unit.
+
+        :return: The serialized programs, and the files they reference.
+        :rtype: (list[str], set[str])
+        """
+        results = self._worker_pool().map(
+            _lower_in_worker,
+            [(unit.filename, i) for i in range(subp_count)]
+        )
+
+        dumps = [dump for dump, _ in results]
+        files = set(f for _, prog_files in results for f in prog_files)
+        return dumps, files
+
+    def _worker_pool(self):
+        """
+        :return: The pool of lowering worker processes of this context,
+            which is started the first time it is requested.
+        :rtype: multiprocessing.pool.Pool
+        """
+        if self._pool is None:
+            self._pool = Pool(
+                self.jobs,
+                _init_lowering_worker,
+                (self.project_file, self.models, self.optimizer is not None)
+            )
+        return self._pool
+
+    def _load_programs(self, dumps):
+        """
+        :param list[str] dumps: The serialized programs.
+
+        :return: The deserialized programs, in which node locations are
+            resolved back to nodes of this context.
+
+        :rtype: list[irt.Program]
+        """
+        found = {}
+
+        def resolve(location):
+            if location not in found:
+                found[location] = self._find_node(location)
+            return found[location]
+
+        return [serialization.loads(dump, resolve) for dump in dumps]
+
+    def _find_node(self, location):
+        """
+        :param (str, tuple[int], str) location: The location of a
+            libadalang node, as computed by _NodeLocations.
+        :return: The node at this location in this context.
+        :rtype: lal.AdaNode
+        :raise LookupError: If there is no node of the expected kind at this
+            location, e.g. because the file was modified.
+        """
+        filename, path, kind = location
+
+        if filename == self.standard_unit.filename:
+            unit = self.standard_unit
+        else:
+            unit = self.lal_ctx.get_from_file(filename)
+
+        node = unit.root
+        for index in path:
+            if node is None or index >= len(node):
+                node = None
+                break
+            node = node[index]
+
+        if node is None or type(node).__name__ != kind:
+            raise LookupError("Could not find {} at {} in {}".format(
+                kind, path, filename
+            ))
+
+        return node
+
+    def _cache_path(self, unit):
+        """
+        :param lal.AnalysisUnit unit: An analysis unit.
+        :return: The path to the file caching the programs of the unit.
+        :rtype: str
+        """
+        key = hashlib.sha1(repr(
+            (unit.filename, self.project_file, self.models,
+             self.optimizer is not None, serialization.FORMAT_VERSION,
+             _lalcheck_sources_digest())
+        )).hexdigest()
+        return os.path.join(self.ir_cache_dir, key + '.ir')
+
+    def _load_cached_programs(self, unit):
+        """
+        :param lal.AnalysisUnit unit: An analysis unit.
+
+        :return: The programs of the unit, if they were cached and none of
+            the files they reference changed since then. None otherwise.
+
+        :rtype: list[irt.Program] | None
+        """
+        if self.ir_cache_dir is None:
+            return None
+
+        path = self._cache_path(unit)
+        try:
+            with open(path, 'rb') as f:
+                digests, dumps = cPickle.load(f)
+
+            if any(_file_digest(f) != digest
+                   for f, digest in digests.iteritems()):
+                return None
+
+            return self._load_programs(dumps)
+        except IOError:
+            # There is no cache entry for this unit yet.
+            return None
+        except (cPickle.UnpicklingError, EOFError, AttributeError,
+                ImportError, IndexError, TypeError, ValueError,
+                LookupError, zlib.error):
+            # The entry is truncated, corrupted, or refers to classes or
+            # nodes that do not exist anymore: discard it, so that it is
+            # replaced by the programs lowered again.
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+
+    def _store_cached_programs(self, unit, dumps, files):
+        """
+        :param lal.AnalysisUnit unit: An analysis unit.
+        :param list[str] dumps: The serialized programs of the unit.
+        :param set[str] files: The files referenced by the programs.
+        """
+        if not os.path.isdir(self.ir_cache_dir):
+            os.makedirs(self.ir_cache_dir)
+
+        digests = {
+            f: _file_digest(f)
+            for f in files | _unit_dependencies(self.lal_ctx, unit)
+        }
+
+        with open(self._cache_path(unit), 'wb') as f:
+            cPickle.dump((digests, dumps), f, cPickle.HIGHEST_PROTOCOL)
+
     def standard_typer(self):
         """
         :return: A Typer for Ada standard types of programs parsed using
@@ -2975,16 +4066,38 @@ class ExtractionContext(object):
     def default_typer(self, fallback_typer=None):
         """
         :return: The default Typer for Ada programs parsed using this
-            extraction context.
+            extraction context. The typer is shared by all the calls made
+            with the same fallback typer, such that typing results are reused
+            across all the programs of a batch.
 
         :rtype: types.Typer[lal.AdaNode]
         """
+        if fallback_typer not in self._default_typers:
+            self._default_typers[fallback_typer] = self._build_default_typer(
+                fallback_typer
+            )
+
+        return self._default_typers[fallback_typer]
 
+    def _build_default_typer(self, fallback_typer):
+        """
+        :param types.Typer[lal.AdaNode] | None fallback_typer: The typer to
+            use for hints that cannot be typed otherwise.
+
+        :rtype: types.Typer[lal.AdaNode]
+        """
         standard_typer = self.standard_typer()
 
+        # Hints are first resolved to the type declaration they designate,
+        # so that the typing of a declaration is done only once.
         @types.memoizing_typer
         @types.delegating_typer
         def typer():
+            return none_typer | (_canonical_type_hint(self) >> decl_typer)
+
+        @types.memoizing_typer
+        @types.delegating_typer
+        def decl_typer():
             return self.model_typer(typer_without_model) | typer_without_model
 
         @types.memoizing_typer
@@ -2997,9 +4110,9 @@ class ExtractionContext(object):
                     standard_typer |
                     int_range_typer |
                     enum_typer |
-                    access_typer |
-                    record_typer(record_component_typer(typer)) |
-                    name_typer(typer) |
+                    access_typer(self) |
+                    record_typer(self, record_component_typer(self, typer)) |
+                    name_typer(self, typer) |
                     anonymous_typer(typer) |
                     derived_typer(typer) |
                     array_typer(typer, typer) |
@@ -0,0 +1,460 @@
+"""
+Provides optimization passes over Basic IR programs, as well as a pass
+manager to run them in sequence.
+
+Passes mutate the programs they are given. They are meant to be run on the
+programs produced by a frontend, before they are analyzed: they remove the
+temporary variables and statements which do not contribute to the results
+of the analyses, thus reducing the size of the states and of the
+control-flow graphs.
+
+Only synthetic variables (see purpose.SyntheticVariable) are removed or
+propagated. Variables which are referred to by a purpose (e.g. the
+expression checked by a DerefCheck), as well as the parameters and the
+result variable of the program, are never touched, so that checkers can
+still evaluate them.
+"""
+
+from lalcheck.irs.basic import tree as irt
+from lalcheck.irs.basic import visitors
+from lalcheck.irs.basic.purpose import SyntheticVariable
+from lalcheck.constants import lits, ops
+
+
+class ProgramStats(object):
+    """
+    Statistics about the size of a program.
+    """
+    def __init__(self, stmts, variables, exprs):
+        """
+        :param int stmts: The number of statements which are represented by
+            a node in the control-flow graph (assign, read, use, assume).
+        :param int variables: The number of variables used in the program.
+        :param int exprs: The number of expression nodes in the program.
+        """
+        self.stmts = stmts
+        self.variables = variables
+        self.exprs = exprs
+
+    @staticmethod
+    def of(prog):
+        """
+        :param irt.Program prog: A program.
+        :return: The statistics of the given program.
+        :rtype: ProgramStats
+        """
+        stmts = [0]
+        exprs = [0]
+        variables = set()
+
+        def count(node):
+            if isinstance(node, (irt.AssignStmt, irt.ReadStmt,
+                                 irt.UseStmt, irt.AssumeStmt)):
+                stmts[0] += 1
+            elif isinstance(node, (irt.Identifier, irt.FunCall, irt.Lit)):
+                exprs[0] += 1
+            elif isinstance(node, irt.Variable):
+                variables.add(node)
+
+            for child in node.children():
+                count(child)
+
+        count(prog)
+        return ProgramStats(stmts[0], len(variables), exprs[0])
+
+    def __add__(self, other):
+        return ProgramStats(
+            self.stmts + other.stmts,
+            self.variables + other.variables,
+            self.exprs + other.exprs
+        )
+
+    def __str__(self):
+        return "{} statements, {} variables, {} expressions".format(
+            self.stmts, self.variables, self.exprs
+        )
+
+
+class Pass(object):
+    """
+    Base class for optimization passes.
+    """
+    name = None
+
+    def run(self, prog):
+        """
+        Optimizes the given program in place.
+
+        :param irt.Program prog: The program to optimize.
+        """
+        raise NotImplementedError
+
+
+class PassManager(object):
+    """
+    Runs a sequence of passes over programs, and records the statistics of
+    the programs before and after each pass.
+    """
+    def __init__(self, passes):
+        """
+        :param list[Pass] passes: The passes to run, in order.
+        """
+        self.passes = passes
+        self.stats = {}
+
+    def run(self, prog):
+        """
+        Runs all the passes over the given program. The statistics of the
+        programs before and after each pass are summed in "stats", which
+        maps the name of the pass to a pair (statistics before the pass,
+        statistics after the pass).
+
+        :param irt.Program prog: The program to optimize.
+        :return: The same program, optimized.
+        :rtype: irt.Program
+        """
+        before = ProgramStats.of(prog)
+        for p in self.passes:
+            p.run(prog)
+            after = ProgramStats.of(prog)
+            if p.name in self.stats:
+                total_before, total_after = self.stats[p.name]
+                self.stats[p.name] = (total_before + before,
+                                      total_after + after)
+            else:
+                self.stats[p.name] = (before, after)
+            before = after
+        return prog
+
+    def report(self):
+        """
+        :return: A human-readable summary of the recorded statistics, in the
+            order in which the passes are run.
+        :rtype: str
+        """
+        return "\n".join(
+            "{}: {} -> {}".format(p.name, *self.stats[p.name])
+            for p in self.passes
+            if p.name in self.stats
+        )
+
+
+def _nodes_of_purpose(node):
+    """
+    :param irt.Node node: A node.
+    :return: The IR nodes referred to by the purpose of the given node.
+    :rtype: list[irt.Node]
+    """
+    if 'purpose' not in node.data:
+        return []
+
+    return [
+        x for x in vars(node.data.purpose).itervalues()
+        if isinstance(x, irt.Node)
+    ]
+
+
+class _VarUsage(visitors.ImplicitVisitor):
+    """
+    Computes, for each variable of a program, the statements that define it
+    and the number of times it is used, as well as the variables that must
+    be kept as is.
+    """
+    def __init__(self, prog):
+        """
+        :param irt.Program prog: The program to inspect.
+        """
+        self.defs = {}
+        self.uses = {}
+        self.pinned = set(prog.data.get('param_vars', None) or [])
+
+        result_var = prog.data.get('result_var', None)
+        if result_var is not None:
+            self.pinned.add(result_var)
+
+        prog.visit(self)
+
+    def pin_nodes_of_purpose(self, node):
+        for x in _nodes_of_purpose(node):
+            self.pinned.update(visitors.findall(
+                x, lambda n: isinstance(n, irt.Variable)
+            ))
+
+    def visit_assign(self, assign):
+        self.defs.setdefault(assign.id.var, []).append(assign)
+        self.pin_nodes_of_purpose(assign)
+        assign.expr.visit(self)
+
+    def visit_read(self, read):
+        self.defs.setdefault(read.id.var, []).append(read)
+        self.pin_nodes_of_purpose(read)
+
+    def visit_use(self, use):
+        self.pinned.add(use.id.var)
+        self.pin_nodes_of_purpose(use)
+        use.id.visit(self)
+
+    def visit_assume(self, assume):
+        self.pin_nodes_of_purpose(assume)
+        assume.expr.visit(self)
+
+    def visit_funcall(self, funcall):
+        self.pin_nodes_of_purpose(funcall)
+        self.visit_children(funcall)
+
+    def visit_ident(self, ident):
+        self.uses[ident.var] = self.uses.get(ident.var, 0) + 1
+
+    def is_temporary(self, var):
+        """
+        :param irt.Variable var: A variable.
+        :return: True if the variable can be removed or propagated.
+        :rtype: bool
+        """
+        return (SyntheticVariable.is_purpose_of(var) and
+                var not in self.pinned)
+
+
+_TOTAL_OPS = frozenset([
+    ops.PLUS, ops.MINUS, ops.NEG, ops.NOT, ops.AND, ops.OR,
+    ops.LT, ops.LE, ops.EQ, ops.NEQ, ops.GE, ops.GT,
+    ops.ADDRESS, ops.DOT_DOT, ops.GET_FIRST, ops.GET_LAST, ops.IMAGE
+])
+
+
+def _can_fail(expr):
+    """
+    :param irt.Expr expr: An expression.
+
+    :return: True if evaluating the given expression may fail, i.e. if it
+        contains a call, a dereference or an indexing, or more generally any
+        function call other than an operator which is defined on all its
+        arguments, or an access to a record component.
+
+    :rtype: bool
+    """
+    return any(
+        funcall.fun_id not in _TOTAL_OPS and
+        not isinstance(funcall.fun_id, (ops.GetName, ops.UpdatedName))
+        for funcall in visitors.findall(
+            expr, lambda n: isinstance(n, irt.FunCall)
+        )
+    )
+
+
+class _ExprRewriter(visitors.ImplicitVisitor):
+    """
+    Rewrites the expressions of the statements of a program, replacing
+    function call arguments in place.
+    """
+    def rewrite(self, expr):
+        """
+        :param irt.Expr expr: The expression to rewrite.
+        :return: The rewritten expression, or the given one if it is
+            unchanged.
+        :rtype: irt.Expr
+        """
+        raise NotImplementedError
+
+    def rewrite_all(self, expr):
+        """
+        Rewrites the given expression and its subexpressions, bottom-up.
+
+        :param irt.Expr expr: The expression to rewrite.
+        :rtype: irt.Expr
+        """
+        if isinstance(expr, irt.FunCall):
+            args = expr.args
+            for i, arg in enumerate(args):
+                new_arg = self.rewrite_all(arg)
+                if new_arg is not arg:
+                    args[i] = new_arg
+        return self.rewrite(expr)
+
+    def visit_assign(self, assign):
+        assign.expr = self.rewrite_all(assign.expr)
+
+    def visit_assume(self, assume):
+        assume.expr = self.rewrite_all(assume.expr)
+
+    def visit_read(self, read):
+        return
+
+    def visit_use(self, use):
+        return
+
+    def visit_label(self, label):
+        return
+
+    def visit_goto(self, goto):
+        return
+
+
+def _filter_stmts(prog, keep):
+    """
+    Removes from the given program the statements which do not satisfy the
+    given predicate, in every list of statements of the program.
+
+    :param irt.Program prog: The program to filter.
+    :param irt.Stmt -> bool keep: Whether a statement must be kept.
+    :return: The number of statements removed.
+    :rtype: int
+    """
+    removed = [0]
+
+    def filter_list(stmts):
+        kept = [stmt for stmt in stmts if keep(stmt)]
+        removed[0] += len(stmts) - len(kept)
+        stmts[:] = kept
+
+        for stmt in kept:
+            if isinstance(stmt, irt.SplitStmt):
+                for branch in stmt.branches:
+                    filter_list(branch)
+            elif isinstance(stmt, irt.LoopStmt):
+                filter_list(stmt.stmts)
+
+    filter_list(prog.stmts)
+    return removed[0]
+
+
+class CopyPropagation(Pass):
+    """
+    Replaces the uses of temporaries which are assigned a single time, to
+    a literal or to a variable that is never redefined, by the assigned
+    expression. The assignments themselves are left to DeadTempElimination.
+    """
+    name = "copy-propagation"
+
+    class _Propagator(_ExprRewriter):
+        def __init__(self, copies):
+            self.copies = copies
+
+        def rewrite(self, expr):
+            if isinstance(expr, irt.Identifier):
+                src = self.copies.get(expr.var, None)
+                if isinstance(src, irt.Lit):
+                    return irt.Lit(src.val, **src.data)
+                elif isinstance(src, irt.Identifier):
+                    return irt.Identifier(src.var, **src.data)
+            return expr
+
+    def run(self, prog):
+        # Propagating a copy may turn other assignments into copies (e.g.
+        # t2 = t1 where t1 = 0), hence the iteration.
+        propagated = set()
+        while True:
+            usage = _VarUsage(prog)
+            copies = {}
+
+            for var, defs in usage.defs.iteritems():
+                if (var in propagated or len(defs) != 1 or
+                        not usage.is_temporary(var) or
+                        not isinstance(defs[0], irt.AssignStmt)):
+                    continue
+
+                src = defs[0].expr
+                if isinstance(src, irt.Lit):
+                    copies[var] = src
+                elif (isinstance(src, irt.Identifier) and
+                        src.var not in usage.defs):
+                    copies[var] = src
+
+            if len(copies) == 0:
+                return
+
+            propagated.update(copies)
+            prog.visit(CopyPropagation._Propagator(copies))
+
+
+class DeadTempElimination(Pass):
+    """
+    Removes the assignments and reads of temporaries which are never used.
+    Assignments whose expression may fail (see _can_fail) are kept, as
+    removing them would hide the failure from the analyses.
+    """
+    name = "dead-temp-elimination"
+
+    def run(self, prog):
+        while True:
+            usage = _VarUsage(prog)
+            dead = {
+                var
+                for var in usage.defs
+                if usage.is_temporary(var) and usage.uses.get(var, 0) == 0
+            }
+
+            if len(dead) == 0 or _filter_stmts(prog, lambda stmt: not (
+                    isinstance(stmt, (irt.AssignStmt, irt.ReadStmt)) and
+                    stmt.id.var in dead and
+                    'purpose' not in stmt.data and
+                    not (isinstance(stmt, irt.AssignStmt) and
+                         _can_fail(stmt.expr)))) == 0:
+                return
+
+
+class ConstantFolding(Pass):
+    """
+    Replaces the expressions which can be evaluated statically by the
+    literal they evaluate to.
+    """
+    name = "constant-folding"
+
+    class _Folder(_ExprRewriter):
+        def __init__(self, fold):
+            self.fold = fold
+
+        def rewrite(self, expr):
+            if (isinstance(expr, irt.FunCall) and
+                    all(isinstance(arg, irt.Lit) for arg in expr.args)):
+                folded = self.fold(expr)
+                if folded is not None:
+                    return folded
+            return expr
+
+    def __init__(self, fold):
+        """
+        :param irt.Expr -> irt.Lit | None fold: Returns the literal the given
+            expression evaluates to, or None if it cannot be evaluated
+            statically (see e.g. the ConstExprEvaluator of the libadalang
+            frontend).
+        """
+        self.fold = fold
+
+    def run(self, prog):
+        prog.visit(ConstantFolding._Folder(self.fold))
+
+
+class TrivialAssumeElimination(Pass):
+    """
+    Removes the assume statements whose condition is the literal True. Those
+    which have a purpose are kept, as checkers rely on them.
+    """
+    name = "trivial-assume-elimination"
+
+    def run(self, prog):
+        _filter_stmts(prog, lambda stmt: not (
+            isinstance(stmt, irt.AssumeStmt) and
+            isinstance(stmt.expr, irt.Lit) and
+            stmt.expr.val == lits.TRUE and
+            'purpose' not in stmt.data
+        ))
+
+
+def default_pipeline(fold=None):
+    """
+    :param (irt.Expr -> irt.Lit | None) | None fold: The function used to
+        evaluate expressions statically. If None, constants are not folded.
+
+    :return: A pass manager running the default optimization passes.
+
+    :rtype: PassManager
+    """
+    passes = [CopyPropagation()]
+    if fold is not None:
+        passes.append(ConstantFolding(fold))
+    passes.extend([
+        TrivialAssumeElimination(),
+        DeadTempElimination()
+    ])
+    return PassManager(passes)
@@ -0,0 +1,73 @@
+"""
+Provides a compact binary serialization of Basic IR programs, allowing them
+to be cached on disk or sent to other processes.
+
+Programs are pickled then compressed. The structure of the program is fully
+preserved, including the sharing of nodes (e.g. an identifier and the
+variable it refers to, a goto statement and its label).
+
+Frontends typically attach objects to the nodes of the programs they
+generate (see tree.Node.data) which cannot be serialized, such as nodes of
+the original source tree. Such objects are called external references: they
+are replaced by an identifier provided by the frontend, and resolved back
+using the same frontend when the program is deserialized.
+"""
+
+import cPickle
+import zlib
+from cStringIO import StringIO
+
+
+FORMAT_VERSION = 1
+"""
+The version of the serialization format. Must be incremented every time the
+format changes, including when the Basic IR tree classes change.
+"""
+
+
+class FormatError(ValueError):
+    """
+    Raised when trying to deserialize data which was serialized with a
+    different version of the format.
+    """
+    pass
+
+
+def dumps(obj, external_id):
+    """
+    :param object obj: The object to serialize, typically an irt.Program
+        or a list of irt.Program.
+
+    :param object -> object | None external_id: A function which returns
+        the identifier of the given object if it is an external reference,
+        or None otherwise. Identifiers must be serializable.
+
+    :return: The serialized object.
+    :rtype: str
+    """
+    buf = StringIO()
+    pickler = cPickle.Pickler(buf, cPickle.HIGHEST_PROTOCOL)
+    pickler.persistent_id = external_id
+    pickler.dump(obj)
+    return chr(FORMAT_VERSION) + zlib.compress(buf.getvalue())
+
+
+def loads(data, resolve_external):
+    """
+    :param str data: An object serialized using "dumps".
+
+    :param object -> object resolve_external: A function which returns the
+        external reference corresponding to the given identifier.
+
+    :return: The deserialized object.
+    :rtype: object
+
+    :raise FormatError: If the data was serialized using a different
+        version of the format.
+    """
+    if len(data) == 0 or ord(data[0]) != FORMAT_VERSION:
+        raise FormatError("Unsupported serialization format")
+
+    unpickler = cPickle.Unpickler(StringIO(zlib.decompress(data[1:])))
+    unpickler.persistent_load = resolve_external
+    return unpickler.load()
@@ -2,7 +2,7 @@
 Provides tools for using the Basic IR.
 """
 
-from lalcheck.utils import KeyCounter, Bunch, Transformer
+from lalcheck.utils import KeyCounter, Bunch, Transformer, LRUCache
 from lalcheck.digraph import Digraph
 from lalcheck.domain_ops import boolean_ops
 from lalcheck.types import FunOutput
@@ -154,6 +154,7 @@ class CFGBuilder(visitors.ImplicitVisitor):
     def __init__(self):
         self.nodes = None
         self.edges = None
+        self.succs = None
         self.jumps = None
         self.labels = None
         self.start_node = None
@@ -171,54 +172,52 @@ class CFGBuilder(visitors.ImplicitVisitor):
         """
         return isinstance(node, LabelStmt)
 
-    def compute_reachable_nodes(self, start, reachables):
+    def compute_reachable_nodes(self, start):
         """
         Computes the set of nodes that are reachable from the given "start"
-        node using the set of edges registered so far. Reachable nodes are
-        added to the given set.
+        node using the set of edges registered so far.
+
+        Nodes are identified by their id, since all the nodes built by this
+        visitor have the same hash.
 
         :param Digraph.Node start: The node from which to compute reachable
             nodes.
 
-        :param set[Digraph.Node] reachables: The set of nodes that are found
-            reachable so far.
+        :return: The ids of the reachable nodes.
+        :rtype: set[int]
         """
-        def outs(node):
-            """
-            :return: The directly reachable nodes from the given node
-            :rtype: iterable[Digraph.Node]
-            """
-            return (e.to for e in self.edges if e.frm == node)
-
-        reachables.add(start)
-        for node in outs(start):
-            if node not in reachables:
-                self.compute_reachable_nodes(node, reachables)
+        reachables = {id(start)}
+        to_visit = [start]
+        while len(to_visit) > 0:
+            node = to_visit.pop()
+            for succ in self.succs.get(id(node), ()):
+                if id(succ) not in reachables:
+                    reachables.add(id(succ))
+                    to_visit.append(succ)
+        return reachables
 
     def visit_program(self, prgm):
         self.nodes = []
         self.edges = []
+        self.succs = {}
         self.jumps = []
         self.labels = {}
 
         start = self.build_node("start")
         self.visit_stmts(prgm.stmts, start)
 
-        # Generate jump edges
+        # Generate jump edges: a goto leads to the successors of its label.
         for node, label in self.jumps:
-            self.edges.extend([
-                Digraph.Edge(node, edge.to)
-                for edge in self.edges
-                if edge.frm == self.labels[label]
-            ])
+            label_succs = self.succs.get(id(self.labels[label]), ())
+            for succ in list(label_succs):
+                self.link(node, succ)
 
         # Compute reachable nodes
-        reachables = set()
-        self.compute_reachable_nodes(start, reachables)
+        reachables = self.compute_reachable_nodes(start)
 
         # Remove all nodes and edges that are not reachable
-        self.nodes = [n for n in self.nodes if n in reachables]
-        self.edges = [e for e in self.edges if e.frm in reachables]
+        self.nodes = [n for n in self.nodes if id(n) in reachables]
+        self.edges = [e for e in self.edges if id(e.frm) in reachables]
 
         return Digraph([start] + self.nodes, self.edges)
 
@@ -282,11 +281,62 @@ class CFGBuilder(visitors.ImplicitVisitor):
             node=orig_node
         )
 
+    def link(self, frm, to):
+        """
+        Registers an edge, and updates the successors of its origin.
+
+        :param Digraph.Node | None frm: The origin of the edge.
+        :param Digraph.Node to: The destination of the edge.
+        """
+        self.edges.append(Digraph.Edge(frm, to))
+        self.succs.setdefault(id(frm), []).append(to)
+
     def register_and_link(self, froms, new_node):
         self.nodes.append(new_node)
         for f in froms:
             if f is not None:
-                self.edges.append(Digraph.Edge(f, new_node))
+                self.link(f, new_node)
+
+
+def _resolve_definitions(providers, fun_id, input_doms, ret_dom, out_indices):
+    """
+    :param (frozenset[DefProvider], DefProvider | None,
+        frozenset[DefProvider]) providers: The definition providers of the
+        interpretations of the modeled programs, the external definition
+        provider if any, and the batched definition providers.
+
+    :param str fun_id: The identifier of the function.
+    :param tuple[domains.AbstractDomain] input_doms: Its input domains.
+    :param domains.AbstractDomain ret_dom: Its return domain.
+    :param tuple[int] out_indices: Its output indices.
+
+    :return: The definition and inverse of the function with the given
+        signature, and its batched definition if any.
+
+    :rtype: (function, function, function | None)
+    """
+    def_providers, external_def_provider, batch_def_providers = providers
+    sig = Signature(fun_id, input_doms, ret_dom, out_indices)
+
+    defs = reduce(Transformer.or_else, def_providers)
+    if external_def_provider is not None:
+        defs = defs | external_def_provider
+
+    definition, inverse = defs.get(sig)
+    batch_definition = reduce(
+        Transformer.or_else, batch_def_providers
+    )._transform(sig) if len(batch_def_providers) > 0 else None
+
+    return definition, inverse, batch_definition
+
+
+_definitions = LRUCache(_resolve_definitions, 4096)
+"""
+The definitions, inverses and batched definitions already resolved, indexed
+by the providers they were resolved from and by the components of their
+signature. Shared by all the models, including the ones of programs which
+are analyzed separately.
+"""
 
 
 class Models(visitors.Visitor):
@@ -340,7 +390,7 @@ class Models(visitors.Visitor):
         """
         return self._interp_of(self._type_of(node.data.type_hint))
 
-    def visit_funcall(self, funcall, node_domains, defs, builders):
+    def visit_funcall(self, funcall, node_domains, providers, builders):
         dom = node_domains[funcall]
 
         tpe = self._type_of(funcall.data.type_hint)
@@ -362,28 +412,24 @@ class Models(visitors.Visitor):
             )
             input_doms = input_doms + (arg_interp.domain,)
 
-        sig = Signature(
-            funcall.fun_id,
-            input_doms,
-            ret_dom,
-            out_indices
+        definition, inverse, batch_definition = _definitions(
+            providers, funcall.fun_id, input_doms, ret_dom, out_indices
         )
 
-        definition, inverse = defs.get(sig)
-
         return Bunch(
             domain=dom,
             definition=definition,
-            inverse=inverse
+            inverse=inverse,
+            batch_definition=batch_definition
         )
 
-    def visit_ident(self, ident, node_domains, defs, builders):
-        return ident.var.visit(self, node_domains, defs, builders)
+    def visit_ident(self, ident, node_domains, providers, builders):
+        return ident.var.visit(self, node_domains, providers, builders)
 
-    def visit_var(self, var, node_domains, defs, builders):
+    def visit_var(self, var, node_domains, providers, builders):
         return Bunch(domain=node_domains[var])
 
-    def visit_lit(self, lit, node_domains, defs, builders):
+    def visit_lit(self, lit, node_domains, providers, builders):
         dom = node_domains[lit]
         return Bunch(domain=dom, builder=builders[dom])
 
@@ -412,6 +458,7 @@ class Models(visitors.Visitor):
         model = {}
         node_domains = {}
         def_providers = set()
+        batch_def_providers = set()
         builders = {}
 
         for prog in programs:
@@ -422,18 +469,18 @@ class Models(visitors.Visitor):
 
                 node_domains[node] = interp.domain
                 def_providers.add(interp.def_provider)
+                if interp.batch_def_provider is not None:
+                    batch_def_providers.add(interp.batch_def_provider)
                 builders[interp.domain] = interp.builder
 
-        aggregate_provider = reduce(Transformer.or_else, def_providers)
+        providers = (
+            frozenset(def_providers),
+            self.external_def_provider,
+            frozenset(batch_def_providers)
+        )
 
         for node in node_domains.keys():
-            model[node] = node.visit(
-                self,
-                node_domains,
-                aggregate_provider if self.external_def_provider is None
-                else aggregate_provider | self.external_def_provider,
-                builders
-            )
+            model[node] = node.visit(self, node_domains, providers, builders)
 
         return model
 
@@ -473,6 +520,161 @@ class ExprEvaluator(visitors.Visitor):
         return self.model[lit].builder(lit.val)
 
 
+class ExprBatchEvaluator(visitors.Visitor):
+    """
+    Can be used to evaluate expressions in the Basic IR in many states at
+    once, typically in all the disjuncts of a powerset. The result is the
+    same as evaluating the expression in each state using an ExprEvaluator
+    (which is kept as the reference implementation), but the expression is
+    traversed only once, and each operation is applied only once per
+    distinct combination of arguments.
+    """
+    def __init__(self, model):
+        """
+        :param dict[tree.Node, Bunch] model: A model that must have an entry
+            for each node that needs be evaluated by this evaluator.
+        """
+        self.model = model
+
+    def eval(self, expr, states):
+        """
+        :param tree.Expr expr: The expression to evaluate.
+
+        :param list[tuple[object]] states: The states, each containing
+            an entry for each Variable traversed during evaluation.
+
+        :return: The values this expression evaluates to in each state.
+
+        :rtype: list[object]
+        """
+        return expr.visit(self, states)
+
+    def visit_ident(self, ident, states):
+        index = ident.var.data.index
+        return [state[index] for state in states]
+
+    def visit_funcall(self, funcall, states):
+        columns = [arg.visit(self, states) for arg in funcall.args]
+        batch_definition = self.model[funcall].get('batch_definition')
+        if batch_definition is not None:
+            return batch_definition(*columns)
+
+        definition = self.model[funcall].definition
+
+        # Arguments are compared by identity: they are kept alive by the
+        # columns for the whole duration of the call.
+        all_args = zip(*columns) if len(columns) > 0 else [()] * len(states)
+        results = {}
+        res = []
+        for args in all_args:
+            key = tuple(id(arg) for arg in args)
+            if key not in results:
+                results[key] = definition(*args)
+            res.append(results[key])
+        return res
+
+    def visit_lit(self, lit, states):
+        return [self.model[lit].builder(lit.val)] * len(states)
+
+
+class ExprBatchSolver(visitors.Visitor):
+    """
+    Can be used to solve expressions in the Basic IR in many states at once,
+    typically in all the disjuncts of a powerset. The result is the same as
+    solving the expression in each state using an ExprSolver (which is kept
+    as the reference implementation), but the expression is traversed only
+    once, arguments are evaluated using an ExprBatchEvaluator, and each
+    inverse is computed only once per distinct combination of arguments.
+    """
+    def __init__(self, model):
+        """
+        :param dict[tree.Node, Bunch] model: A model that must have an entry
+            for each node that needs be solved by this solver.
+        """
+        self.model = model
+        self.eval = ExprBatchEvaluator(model).eval
+
+    def solve(self, expr, states):
+        """
+        :param tree.Expr expr: The predicate expression to solve.
+
+        :param list[tuple[object]] states: The states, each containing an
+            entry for each variable traversed while solving.
+
+        :return: For each given state, the new state and whether solving
+            succeeded, as returned by ExprSolver.solve.
+
+        :rtype: list[(tuple[object], bool)]
+        """
+        new_states = [list(state) for state in states]
+        positions = range(len(states))
+        succeeded = set(expr.visit(
+            self, new_states, positions, [boolean_ops.true] * len(states)
+        ))
+        return [
+            (tuple(new_state), i in succeeded)
+            for i, new_state in enumerate(new_states)
+        ]
+
+    def visit_ident(self, ident, states, positions, expecteds):
+        var_idx = ident.var.data.index
+        dom = self.model[ident].domain
+        for i, expected in zip(positions, expecteds):
+            states[i][var_idx] = dom.meet(states[i][var_idx], expected)
+        return positions
+
+    def visit_funcall(self, funcall, states, positions, expecteds):
+        inverse = self.model[funcall].inverse
+        columns = [
+            self.eval(arg, [states[i] for i in positions])
+            for arg in funcall.args
+        ]
+        all_args = (
+            zip(*columns) if len(columns) > 0 else [()] * len(positions)
+        )
+
+        # Arguments are compared by identity, as in ExprBatchEvaluator.
+        results = {}
+        inv_results = {}
+        for i, expected, args in zip(positions, expecteds, all_args):
+            key = (id(expected),) + tuple(id(arg) for arg in args)
+            if key not in results:
+                results[key] = inverse(expected, *args)
+            inv_res = results[key]
+            if inv_res is not None:
+                inv_results[i] = (
+                    (inv_res,) if len(funcall.args) == 1 else inv_res
+                )
+
+        # Arguments are solved in order, each one only in the states in
+        # which solving all the previous ones succeeded.
+        alive = [i for i in positions if i in inv_results]
+        for arg_idx, arg in enumerate(funcall.args):
+            arg_positions = [
+                i for i in alive if arg_idx < len(inv_results[i])
+            ]
+            if len(arg_positions) == 0:
+                continue
+            succeeded = set(arg.visit(
+                self, states, arg_positions,
+                [inv_results[i][arg_idx] for i in arg_positions]
+            ))
+            alive = [
+                i for i in alive
+                if i in succeeded or arg_idx >= len(inv_results[i])
+            ]
+
+        return alive
+
+    def visit_lit(self, lit, states, positions, expecteds):
+        lit_dom = self.model[lit].domain
+        lit_val = self.model[lit].builder(lit.val)
+        return [
+            i for i, expected in zip(positions, expecteds)
+            if not lit_dom.is_empty(lit_dom.meet(expected, lit_val))
+        ]
+
+
 class ExprSolver(visitors.Visitor):
     """
     Can be used to solve expressions in the Basic IR.
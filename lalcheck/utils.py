@@ -1,5 +1,5 @@
 from itertools import chain, combinations
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
 from funcy.calc import memoize
 import time
 
@@ -23,6 +23,14 @@ class Bunch(dict):
     def __hash__(self):
         return self._hash
 
+    def __reduce__(self):
+        # The default dict reduction would restore the items through
+        # __setitem__, which is forbidden.
+        return Bunch, (), dict(self)
+
+    def __setstate__(self, state):
+        Bunch.__init__(self, **state)
+
 
 class KeyCounter(object):
     """
@@ -43,6 +51,32 @@ class KeyCounter(object):
         return self.dict[item]
 
 
+class LRUCache(object):
+    """
+    A memoization cache of bounded size, which discards the least recently
+    used entries first.
+    """
+    def __init__(self, fun, capacity):
+        """
+        :param function fun: The function whose results are cached.
+        :param int capacity: The maximum number of cached results.
+        """
+        self.fun = fun
+        self.capacity = capacity
+        self.entries = OrderedDict()
+
+    def __call__(self, *args):
+        try:
+            res = self.entries.pop(args)
+        except KeyError:
+            res = self.fun(*args)
+            if len(self.entries) >= self.capacity:
+                self.entries.popitem(last=False)
+
+        self.entries[args] = res
+        return res
+
+
 def powerset(iterable):
     """
     Returns the powerset of the given iterable as a frozenset of frozensets.
@@ -95,6 +129,375 @@ def concat_dicts(a, b):
     return dict(a, **b)
 
 
+_HAMT_BITS = 5
+_HAMT_MASK = (1 << _HAMT_BITS) - 1
+_HASH_MASK = (1 << 64) - 1
+_MISSING = object()
+
+
+def _popcount(x):
+    return bin(x).count('1')
+
+
+def _hash_of(key):
+    return hash(key) & _HASH_MASK
+
+
+class _Leaf(object):
+    __slots__ = ('hash', 'key', 'value')
+    size = 1
+
+    def __init__(self, h, key, value):
+        self.hash = h
+        self.key = key
+        self.value = value
+
+    def iteritems(self):
+        yield self.key, self.value
+
+
+class _Collision(object):
+    """
+    Holds the entries of keys which have the same hash.
+    """
+    __slots__ = ('hash', 'items')
+
+    def __init__(self, h, items):
+        self.hash = h
+        self.items = items
+
+    @property
+    def size(self):
+        return len(self.items)
+
+    def iteritems(self):
+        return iter(self.items)
+
+
+class _Node(object):
+    __slots__ = ('bitmap', 'entries', 'size')
+
+    def __init__(self, bitmap, entries, size):
+        self.bitmap = bitmap
+        self.entries = entries
+        self.size = size
+
+    def iteritems(self):
+        for entry in self.entries:
+            for item in entry.iteritems():
+                yield item
+
+
+def _make_node(bitmap, entries):
+    """
+    Creates the node holding the given entries, collapsing it when possible
+    so that the shape of a trie only depends on the keys it contains.
+    """
+    if len(entries) == 0:
+        return None
+    elif len(entries) == 1 and type(entries[0]) is not _Node:
+        return entries[0]
+    return _Node(bitmap, tuple(entries), sum(e.size for e in entries))
+
+
+def _pair(a, b, shift):
+    """
+    Creates the node holding two leaves or collisions of different hashes.
+    """
+    ia = (a.hash >> shift) & _HAMT_MASK
+    ib = (b.hash >> shift) & _HAMT_MASK
+    if ia == ib:
+        return _Node(1 << ia, (_pair(a, b, shift + _HAMT_BITS),),
+                     a.size + b.size)
+    elif ia < ib:
+        return _Node((1 << ia) | (1 << ib), (a, b), a.size + b.size)
+    else:
+        return _Node((1 << ia) | (1 << ib), (b, a), a.size + b.size)
+
+
+def _lookup(entry, h, key):
+    shift = 0
+    while entry is not None:
+        tpe = type(entry)
+        if tpe is _Node:
+            bit = 1 << ((h >> shift) & _HAMT_MASK)
+            if not entry.bitmap & bit:
+                return _MISSING
+            entry = entry.entries[_popcount(entry.bitmap & (bit - 1))]
+            shift += _HAMT_BITS
+        elif tpe is _Leaf:
+            if entry.hash == h and entry.key == key:
+                return entry.value
+            return _MISSING
+        else:
+            if entry.hash == h:
+                for k, v in entry.items:
+                    if k == key:
+                        return v
+            return _MISSING
+    return _MISSING
+
+
+def _assoc(entry, shift, leaf):
+    """
+    Returns the entry obtained by inserting the given leaf in the given
+    entry, replacing the previous value of the key if any.
+    """
+    if entry is None:
+        return leaf
+
+    tpe = type(entry)
+    if tpe is _Leaf:
+        if entry.hash != leaf.hash:
+            return _pair(entry, leaf, shift)
+        elif entry.key == leaf.key:
+            return entry if entry.value is leaf.value else leaf
+        return _Collision(leaf.hash, ((entry.key, entry.value),
+                                      (leaf.key, leaf.value)))
+    elif tpe is _Collision:
+        if entry.hash != leaf.hash:
+            return _pair(entry, leaf, shift)
+        elif _lookup(entry, leaf.hash, leaf.key) is leaf.value:
+            return entry
+        items = tuple(
+            (k, v) for k, v in entry.items if not k == leaf.key
+        ) + ((leaf.key, leaf.value),)
+        return _Collision(leaf.hash, items)
+
+    bit = 1 << ((leaf.hash >> shift) & _HAMT_MASK)
+    idx = _popcount(entry.bitmap & (bit - 1))
+    if entry.bitmap & bit:
+        child = entry.entries[idx]
+        new_child = _assoc(child, shift + _HAMT_BITS, leaf)
+        if new_child is child:
+            return entry
+        return _Node(
+            entry.bitmap,
+            entry.entries[:idx] + (new_child,) + entry.entries[idx + 1:],
+            entry.size - child.size + new_child.size
+        )
+    else:
+        return _Node(
+            entry.bitmap | bit,
+            entry.entries[:idx] + (leaf,) + entry.entries[idx:],
+            entry.size + 1
+        )
+
+
+def _build(items, shift):
+    res = None
+    for k, v in items:
+        res = _assoc(res, shift, _Leaf(_hash_of(k), k, v))
+    return res
+
+
+def _merge(a, b, shift, fun, union):
+    """
+    Merges two entries found at the same position of two tries. Entries
+    which are shared by both tries are kept as is, without being visited.
+    """
+    if a is b:
+        return a
+    elif a is None:
+        return b if union else None
+    elif b is None:
+        return a if union else None
+    elif type(a) is not _Node or type(b) is not _Node:
+        # At least one side holds very few keys: merge them one by one.
+        b_items = dict(b.iteritems())
+        res = []
+        for k, v in a.iteritems():
+            w = b_items.pop(k, _MISSING)
+            if w is not _MISSING:
+                v = v if v is w else fun(v, w)
+                if v is not None:
+                    res.append((k, v))
+            elif union:
+                res.append((k, v))
+        if union:
+            res.extend(b_items.iteritems())
+        return _build(res, shift)
+
+    bitmap = (a.bitmap | b.bitmap) if union else (a.bitmap & b.bitmap)
+    res_bitmap, res_entries = 0, []
+    while bitmap:
+        bit = bitmap & -bitmap
+        bitmap ^= bit
+        x = (a.entries[_popcount(a.bitmap & (bit - 1))]
+             if a.bitmap & bit else None)
+        y = (b.entries[_popcount(b.bitmap & (bit - 1))]
+             if b.bitmap & bit else None)
+        entry = _merge(x, y, shift + _HAMT_BITS, fun, union)
+        if entry is not None:
+            res_bitmap |= bit
+            res_entries.append(entry)
+
+    for node in (a, b):
+        if (node.bitmap == res_bitmap and
+                all(x is y for x, y in zip(node.entries, res_entries))):
+            return node
+    return _make_node(res_bitmap, res_entries)
+
+
+def _forall_common(a, b, pred, same_keys):
+    if a is b:
+        return True
+    elif a is None or b is None:
+        return not same_keys
+    elif type(a) is not _Node or type(b) is not _Node:
+        b_items = dict(b.iteritems())
+        count = 0
+        for k, v in a.iteritems():
+            w = b_items.get(k, _MISSING)
+            if w is not _MISSING:
+                count += 1
+                if v is not w and not pred(v, w):
+                    return False
+            elif same_keys:
+                return False
+        return not same_keys or count == len(b_items)
+    elif same_keys and (a.bitmap != b.bitmap or a.size != b.size):
+        return False
+
+    bitmap = a.bitmap & b.bitmap
+    while bitmap:
+        bit = bitmap & -bitmap
+        bitmap ^= bit
+        if not _forall_common(a.entries[_popcount(a.bitmap & (bit - 1))],
+                              b.entries[_popcount(b.bitmap & (bit - 1))],
+                              pred, same_keys):
+            return False
+    return True
+
+
+class PersistentMap(object):
+    """
+    An immutable map, implemented as a hash array mapped trie. Setting a key
+    returns a new map which shares all but a logarithmic part of its
+    structure with the original one. Merging or comparing maps that derive
+    from one another skips the parts they have in common.
+    """
+    __slots__ = ('_root',)
+
+    def __init__(self, items=()):
+        """
+        :param dict | iterable[(object, object)] items: The initial content
+            of the map.
+        """
+        if isinstance(items, dict):
+            items = items.iteritems()
+        self._root = _build(items, 0)
+
+    @staticmethod
+    def _of_root(root):
+        res = PersistentMap()
+        res._root = root
+        return res
+
+    def __len__(self):
+        return 0 if self._root is None else self._root.size
+
+    def __contains__(self, key):
+        return _lookup(self._root, _hash_of(key), key) is not _MISSING
+
+    def __getitem__(self, key):
+        res = _lookup(self._root, _hash_of(key), key)
+        if res is _MISSING:
+            raise KeyError(key)
+        return res
+
+    def get(self, key, default=None):
+        res = _lookup(self._root, _hash_of(key), key)
+        return default if res is _MISSING else res
+
+    def set(self, key, value):
+        """
+        Returns a new map in which the given key is associated to the given
+        value.
+
+        :param object key: The key.
+        :param object value: The value.
+        :rtype: PersistentMap
+        """
+        root = _assoc(self._root, 0, _Leaf(_hash_of(key), key, value))
+        return self if root is self._root else PersistentMap._of_root(root)
+
+    def iteritems(self):
+        return iter(()) if self._root is None else self._root.iteritems()
+
+    def iterkeys(self):
+        return (k for k, _ in self.iteritems())
+
+    def itervalues(self):
+        return (v for _, v in self.iteritems())
+
+    __iter__ = iterkeys
+
+    def items(self):
+        return list(self.iteritems())
+
+    def keys(self):
+        return list(self.iterkeys())
+
+    def values(self):
+        return list(self.itervalues())
+
+    def intersection_with(self, other, fun):
+        """
+        Returns the map containing the keys present in both maps. The value
+        of each key is computed by calling fun on the values associated to
+        it in each map, except if those are identical. If fun returns None,
+        the key is excluded from the result.
+
+        :param PersistentMap other: The other map.
+        :param (object, object) -> object fun: The merging function.
+        :rtype: PersistentMap
+        """
+        root = _merge(self._root, other._root, 0, fun, False)
+        return (self if root is self._root else
+                other if root is other._root else
+                PersistentMap._of_root(root))
+
+    def union_with(self, other, fun):
+        """
+        Returns the map containing the keys present in either map. The value
+        of a key present in both maps is computed as in "intersection_with".
+
+        :param PersistentMap other: The other map.
+        :param (object, object) -> object fun: The merging function.
+        :rtype: PersistentMap
+        """
+        root = _merge(self._root, other._root, 0, fun, True)
+        return (self if root is self._root else
+                other if root is other._root else
+                PersistentMap._of_root(root))
+
+    def forall_common(self, other, pred, same_keys=False):
+        """
+        Returns True if the given predicate holds for the values associated
+        to each key present in both maps. Identical values are not checked.
+
+        :param PersistentMap other: The other map.
+        :param (object, object) -> bool pred: The predicate.
+        :param bool same_keys: If True, also requires both maps to contain
+            the same keys.
+        :rtype: bool
+        """
+        return _forall_common(self._root, other._root, pred, same_keys)
+
+    def __eq__(self, other):
+        return (isinstance(other, PersistentMap) and
+                self.forall_common(other, lambda x, y: x == y, True))
+
+    def __ne__(self, other):
+        return not (self == other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "PersistentMap({})".format(dict(self.iteritems()))
+
+
 class Transformer(object):
     def __init__(self, fun):
         """
@@ -209,12 +612,22 @@ class Transformer(object):
         """
         Constructs a transformer from a function that returns a transformer.
 
+        The builder is only called once, the first time the transformer is
+        used, such that it can refer to the transformer being constructed.
+
         :param () -> Transformer builder: A function that returns a
             transformer.
 
         :rtype: Transformer
         """
-        return Transformer(lambda hint: builder()._transform(hint))
+        built = []
+
+        def f(hint):
+            if len(built) == 0:
+                built.append(builder())
+            return built[0]._transform(hint)
+
+        return Transformer(f)
 
     @staticmethod
     def make_memoizing(transformer):
@@ -0,0 +1,128 @@
+"""
+Check that the semantics computed in basic block mode are identical to the
+ones computed in the default mode, at every node of the control-flow graph.
+"""
+
+from lalcheck.irs.basic import tree as irt
+from lalcheck.irs.basic.analyses import abstract_semantics
+from lalcheck.irs.basic.purpose import DerefCheck
+from lalcheck.irs.basic.tools import Models
+from lalcheck.interpretations import default_type_interpreter
+from lalcheck.constants import ops
+from lalcheck.utils import Transformer
+from lalcheck import types
+
+
+int_type = types.IntRange(-1000, 1000)
+bool_type = types.Boolean()
+enum_type = types.Enum(['A', 'B', 'C'])
+
+
+def ident(v):
+    return irt.Identifier(v, type_hint=v.data.type_hint)
+
+
+def lit(val, hint):
+    return irt.Lit(val, type_hint=hint)
+
+
+def call(op, args, hint):
+    return irt.FunCall(op, args, type_hint=hint)
+
+
+def plus(v, val):
+    return irt.AssignStmt(ident(v), call(ops.PLUS, [
+        ident(v), lit(val, int_type)
+    ], int_type))
+
+
+x = irt.Variable('x', type_hint=int_type, index=0)
+y = irt.Variable('y', type_hint=int_type, index=1)
+z = irt.Variable('z', type_hint=int_type, index=2)
+e = irt.Variable('e', type_hint=enum_type, index=3)
+
+prog = irt.Program([
+    irt.ReadStmt(ident(y)),
+    irt.AssignStmt(ident(x), lit(0, int_type)),
+    irt.AssignStmt(ident(z), lit(5, int_type)),
+    irt.AssignStmt(ident(e), lit('A', enum_type)),
+    irt.LoopStmt([
+        irt.AssumeStmt(call(ops.LT, [ident(x), ident(y)], bool_type)),
+        plus(x, 1),
+        plus(z, 2),
+        plus(z, -1),
+        irt.AssumeStmt(
+            call(ops.LT, [ident(x), lit(500, int_type)], bool_type),
+            purpose=DerefCheck(ident(x))
+        ),
+        plus(z, 3),
+        irt.SplitStmt([
+            [irt.AssumeStmt(call(ops.EQ, [
+                ident(x), lit(50, int_type)
+            ], bool_type)),
+             irt.AssignStmt(ident(e), lit('B', enum_type)),
+             plus(z, 1)],
+            [irt.AssumeStmt(call(ops.NEQ, [
+                ident(x), lit(50, int_type)
+            ], bool_type))]
+        ]),
+        plus(y, -1)
+    ]),
+    irt.AssumeStmt(call(ops.NOT, [
+        call(ops.LT, [ident(x), ident(y)], bool_type)
+    ], bool_type)),
+    plus(z, 1),
+    plus(x, 2),
+    irt.UseStmt(ident(z))
+], fun_id="test")
+
+model = Models(
+    Transformer.as_transformer(lambda hint: hint),
+    default_type_interpreter,
+    abstract_semantics.UnknownTargetCallStrategy().as_def_provider()
+).of(prog)
+
+
+def fmt(state):
+    return sorted(
+        (
+            sorted(n.name for n in trace),
+            sorted(
+                (v.name, model[v].domain.str(val))
+                for v, val in values.iteritems()
+            )
+        )
+        for trace, values in state.iteritems()
+    )
+
+
+preds = [
+    ("always", abstract_semantics.MergePredicateBuilder.Always),
+    ("le_t_eq_v", abstract_semantics.MergePredicateBuilder.Le_Traces |
+     abstract_semantics.MergePredicateBuilder.Eq_Vals)
+]
+
+for name, pred in preds:
+    default = abstract_semantics.compute_semantics(prog, model, pred)
+    blocks = abstract_semantics.compute_semantics(
+        prog, model, pred, basic_blocks=True
+    )
+
+    default_nodes = {n.name: n for n in default.cfg.nodes}
+    block_nodes = {n.name: n for n in blocks.cfg.nodes}
+    assert sorted(default_nodes) == sorted(block_nodes)
+    assert all(n in blocks.semantics for n in blocks.cfg.nodes)
+
+    # Request the states in reverse order, so that nodes at the end of
+    # blocks are recomputed first.
+    identical = all(
+        fmt(default.semantics[default_nodes[n]]) ==
+        fmt(blocks.semantics[block_nodes[n]])
+        for n in reversed([node.name for node in blocks.cfg.nodes])
+    )
+    print("{}: {} nodes, identical = {}".format(
+        name, len(blocks.semantics), identical
+    ))
+
+leaf = next(iter(default.cfg.leafs()))
+print("exit: {}".format(fmt(default.semantics[leaf])))
@@ -0,0 +1,111 @@
+"""
+Check that in basic block mode, the state at a check site which is inside a
+block (i.e. the node preceding an assume statement that has a purpose) is
+kept during the analysis, whereas the other states inside the block are
+not, and that all of them are identical to the ones of the default mode.
+"""
+
+from lalcheck.irs.basic import tree as irt
+from lalcheck.irs.basic.analyses import abstract_semantics
+from lalcheck.irs.basic.purpose import DerefCheck
+from lalcheck.irs.basic.tools import Models
+from lalcheck.interpretations import default_type_interpreter
+from lalcheck.constants import ops
+from lalcheck.utils import Transformer
+from lalcheck import types
+
+
+int_type = types.IntRange(-1000, 1000)
+bool_type = types.Boolean()
+
+
+def ident(v):
+    return irt.Identifier(v, type_hint=v.data.type_hint)
+
+
+def lit(val, hint):
+    return irt.Lit(val, type_hint=hint)
+
+
+def call(op, args, hint):
+    return irt.FunCall(op, args, type_hint=hint)
+
+
+def assign_plus(v, w, val):
+    return irt.AssignStmt(ident(v), call(ops.PLUS, [
+        ident(w), lit(val, int_type)
+    ], int_type))
+
+
+x = irt.Variable('x', type_hint=int_type, index=0)
+y = irt.Variable('y', type_hint=int_type, index=1)
+z = irt.Variable('z', type_hint=int_type, index=2)
+
+prog = irt.Program([
+    irt.ReadStmt(ident(x)),
+    irt.AssumeStmt(call(ops.LT, [ident(x), lit(10, int_type)], bool_type)),
+    assign_plus(y, x, 1),
+    assign_plus(y, y, 2),
+    irt.AssumeStmt(
+        call(ops.GT, [ident(y), lit(0, int_type)], bool_type),
+        purpose=DerefCheck(ident(y))
+    ),
+    assign_plus(z, y, 3),
+    assign_plus(z, z, 4),
+    irt.UseStmt(ident(z))
+], fun_id="test")
+
+model = Models(
+    Transformer.as_transformer(lambda hint: hint),
+    default_type_interpreter,
+    abstract_semantics.UnknownTargetCallStrategy().as_def_provider()
+).of(prog)
+
+
+def fmt(state):
+    return sorted(
+        sorted(
+            (v.name, model[v].domain.str(val))
+            for v, val in values.iteritems()
+        )
+        for trace, values in state.iteritems()
+    )
+
+
+pred = abstract_semantics.MergePredicateBuilder.Always
+default = abstract_semantics.compute_semantics(prog, model, pred)
+blocks = abstract_semantics.compute_semantics(
+    prog, model, pred, basic_blocks=True
+)
+
+checks = [
+    n for n in blocks.cfg.nodes
+    if isinstance(n.data.node, irt.AssumeStmt) and
+    'purpose' in n.data.node.data
+]
+sites = {pred_node for n in checks for pred_node in blocks.cfg.ancestors(n)}
+assert len(sites) == 1
+
+# Which states were kept during the analysis, before any state is requested
+# and the missing ones are recomputed.
+kept = {
+    n.name: id(n) in blocks.semantics._states for n in blocks.cfg.nodes
+}
+for n in sites:
+    assert all(kept[m.name] is False for m in blocks.cfg.ancestors(n))
+    assert all(kept[m.name] is False for m in blocks.cfg.successors(n))
+
+default_nodes = {n.name: n for n in default.cfg.nodes}
+for n in blocks.cfg.nodes:
+    site = n in sites
+    identical = (
+        fmt(blocks.semantics[n]) ==
+        fmt(default.semantics[default_nodes[n.name]])
+    )
+    if site or not kept[n.name]:
+        print("{}{}: kept = {}, identical = {}".format(
+            n.name, " (check site)" if site else "", kept[n.name], identical
+        ))
+
+site = next(iter(sites))
+print("check site: {}".format(fmt(blocks.semantics[site])))
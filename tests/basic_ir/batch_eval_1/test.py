@@ -0,0 +1,174 @@
+"""
+Check that evaluating and solving expressions in many states at once gives
+the same results as doing it state by state, both for single expressions and
+for the semantics computed at every node of the control-flow graph.
+"""
+
+from lalcheck.irs.basic import tree as irt
+from lalcheck.irs.basic.analyses import abstract_semantics
+from lalcheck.irs.basic.tools import (
+    Models,
+    ExprEvaluator,
+    ExprBatchEvaluator,
+    ExprSolver,
+    ExprBatchSolver
+)
+from lalcheck.domain_ops import boolean_ops
+from lalcheck.interpretations import default_type_interpreter
+from lalcheck.constants import ops
+from lalcheck.utils import Transformer
+from lalcheck import types
+
+import itertools
+
+
+int_type = types.IntRange(-1000, 1000)
+bool_type = types.Boolean()
+enum_type = types.Enum(['A', 'B', 'C'])
+
+
+def ident(v):
+    return irt.Identifier(v, type_hint=v.data.type_hint)
+
+
+def lit(val, hint):
+    return irt.Lit(val, type_hint=hint)
+
+
+def call(op, args, hint):
+    return irt.FunCall(op, args, type_hint=hint)
+
+
+x = irt.Variable('x', type_hint=int_type, index=0)
+y = irt.Variable('y', type_hint=int_type, index=1)
+e = irt.Variable('e', type_hint=enum_type, index=2)
+b = irt.Variable('b', type_hint=bool_type, index=3)
+
+exprs = [
+    call(ops.PLUS, [ident(x), lit(1, int_type)], int_type),
+    call(ops.MINUS, [ident(x), ident(y)], int_type),
+    call(ops.NEG, [call(ops.MINUS, [
+        ident(y), lit(3, int_type)
+    ], int_type)], int_type),
+    call(ops.LT, [ident(x), ident(y)], bool_type),
+    call(ops.LE, [ident(x), lit(0, int_type)], bool_type),
+    call(ops.GT, [ident(y), call(ops.PLUS, [
+        ident(x), lit(2, int_type)
+    ], int_type)], bool_type),
+    call(ops.GE, [ident(x), ident(y)], bool_type),
+    call(ops.EQ, [ident(x), lit(5, int_type)], bool_type),
+    call(ops.NEQ, [ident(e), lit('B', enum_type)], bool_type),
+    call(ops.NOT, [ident(b)], bool_type),
+    call(ops.AND, [
+        call(ops.LT, [ident(x), ident(y)], bool_type),
+        call(ops.EQ, [ident(e), lit('A', enum_type)], bool_type)
+    ], bool_type),
+    call(ops.OR, [
+        call(ops.NOT, [
+            call(ops.GE, [ident(x), lit(10, int_type)], bool_type)
+        ], bool_type),
+        ident(b)
+    ], bool_type)
+]
+
+prog = irt.Program([
+    irt.ReadStmt(ident(x)),
+    irt.ReadStmt(ident(y)),
+    irt.ReadStmt(ident(b)),
+    irt.AssignStmt(ident(e), lit('A', enum_type)),
+    irt.SplitStmt([
+        [irt.AssumeStmt(call(ops.LT, [ident(x), ident(y)], bool_type))],
+        [irt.AssumeStmt(call(ops.GE, [ident(x), ident(y)], bool_type)),
+         irt.AssignStmt(ident(e), lit('B', enum_type))]
+    ]),
+    irt.LoopStmt([
+        irt.AssumeStmt(call(ops.LT, [ident(x), lit(20, int_type)], bool_type)),
+        irt.AssignStmt(ident(x), exprs[0]),
+        irt.SplitStmt([
+            [irt.AssumeStmt(exprs[7]),
+             irt.AssignStmt(ident(e), lit('C', enum_type))],
+            [irt.AssumeStmt(call(ops.NOT, [exprs[7]], bool_type)),
+             irt.ReadStmt(ident(b))]
+        ])
+    ]),
+    irt.AssumeStmt(call(ops.GE, [ident(x), lit(20, int_type)], bool_type)),
+    irt.AssignStmt(ident(y), exprs[2]),
+    irt.AssumeStmt(exprs[10]),
+    irt.AssumeStmt(exprs[11]),
+    irt.UseStmt(ident(y))
+], fun_id="test")
+
+model = Models(
+    Transformer.as_transformer(lambda hint: hint),
+    default_type_interpreter,
+    abstract_semantics.UnknownTargetCallStrategy().as_def_provider()
+).of(prog, irt.Program([irt.UseStmt(expr) for expr in exprs]))
+
+int_dom = model[x].domain
+enum_dom = model[e].domain
+ints = [int_dom.bottom, int_dom.top, (0, 0), (5, 5), (-3, 7), (10, 1000)]
+enums = [enum_dom.bottom, enum_dom.top, enum_dom.build(frozenset(['A'])),
+         enum_dom.build(frozenset(['B', 'C']))]
+bools = [boolean_ops.none, boolean_ops.both, boolean_ops.true,
+         boolean_ops.false]
+states = list(itertools.product(ints, ints, enums, bools))
+
+evaluator = ExprEvaluator(model)
+batch_evaluator = ExprBatchEvaluator(model)
+solver = ExprSolver(model)
+batch_solver = ExprBatchSolver(model)
+
+evals = all(
+    batch_evaluator.eval(expr, states) ==
+    [evaluator.eval(expr, state) for state in states]
+    for expr in exprs
+)
+solves = all(
+    batch_solver.solve(expr, states) ==
+    [solver.solve(expr, state) for state in states]
+    for expr in exprs
+    if model[expr].domain == model[exprs[3]].domain
+)
+print("{} expressions in {} states: evaluations identical = {}, "
+      "solutions identical = {}".format(
+          len(exprs), len(states), evals, solves
+      ))
+
+
+def fmt(state):
+    return sorted(
+        (
+            sorted(n.name for n in trace),
+            sorted(
+                (v.name, model[v].domain.str(val))
+                for v, val in values.iteritems()
+            )
+        )
+        for trace, values in state.iteritems()
+    )
+
+
+pred = (abstract_semantics.MergePredicateBuilder.Le_Traces |
+        abstract_semantics.MergePredicateBuilder.Eq_Vals)
+
+batched = abstract_semantics.compute_semantics(prog, model, pred)
+
+# The reference implementation, which visits each state separately.
+abstract_semantics._VarTracker.visit_all = (
+    lambda self, node, node_states: [node.visit(self, s) for s in node_states]
+)
+per_state = abstract_semantics.compute_semantics(prog, model, pred)
+
+batched_nodes = {n.name: n for n in batched.cfg.nodes}
+per_state_nodes = {n.name: n for n in per_state.cfg.nodes}
+assert sorted(batched_nodes) == sorted(per_state_nodes)
+
+identical = all(
+    fmt(batched.semantics[batched_nodes[n]]) ==
+    fmt(per_state.semantics[per_state_nodes[n]])
+    for n in batched_nodes
+)
+print("{} nodes, identical = {}".format(len(batched_nodes), identical))
+
+leaf = next(iter(batched.cfg.leafs()))
+print("exit: {} disjuncts".format(len(batched.semantics[leaf])))
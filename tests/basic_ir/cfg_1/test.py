@@ -0,0 +1,81 @@
+"""
+Check the control-flow graphs built from hand-built Basic IR programs.
+"""
+
+import sys
+
+from lalcheck.irs.basic import tree as irt
+from lalcheck.irs.basic.tools import CFGBuilder
+from lalcheck.constants import ops
+from lalcheck import types
+
+
+int_type = types.IntRange(-100, 100)
+bool_type = types.Boolean()
+
+x = irt.Variable('x', type_hint=int_type, index=0)
+
+
+def ident(v):
+    return irt.Identifier(v, type_hint=v.data.type_hint)
+
+
+def lit(val, hint):
+    return irt.Lit(val, type_hint=hint)
+
+
+def assign(val):
+    return irt.AssignStmt(ident(x), lit(val, int_type))
+
+
+def assume_lt(val):
+    return irt.AssumeStmt(irt.FunCall(
+        ops.LT, [ident(x), lit(val, int_type)], type_hint=bool_type
+    ))
+
+
+def print_cfg(cfg):
+    print("nodes: {}".format(", ".join(n.name for n in cfg.nodes)))
+    print("edges:")
+    for e in cfg.edges:
+        print("  {} -> {}".format(e.frm.name, e.to.name))
+
+
+loop_label = irt.LabelStmt('loop')
+end_label = irt.LabelStmt('end')
+
+# x := 0
+# <<loop>>
+# split:
+#   assume(x < 10); x := 1; goto loop    (backward goto)
+# |:
+#   assume(x < 20); goto end             (forward goto)
+#   x := 2                               (unreachable)
+# x := 3
+# <<end>>
+# x := 4
+prog = irt.Program([
+    assign(0),
+    loop_label,
+    irt.SplitStmt([
+        [assume_lt(10), assign(1), irt.GotoStmt(loop_label)],
+        [assume_lt(20), irt.GotoStmt(end_label), assign(2)]
+    ]),
+    assign(3),
+    end_label,
+    assign(4)
+])
+
+print_cfg(prog.visit(CFGBuilder()))
+
+# A straight-line program longer than the recursion limit.
+length = sys.getrecursionlimit() * 3
+cfg = irt.Program([assign(i % 100) for i in range(length)]).visit(
+    CFGBuilder()
+)
+print("straight line: {} nodes, {} edges, chained = {}".format(
+    len(cfg.nodes) - 1,
+    len(cfg.edges),
+    all(e.frm is cfg.nodes[i] and e.to is cfg.nodes[i + 1]
+        for i, e in enumerate(cfg.edges))
+))
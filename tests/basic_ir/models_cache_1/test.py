@@ -0,0 +1,76 @@
+"""
+Check that the definitions resolved while building a model are shared with
+the models built afterwards, even by other Models objects, as long as the
+signature and the providers are the same.
+"""
+
+from lalcheck.irs.basic import tree as irt
+from lalcheck.irs.basic import tools
+from lalcheck.irs.basic.analyses import abstract_semantics
+from lalcheck.interpretations import default_type_interpreter
+from lalcheck.constants import ops
+from lalcheck.utils import Transformer
+from lalcheck import types
+
+
+int_type = types.IntRange(-1000, 1000)
+bool_type = types.Boolean()
+
+
+def ident(v):
+    return irt.Identifier(v, type_hint=v.data.type_hint)
+
+
+def call(op, args, hint):
+    return irt.FunCall(op, args, type_hint=hint)
+
+
+x = irt.Variable('x', type_hint=int_type, index=0)
+b = irt.Variable('b', type_hint=bool_type, index=1)
+
+to_int = call('f', [ident(x)], int_type)
+to_bool = call('f', [ident(x)], bool_type)
+plus = call(ops.PLUS, [ident(x), ident(x)], int_type)
+
+prog = irt.Program([
+    irt.AssignStmt(ident(x), to_int),
+    irt.AssignStmt(ident(b), to_bool),
+    irt.AssignStmt(ident(x), plus)
+], fun_id="test")
+
+external_def_provider = (
+    abstract_semantics.UnknownTargetCallStrategy().as_def_provider()
+)
+
+
+def build_model():
+    return tools.Models(
+        Transformer.as_transformer(lambda hint: hint),
+        default_type_interpreter,
+        external_def_provider
+    ).of(prog)
+
+
+def resolved(model, node):
+    return model[node].definition, model[node].inverse
+
+
+first = build_model()
+size = len(tools._definitions.entries)
+second = build_model()
+
+print("resolved: {}, after the second build: {}".format(
+    size, len(tools._definitions.entries)
+))
+print("f -> int reused: {}".format(
+    resolved(first, to_int) == resolved(second, to_int)
+))
+print("plus reused: {}".format(
+    resolved(first, plus) == resolved(second, plus)
+))
+print("f -> bool shares f -> int: {}".format(
+    resolved(first, to_bool) == resolved(first, to_int)
+))
+print("f -> bool output domain: {}".format(
+    first[to_bool].definition(first[x].domain.top) == first[b].domain.top
+))
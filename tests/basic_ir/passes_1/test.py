@@ -0,0 +1,124 @@
+"""
+Check the optimization passes on a hand-built Basic IR program.
+"""
+
+from lalcheck.irs.basic import tree as irt, passes
+from lalcheck.irs.basic.purpose import SyntheticVariable, DerefCheck
+from lalcheck.irs.basic.tools import PrettyPrinter
+from lalcheck.constants import ops, lits
+from lalcheck import types
+
+
+int_type = types.IntRange(-100, 100)
+bool_type = types.Boolean()
+
+
+def var(name, index, hint, synthetic=False):
+    if synthetic:
+        return irt.Variable(name, type_hint=hint, index=index,
+                            purpose=SyntheticVariable())
+    return irt.Variable(name, type_hint=hint, index=index)
+
+
+def ident(v):
+    return irt.Identifier(v, type_hint=v.data.type_hint)
+
+
+def lit(val, hint):
+    return irt.Lit(val, type_hint=hint)
+
+
+def call(op, args, hint):
+    return irt.FunCall(op, args, type_hint=hint)
+
+
+def fold(expr):
+    if expr.fun_id == ops.PLUS:
+        return lit(sum(arg.val for arg in expr.args), expr.data.type_hint)
+    return None
+
+
+def build_program():
+    x = var('x', 0, int_type)
+    y = var('y', 1, int_type)
+    t1 = var('t1', 2, int_type, True)
+    t2 = var('t2', 3, int_type, True)
+    t3 = var('t3', 4, int_type, True)
+    t4 = var('t4', 5, int_type, True)
+    t5 = var('t5', 6, int_type, True)
+    t6 = var('t6', 7, int_type, True)
+    t7 = var('t7', 8, int_type, True)
+    t8 = var('t8', 9, int_type, True)
+    t9 = var('t9', 10, int_type, True)
+    p = var('p', 11, int_type)
+    a = var('a', 12, int_type)
+
+    return irt.Program([
+        # A temporary that is read but never used.
+        irt.ReadStmt(ident(t1)),
+        # Chained copies of a literal: t3 = t2 = 3.
+        irt.AssignStmt(ident(t2), lit(3, int_type)),
+        irt.AssignStmt(ident(t3), ident(t2)),
+        irt.AssignStmt(ident(x), call(ops.PLUS, [
+            ident(t3), lit(1, int_type)
+        ], int_type)),
+        # Trivial assumes, only the one without purpose can go.
+        irt.AssumeStmt(lit(lits.TRUE, bool_type)),
+        irt.AssumeStmt(lit(lits.TRUE, bool_type),
+                       purpose=DerefCheck(ident(x))),
+        # A temporary referred to by a purpose is kept.
+        irt.AssignStmt(ident(t4), ident(x)),
+        irt.AssumeStmt(
+            call(ops.LT, [ident(t4), ident(y)], bool_type),
+            purpose=DerefCheck(ident(t4))
+        ),
+        # A temporary which is defined twice is not propagated.
+        irt.SplitStmt([
+            [irt.AssignStmt(ident(t5), lit(1, int_type))],
+            [irt.AssignStmt(ident(t5), lit(2, int_type))]
+        ]),
+        irt.AssignStmt(ident(y), ident(t5)),
+        # Unused temporaries whose expression may fail are kept: a
+        # dereference, an indexing and a call. The others are removed.
+        irt.AssignStmt(ident(t6), call(ops.DEREF, [ident(p)], int_type)),
+        irt.AssignStmt(ident(t7), call(ops.CALL, [
+            ident(a), ident(y)
+        ], int_type)),
+        irt.AssignStmt(ident(t8), call('f', [ident(x)], int_type)),
+        irt.AssignStmt(ident(t9), call(ops.LT, [
+            call(ops.PLUS, [ident(x), ident(y)], int_type), ident(y)
+        ], bool_type)),
+        irt.UseStmt(ident(y))
+    ], fun_id="test", param_vars=[], result_var=None)
+
+
+def print_program(title, prog):
+    print("{}:".format(title))
+    print(PrettyPrinter.pretty_print(prog))
+
+
+prog = build_program()
+print_program("Original", prog)
+
+passes.CopyPropagation().run(prog)
+print_program("After copy propagation", prog)
+
+passes.ConstantFolding(fold).run(prog)
+print_program("After constant folding", prog)
+
+passes.TrivialAssumeElimination().run(prog)
+print_program("After trivial assume elimination", prog)
+
+passes.DeadTempElimination().run(prog)
+print_program("After dead temporary elimination", prog)
+
+# The default pipeline, run on two programs, sums the statistics of both.
+pipeline = passes.default_pipeline(fold)
+optimized = [pipeline.run(build_program()) for _ in range(2)]
+assert all(
+    PrettyPrinter.pretty_print(p) == PrettyPrinter.pretty_print(prog)
+    for p in optimized
+)
+assert sorted(pipeline.stats) == sorted(p.name for p in pipeline.passes)
+print("Report:")
+print(pipeline.report())
@@ -0,0 +1,95 @@
+"""
+Check that the analysis of loops terminates with each widening strategy, and
+print the values of their counters at the head of the loops. The bound of a
+counter which is only compared for equality with its limit is lost by the
+default widening, and recovered by the widening to thresholds.
+"""
+
+from lalcheck.irs.basic import tree as irt
+from lalcheck.irs.basic.analyses import abstract_semantics
+from lalcheck.irs.basic.tools import Models
+from lalcheck.interpretations import default_type_interpreter
+from lalcheck.constants import ops
+from lalcheck.utils import Transformer
+from lalcheck import types
+
+
+int_type = types.IntRange(-1000000, 1000000)
+bool_type = types.Boolean()
+
+
+def ident(v):
+    return irt.Identifier(v, type_hint=v.data.type_hint)
+
+
+def lit(val, hint):
+    return irt.Lit(val, type_hint=hint)
+
+
+def call(op, args, hint):
+    return irt.FunCall(op, args, type_hint=hint)
+
+
+x = irt.Variable('x', type_hint=int_type, index=0)
+y = irt.Variable('y', type_hint=int_type, index=1)
+z = irt.Variable('z', type_hint=int_type, index=2)
+
+
+def increment(v):
+    return irt.AssignStmt(ident(v), call(ops.PLUS, [
+        ident(v), lit(1, int_type)
+    ], int_type))
+
+
+# read y; z := 1000; x := 0; loop { assume(x < y); x := x + 1 }
+unbounded = irt.Program([
+    irt.ReadStmt(ident(y)),
+    irt.AssignStmt(ident(z), lit(1000, int_type)),
+    irt.AssignStmt(ident(x), lit(0, int_type)),
+    irt.LoopStmt([
+        irt.AssumeStmt(call(ops.LT, [ident(x), ident(y)], bool_type)),
+        increment(x)
+    ])
+], fun_id="unbounded")
+
+# x := 0; loop { assume(x != 100); x := x + 1 }; assume(x == 100)
+counter = irt.Program([
+    irt.AssignStmt(ident(x), lit(0, int_type)),
+    irt.LoopStmt([
+        irt.AssumeStmt(call(ops.NEQ, [
+            ident(x), lit(100, int_type)
+        ], bool_type)),
+        increment(x)
+    ]),
+    irt.AssumeStmt(call(ops.EQ, [ident(x), lit(100, int_type)], bool_type))
+], fun_id="counter")
+
+model = Models(
+    Transformer.as_transformer(lambda hint: hint),
+    default_type_interpreter,
+    abstract_semantics.UnknownTargetCallStrategy().as_def_provider()
+).of(unbounded, counter)
+
+strategies = [
+    ("default", abstract_semantics.WideningStrategy()),
+    ("thresholds", abstract_semantics.WideningStrategy(thresholds=True)),
+    ("thresholds, narrowing", abstract_semantics.WideningStrategy(
+        thresholds=True, narrowing_steps=3
+    )),
+    ("narrowing", abstract_semantics.WideningStrategy(narrowing_steps=3))
+]
+
+for name, strategy in strategies:
+    print("{}:".format(name))
+    for prog in [unbounded, counter]:
+        analysis = abstract_semantics.compute_semantics(
+            prog, model, abstract_semantics.MergePredicateBuilder.Always,
+            widening=strategy
+        )
+        head = next(
+            n for n in analysis.cfg.nodes if n.data.is_widening_point
+        )
+        for trace, values in analysis.semantics[head].iteritems():
+            print("  {}: x = {}".format(
+                prog.data.fun_id, model[x].domain.str(values[x])
+            ))
@@ -0,0 +1,58 @@
+"""
+Check the output of each diagnostic writer.
+"""
+
+import json
+import StringIO
+
+from checkers.output import BufferedOutput, Diagnostic, writers
+
+
+diags = [
+    Diagnostic("test.adb", 3, 7, "Foo", "test.adb", 1, 4,
+               "null dereference"),
+    Diagnostic("test.adb", 12, 9, "Bar", "bar.adb", 10, 4,
+               'precondition "x > 0" might fail')
+]
+
+
+def run_writer(output_format, diags, flush_every=1):
+    stream = StringIO.StringIO()
+    writer = writers[output_format]("test checker", BufferedOutput(stream))
+    writer.start()
+    for i, diag in enumerate(diags):
+        writer.emit(diag)
+        if (i + 1) % flush_every == 0:
+            writer.end_subprogram()
+    writer.close()
+    return stream.getvalue()
+
+
+print("codepeer:")
+print(run_writer('codepeer', diags))
+
+print("jsonl:")
+jsonl = run_writer('jsonl', diags)
+print(jsonl)
+assert [json.loads(line) for line in jsonl.splitlines()] == [
+    json.loads(line)
+    for line in run_writer('jsonl', diags, flush_every=2).splitlines()
+]
+
+print("sarif:")
+sarif = run_writer('sarif', diags)
+print(sarif)
+log = json.loads(sarif)
+assert len(log['runs'][0]['results']) == len(diags)
+
+# An empty run is still a valid document.
+empty = json.loads(run_writer('sarif', []))
+print("empty sarif results: {}".format(empty['runs'][0]['results']))
+
+# Nothing reaches the stream until the buffer is full or flushed.
+stream = StringIO.StringIO()
+out = BufferedOutput(stream, capacity=10)
+out.write("12345")
+print("buffered: {!r}".format(stream.getvalue()))
+out.write("67890")
+print("full: {!r}".format(stream.getvalue()))
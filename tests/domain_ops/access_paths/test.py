@@ -0,0 +1,57 @@
+"""
+Check that access paths are interned, including the ones resulting from
+operations of the lattice and the ones which are unpickled.
+"""
+
+from lalcheck import domains
+
+import cPickle
+import copy
+
+
+lattice = domains.AccessPathsLattice()
+paths = domains.AccessPathsLattice
+dom = domains.Intervals(0, 3)
+
+address = paths.Address(1, dom)
+get = paths.ProductGet(address, 2, dom)
+
+print("equal paths are identical: {}".format(all([
+    paths.Null() is paths.Null(),
+    paths.NoPath() is lattice.bottom,
+    paths.AllPath() is lattice.top,
+    paths.Address(1, dom) is address,
+    paths.ProductGet(paths.Address(1, dom), 2, dom) is get
+])))
+print("different paths are distinct: {}".format(all([
+    paths.Address(2, dom) is not address,
+    paths.ProductGet(address, 1, dom) is not get,
+    paths.NonNull() is not paths.Null()
+])))
+
+null_join = lattice.join(paths.Null(), lattice.bottom)
+print("null | no-path = {}, interned = {}".format(
+    null_join, null_join is paths.Null()
+))
+print("no-path | null = {}, interned = {}".format(
+    lattice.join(lattice.bottom, paths.Null()),
+    lattice.join(lattice.bottom, paths.Null()) is paths.Null()
+))
+
+# The domain of the paths is pickled along with them: paths rebuilt from
+# the unpickled domain are the unpickled paths.
+for protocol in [0, cPickle.HIGHEST_PROTOCOL]:
+    dom_2, null_2, address_2, get_2 = cPickle.loads(cPickle.dumps(
+        (dom, paths.Null(), address, get), protocol
+    ))
+    print("protocol {}: {}".format(protocol, all([
+        null_2 is paths.Null(),
+        paths.Address(1, dom_2) is address_2,
+        get_2.prefix is address_2,
+        paths.ProductGet(address_2, 2, dom_2) is get_2,
+        str(get_2) == str(get)
+    ])))
+
+print("copies are identical: {}".format(
+    copy.copy(get) is get and copy.deepcopy(paths.Null()) is paths.Null()
+))
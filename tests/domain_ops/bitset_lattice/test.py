@@ -0,0 +1,59 @@
+from lalcheck import domains
+from lalcheck.utils import powerset
+
+import itertools
+
+
+elems = {1, 2, 3, 4}
+
+bitset_dom = domains.FiniteLattice.of_subsets(elems)
+
+# The same lattice, with an explicit "less than" relation.
+sets = powerset(elems)
+explicit_dom = domains.FiniteLattice({
+    k: {v for v in sets if k.issubset(v)} for k in sets
+}, domains.FiniteLattice._subset_splitter)
+
+
+def same_relations(name, a, b):
+    keys_a, keys_b = frozenset(a.keys()), frozenset(b.keys())
+    print("{}: {} keys, same keys = {}, same items = {}".format(
+        name,
+        len(keys_a),
+        keys_a == keys_b and frozenset(a) == keys_a,
+        dict((k, frozenset(v)) for k, v in a.items()) ==
+        dict((k, frozenset(v)) for k, v in b.items()) and
+        dict((k, frozenset(v)) for k, v in a.iteritems()) ==
+        dict((k, frozenset(v)) for k, v in b.iteritems())
+    ))
+
+
+same_relations("lts", bitset_dom.lts, explicit_dom.lts)
+same_relations("inv_lts", bitset_dom.inv_lts, explicit_dom.inv_lts)
+
+# A lattice with 2^40 elements, which must never be enumerated.
+big_elems = range(40)
+big_dom = domains.FiniteLattice.of_subsets(big_elems)
+evens = frozenset(x for x in big_elems if x % 2 == 0)
+small = frozenset([0, 1, 2])
+
+first = list(itertools.islice(big_dom.generator(), 4))
+print("big: first elements = {}".format([sorted(x) for x in first]))
+print("big: split = {}".format(
+    [sorted(x) for x in big_dom.split(small, evens)]
+))
+print("big: subset split = {}".format([
+    sorted(x)
+    for x in domains.FiniteLattice._subset_splitter(big_dom, small, evens)
+]))
+print("big: join = {}, lt = {}, contains = {}".format(
+    len(big_dom.join(evens, small)), big_dom.lt(small, big_dom.top),
+    evens in big_dom.lts
+))
+
+pairs = itertools.islice(
+    domains.Product(big_dom, bitset_dom).generator(), 3
+)
+print("big x small: first elements = {}".format([
+    (sorted(x), sorted(y)) for x, y in pairs
+]))
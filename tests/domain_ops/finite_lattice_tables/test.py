@@ -0,0 +1,43 @@
+from lalcheck import domains
+from lalcheck.utils import powerset, LRUCache
+
+
+def explicit_subset_lattice(elems):
+    """
+    Builds a lattice of subsets with an explicit "less than" relation, so
+    that it does not go through BitsetLattice.
+    """
+    sets = powerset(elems)
+    return domains.FiniteLattice({
+        k: {v for v in sets if k.issubset(v)} for k in sets
+    }, domains.FiniteLattice._subset_splitter)
+
+
+def check(name, dom):
+    elems = list(dom.generator())
+    ok = all(
+        dom.join(a, b) == a | b and dom.meet(a, b) == a & b
+        for a in elems
+        for b in elems
+    )
+    print("{}: {} elements, cached = {}, join/meet ok = {}".format(
+        name,
+        len(elems),
+        isinstance(dom._join, LRUCache) and isinstance(dom._meet, LRUCache),
+        ok
+    ))
+
+
+# 32 elements: the join and meet tables are precomputed.
+check("dense", explicit_subset_lattice(range(5)))
+
+# 128 elements: joins and meets are computed on demand and cached. The
+# capacity of the cache is exceeded, so entries are evicted.
+check("cached", explicit_subset_lattice(range(7)))
+
+# Least recently used entries are evicted first.
+calls = []
+cache = LRUCache(lambda x: calls.append(x) or x * 2, 2)
+for x in [1, 2, 1, 3, 1, 2]:
+    assert cache(x) == x * 2
+print("computed: {}".format(calls))
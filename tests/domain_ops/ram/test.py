@@ -0,0 +1,48 @@
+from lalcheck import domains
+from lalcheck.domain_ops import ram_ops
+
+
+int_dom = domains.Intervals(-10, 10)
+mem_dom = domains.RandomAccessMemory()
+
+
+def store(mem, index, value):
+    return ram_ops.updater(index, int_dom)(mem, int_dom.build(*value))
+
+
+def load(mem, index):
+    return ram_ops.getter(index, int_dom)(mem)
+
+
+base = mem_dom.top
+for i in range(100):
+    base = store(base, i, (i % 10, i % 10))
+
+a = store(store(base, 3, (0, 0)), 200, (1, 1))
+b = store(base, 3, (5, 6))
+offset_a = ram_ops.offseter(5)(a)
+
+print("load(a, 3) = {}".format(int_dom.str(load(a, 3))))
+print("load(b, 200) = {}".format(int_dom.str(load(b, 200))))
+print("load(offset_a, -2) = {}".format(int_dom.str(load(offset_a, -2))))
+print("load(base, 3) = {}".format(int_dom.str(load(base, 3))))
+
+join = mem_dom.join(a, b)
+print("join: {} entries, [3] = {}, [200] = {}".format(
+    len(join[0]), int_dom.str(load(join, 3)), int_dom.str(load(join, 200))
+))
+
+meet = mem_dom.meet(a, b)
+print("meet: {} entries, [3] = {}, [200] = {}".format(
+    len(meet[0]), int_dom.str(load(meet, 3)), int_dom.str(load(meet, 200))
+))
+
+print("eq(base, base) = {}".format(mem_dom.eq(base, base)))
+print("eq(a, b) = {}".format(mem_dom.eq(a, b)))
+print("eq(join, join of copies) = {}".format(
+    mem_dom.eq(join, mem_dom.join(store(a, 7, (7, 7)), b))
+))
+print("le(a, join) = {}".format(mem_dom.le(a, join)))
+print("le(join, a) = {}".format(mem_dom.le(join, a)))
+print("le(meet, a) = {}".format(mem_dom.le(meet, a)))
+print("join(a, a) is a = {}".format(mem_dom.join(a, a) is a))
@@ -0,0 +1,52 @@
+"""
+Print the index and the array refined by the inverse of the get operation,
+given the values that the operation is expected to return.
+"""
+
+from lalcheck import domains
+from lalcheck.domain_ops import sparse_array_ops
+
+
+idx_dom = domains.Intervals(0, 9)
+val_dom = domains.Intervals(0, 100)
+array_dom = domains.SparseArray(idx_dom, val_dom)
+
+inv_get = sparse_array_ops.inv_get(array_dom)
+get = sparse_array_ops.get(array_dom)
+
+
+def show(array):
+    return " ".join(
+        "{}:{}".format(idx_dom.str(idx), val_dom.str(val))
+        for idx, val in array
+    )
+
+
+array = array_dom.optimized([
+    ((0, 2), (0, 0)),
+    ((3, 5), (10, 20)),
+    ((6, 9), (50, 60))
+])
+print("array: {}".format(show(array)))
+
+cases = [
+    ((10, 20), idx_dom.top),
+    ((55, 55), (4, 7)),
+    ((0, 15), (1, 4)),
+    ((15, 15), (4, 4)),
+    ((15, 15), (2, 4)),
+    ((30, 40), idx_dom.top)
+]
+
+for res, index in cases:
+    refined = inv_get(res, array, index)
+    print("get(array, {}) = {}:".format(idx_dom.str(index), val_dom.str(res)))
+    if refined is None:
+        print("  infeasible")
+    else:
+        refined_array, refined_index = refined
+        print("  index: {}".format(idx_dom.str(refined_index)))
+        print("  array: {}".format(show(refined_array)))
+        print("  get: {}".format(val_dom.str(
+            get(refined_array, refined_index)
+        )))
@@ -0,0 +1,91 @@
+"""
+Check the normalization of sparse arrays with one-dimensional interval
+indices, the coarsening of their segments beyond max_segments, and the
+lookup of the segments overlapping a multi-dimensional index.
+"""
+
+from lalcheck import domains
+
+
+idx_dom = domains.Intervals(0, 100)
+val_dom = domains.Intervals(0, 10)
+array_dom = domains.SparseArray(idx_dom, val_dom)
+
+
+def show(array):
+    return " ".join(
+        "{}:{}".format(idx_dom.str(idx), val_dom.str(val))
+        for idx, val in array
+    )
+
+
+# Unsorted segments, where adjacent segments holding equal values are
+# merged, but not the ones separated by a gap.
+unsorted = [
+    ((20, 29), (1, 1)),
+    ((0, 9), (1, 1)),
+    ((10, 19), (1, 1)),
+    ((40, 49), (1, 1)),
+    ((30, 39), (2, 3))
+]
+print("normalized: {}".format(show(array_dom.optimized(unsorted))))
+
+# The join of overlapping arrays is split at the bounds of the segments.
+print("join: {}".format(show(array_dom.join(
+    array_dom.optimized([((0, 9), (1, 1)), ((20, 29), (5, 5))]),
+    array_dom.optimized([((5, 24), (2, 2))])
+))))
+print("meet: {}".format(show(array_dom.meet(
+    array_dom.optimized([((0, 9), (1, 4)), ((20, 29), (5, 5))]),
+    array_dom.optimized([((5, 24), (2, 6))])
+))))
+
+# Beyond max_segments, the closest consecutive segments are merged, and
+# their values joined.
+small_dom = domains.SparseArray(idx_dom, val_dom, max_segments=3)
+many = [
+    ((0, 0), (0, 0)),
+    ((10, 10), (1, 1)),
+    ((12, 12), (2, 2)),
+    ((50, 50), (3, 3)),
+    ((53, 53), (4, 4))
+]
+coarsened = small_dom.optimized(many)
+print("coarsened: {} segments: {}".format(len(coarsened), show(coarsened)))
+print("coarsened join: {}".format(show(small_dom.join(
+    small_dom.optimized(many[:3]), small_dom.optimized(many[3:])
+))))
+
+# With multi-dimensional indices, only the segments overlapping the index on
+# its first dimension are inspected, but the result must be the same as
+# checking all of them.
+matrix_idx_dom = domains.Product(
+    domains.Intervals(0, 10), domains.Intervals(0, 10)
+)
+matrix_dom = domains.SparseArray(matrix_idx_dom, val_dom)
+matrix = matrix_dom.optimized([
+    (((0, 2), (0, 10)), (0, 0)),
+    (((3, 5), (0, 4)), (1, 1)),
+    (((3, 5), (6, 10)), (2, 2)),
+    (((4, 8), (5, 5)), (3, 3)),
+    (((9, 10), (0, 10)), (4, 4))
+])
+
+indices = [
+    ((4, 4), (5, 5)),
+    ((2, 3), (7, 7)),
+    ((0, 10), (5, 5)),
+    ((6, 6), (0, 4)),
+    (matrix_idx_dom.domains[0].bottom, (0, 10))
+]
+for index in indices:
+    positions = matrix_dom.overlapping(matrix, index)
+    expected = [
+        pos for pos, (idx, _) in enumerate(matrix)
+        if not matrix_idx_dom.is_empty(matrix_idx_dom.meet(index, idx))
+    ]
+    print("overlapping {}: {}, same as all segments = {}".format(
+        matrix_idx_dom.str(index),
+        [matrix_idx_dom.str(matrix[pos][0]) for pos in positions],
+        positions == expected
+    ))
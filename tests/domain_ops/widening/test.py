@@ -0,0 +1,70 @@
+from lalcheck import domains
+from lalcheck.domain_ops import boolean_ops
+
+
+itv_dom = domains.Intervals(-1000, 1000)
+test_dom = domains.Product(itv_dom, boolean_ops.Boolean)
+
+thresholds = (-1, 0, 1, 99, 100, 101)
+
+
+def widen_until_stable(x, step):
+    """
+    Widens x with the result of applying step to it until it is stable, and
+    returns the successive elements.
+    """
+    res = [x]
+    while True:
+        new = test_dom.widen(x, test_dom.join(x, step(x)), thresholds)
+        if test_dom.eq(new, x):
+            return res
+        x = new
+        res.append(x)
+
+
+def increment(x):
+    itv, b = x
+    return (itv[0] + 1, itv[1] + 1), b
+
+
+def decrement(x):
+    itv, b = x
+    return (itv[0] - 1, itv[1] - 1), b
+
+
+def fmt(x):
+    return "({}, {})".format(
+        itv_dom.str(x[0]), boolean_ops.Boolean.str(x[1])
+    )
+
+
+# Bounds that are stable are kept, the unstable ones jump to the next
+# threshold, and then to the bounds of the domain. Finite lattices, such as
+# booleans, are widened to their top element.
+print("increment: {}".format(
+    " -> ".join(fmt(x) for x in widen_until_stable(
+        ((0, 0), boolean_ops.true), increment
+    ))
+))
+print("decrement: {}".format(
+    " -> ".join(fmt(x) for x in widen_until_stable(
+        ((5, 10), boolean_ops.false), decrement
+    ))
+))
+
+# Without thresholds, widening goes to the bounds of the domain at once.
+print("no thresholds: {}".format(fmt(test_dom.widen(
+    ((0, 0), boolean_ops.true), ((0, 1), boolean_ops.both), ()
+))))
+
+# Bottom elements are left untouched.
+print("bottom: {} / {}".format(
+    itv_dom.str(itv_dom.widen(itv_dom.bottom, (3, 4), thresholds)),
+    itv_dom.str(itv_dom.widen((3, 4), itv_dom.bottom, thresholds))
+))
+
+# Thresholds outside of the domain are ignored.
+small_dom = domains.Intervals(-10, 10)
+print("clamped: {}".format(
+    small_dom.str(small_dom.widen((0, 0), (-1, 1), (-100, 100)))
+))
@@ -0,0 +1,7 @@
+with Dep;
+
+procedure Main is
+   x : Integer;
+begin
+   x := Dep.N;
+end Main;
@@ -0,0 +1,91 @@
+"""
+Check that programs reloaded from the IR cache are identical to the ones
+that were lowered from the "test.adb" input file, that extracting a file a
+second time is served by the cache, and that modifying a unit on which the
+file depends invalidates its cached programs. Also check that corrupted
+cache entries are discarded and replaced.
+"""
+
+import os
+import shutil
+import tempfile
+
+import lalcheck.irs.basic.frontends.lal as lal2basic
+from lalcheck.irs.basic.tools import PrettyPrinter
+
+
+# Count the subprograms which are actually lowered.
+lowered = [0]
+gen_ir = lal2basic._gen_ir
+
+
+def counting_gen_ir(ctx, subp):
+    lowered[0] += 1
+    return gen_ir(ctx, subp)
+
+
+lal2basic._gen_ir = counting_gen_ir
+
+
+def extract(title, cache_dir, filename):
+    """
+    Extracts the programs of the given file using a fresh extraction
+    context, and prints the number of subprograms that were lowered.
+
+    :return: The extraction context and the programs.
+    """
+    lowered[0] = 0
+    ctx = lal2basic.ExtractionContext(ir_cache_dir=cache_dir)
+    progs = ctx.extract_programs_from_file(filename)
+    print("{}: lowered {} subprogram(s)".format(title, lowered[0]))
+    return ctx, progs
+
+
+def print_program(prog):
+    print(PrettyPrinter.pretty_print(
+        prog,
+        PrettyPrinter.Opts(print_ids=True)
+    ))
+
+
+test_dir = os.getcwd()
+cache_dir = tempfile.mkdtemp()
+src_dir = tempfile.mkdtemp()
+
+try:
+    # Populate the cache, then reload the programs from it.
+    extract("test.adb, first extraction", cache_dir, "test.adb")
+    ctx, progs = extract("test.adb, second extraction", cache_dir, "test.adb")
+    print_program(progs[0])
+
+    # Work on a copy of the sources, from which Dep can be found.
+    for filename in ["main.adb", "dep.ads"]:
+        shutil.copy(filename, src_dir)
+    os.chdir(src_dir)
+
+    ctx, progs = extract("main.adb, first extraction", cache_dir, "main.adb")
+    print_program(progs[0])
+    extract("main.adb, second extraction", cache_dir, "main.adb")
+
+    # The value of Dep.N is folded in the program of Main, which does not
+    # refer to Dep otherwise.
+    with open("dep.ads", "w") as f:
+        f.write("package Dep is\n   N : constant := 20;\nend Dep;\n")
+
+    ctx, progs = extract(
+        "main.adb, after modifying dep.ads", cache_dir, "main.adb"
+    )
+    print_program(progs[0])
+
+    # Corrupted entries are misses, and are replaced by the programs
+    # lowered again.
+    for filename in os.listdir(cache_dir):
+        with open(os.path.join(cache_dir, filename), "wb") as f:
+            f.write("not a cache entry")
+
+    extract("main.adb, after corrupting the cache", cache_dir, "main.adb")
+    extract("main.adb, after replacing the entry", cache_dir, "main.adb")
+finally:
+    os.chdir(test_dir)
+    shutil.rmtree(cache_dir)
+    shutil.rmtree(src_dir)
@@ -0,0 +1,25 @@
+procedure Main is
+   type Point is record
+      x : Integer;
+      y : Integer;
+   end record;
+
+   function F (x : Integer) return Integer is
+   begin
+      if x > 10 then
+         return x - 1;
+      end if;
+      return x + 1;
+   end F;
+
+   function G (p : Point) return Integer is (F (p.x) + p.y);
+
+   p : Point := (2, 3);
+   z : Integer;
+begin
+   z := G (p);
+   while z < 100 loop
+      z := F ((z));
+   end loop;
+   p.y := z;
+end Main;
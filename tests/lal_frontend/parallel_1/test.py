@@ -0,0 +1,41 @@
+"""
+Check that the programs lowered by worker processes, which are serialized
+then resolved back in the extraction context, are identical to the ones
+lowered in this process from the "test.adb" input file.
+"""
+
+import lalcheck.irs.basic.frontends.lal as lal2basic
+from lalcheck.irs.basic.tools import PrettyPrinter
+
+
+def extract(jobs):
+    """
+    :return: The pretty-printed programs of "test.adb" lowered with the
+        given number of jobs, and the kinds and first lines of the
+        subprograms they were lowered from.
+    """
+    ctx = lal2basic.ExtractionContext(jobs=jobs)
+    try:
+        progs = ctx.extract_programs_from_file("test.adb")
+    finally:
+        ctx.close()
+
+    return [
+        (
+            PrettyPrinter.pretty_print(
+                prog, PrettyPrinter.Opts(print_ids=True)
+            ),
+            type(prog.data.orig_node).__name__,
+            prog.data.orig_node.sloc_range.start.line
+        )
+        for prog in progs
+    ]
+
+
+serial = extract(1)
+parallel = extract(2)
+
+print("programs: {}".format(len(serial)))
+for _, kind, line in serial:
+    print("  {} at line {}".format(kind, line))
+print("identical: {}".format(serial == parallel))